@@ -0,0 +1,136 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, defaultdict
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+READ = "read"
+WRITE = "write"
+TRAVERSAL = "traversal"
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = burst
+        self.updated_at = clock()
+
+    def take(self, cost: float = 1.0) -> float:
+        """Take ``cost`` tokens; return 0 on success or the seconds to wait."""
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+
+def route_class(request: Request) -> str:
+    path = request.url.path
+    if path.startswith(("/follow/traverse/", "/follow/reach/")):
+        return TRAVERSAL
+    if request.method in ("POST", "PUT", "PATCH", "DELETE"):
+        return WRITE
+    return READ
+
+
+def request_cost(request: Request, kind: str) -> float:
+    # Deep traversals cost more tokens than shallow ones
+    if kind == TRAVERSAL:
+        try:
+            return float(max(1, int(request.query_params.get("depth", 3))))
+        except ValueError:
+            return 1.0
+    return 1.0
+
+
+class AdmissionController:
+    """HTTP middleware that admits requests per client and route class.
+
+    Every (client, class) pair has its own token bucket, so a client firing
+    deep traversals exhausts only its traversal budget. Traversals also hold
+    a slot of a dedicated semaphore while they run; a request that cannot get
+    a slot within ``max_queue_wait`` seconds is shed with 503 rather than
+    queueing indefinitely, which keeps the worker free for reads and writes.
+    """
+
+    def __init__(
+            self,
+            rates: dict[str, tuple[float, float]],
+            traversal_concurrency: int = 8,
+            max_queue_wait: float = 0.5,
+            client_header: str = "X-Client-Id",
+            max_clients: int = 100_000,
+            clock=time.monotonic,
+    ):
+        self.rates = rates
+        self.max_queue_wait = max_queue_wait
+        self.client_header = client_header
+        self.max_clients = max_clients
+        self.clock = clock
+        self.traversal_slots = asyncio.Semaphore(traversal_concurrency)
+        self._buckets: OrderedDict[tuple[str, str], TokenBucket] = OrderedDict()
+        self._metrics = defaultdict(lambda: {"admitted": 0, "rate_limited": 0, "shed": 0})
+
+    def metrics(self) -> dict[str, dict[str, int]]:
+        return {kind: dict(counters) for kind, counters in self._metrics.items()}
+
+    def _client_id(self, request: Request) -> str:
+        client = request.headers.get(self.client_header)
+        if client:
+            return client
+        return request.client.host if request.client else "unknown"
+
+    def _bucket(self, client: str, kind: str) -> TokenBucket:
+        key = (client, kind)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            rate, burst = self.rates[kind]
+            bucket = self._buckets[key] = TokenBucket(rate, burst, clock=self.clock)
+            if len(self._buckets) > self.max_clients:
+                # Idle clients' buckets are full anyway, forgetting them is free
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    @staticmethod
+    def _reject(status_code: int, detail: str, retry_after: float) -> JSONResponse:
+        return JSONResponse(
+            status_code=status_code,
+            content={"detail": detail},
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+    async def __call__(self, request: Request, call_next):
+        kind = route_class(request)
+        if kind not in self.rates:
+            return await call_next(request)
+        counters = self._metrics[kind]
+
+        wait = self._bucket(self._client_id(request), kind).take(request_cost(request, kind))
+        if wait:
+            counters["rate_limited"] += 1
+            return self._reject(429, f"Rate limit exceeded for {kind} requests", wait)
+
+        if kind != TRAVERSAL:
+            counters["admitted"] += 1
+            return await call_next(request)
+
+        try:
+            await asyncio.wait_for(self.traversal_slots.acquire(), self.max_queue_wait)
+        except asyncio.TimeoutError:
+            counters["shed"] += 1
+            print(f"[ADMISSION] Shed traversal {request.url.path} after {self.max_queue_wait}s in queue")
+            return self._reject(503, "Traversal capacity exhausted, retry later", self.max_queue_wait)
+
+        counters["admitted"] += 1
+        try:
+            return await call_next(request)
+        finally:
+            self.traversal_slots.release()
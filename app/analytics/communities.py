@@ -0,0 +1,104 @@
+"""Weakly connected components and label-propagation communities.
+
+Both work on the integer edge arrays of ``EdgeList`` and ignore edge
+direction: a follow in either direction ties two users together.
+"""
+import random
+from array import array
+from collections import Counter
+
+
+class UnionFind:
+    """Disjoint sets over ``0 .. n-1`` with union by size and path halving."""
+
+    def __init__(self, n: int):
+        self.parent = array("I", range(n))
+        self.size = array("I", [1]) * n
+
+    def find(self, v: int) -> int:
+        parent = self.parent
+        while parent[v] != v:
+            parent[v] = parent[parent[v]]
+            v = parent[v]
+        return v
+
+    def union(self, a: int, b: int) -> int:
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return a
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        return a
+
+
+def connected_components(n: int, sources: array, targets: array) -> array:
+    """Component root of every vertex, from a single pass over the edge stream."""
+    sets = UnionFind(n)
+    for s, t in zip(sources, targets):
+        sets.union(s, t)
+    return array("I", (sets.find(v) for v in range(n)))
+
+
+def _undirected_adjacency(n: int, sources: array, targets: array) -> tuple[array, array]:
+    offsets = array("I", bytes(4 * (n + 1)))
+    for s, t in zip(sources, targets):
+        offsets[s + 1] += 1
+        offsets[t + 1] += 1
+    for v in range(n):
+        offsets[v + 1] += offsets[v]
+
+    neighbours = array("I", bytes(4 * offsets[n]))
+    fill = array("I", offsets[:n])
+    for s, t in zip(sources, targets):
+        neighbours[fill[s]] = t
+        fill[s] += 1
+        neighbours[fill[t]] = s
+        fill[t] += 1
+    return offsets, neighbours
+
+
+def majority_label(current, neighbour_labels) -> object:
+    """Most frequent neighbour label; keeps ``current`` on ties so labels settle."""
+    counts = Counter(neighbour_labels)
+    if not counts:
+        return current
+    best = max(counts.values())
+    if counts.get(current) == best:
+        return current
+    return min(label for label, count in counts.items() if count == best)
+
+
+def label_propagation(
+        n: int,
+        sources: array,
+        targets: array,
+        max_iter: int = 20,
+        seed: int = 0,
+) -> array:
+    """Community label of every vertex (the id of a vertex in the community).
+
+    Vertices adopt the most common label among their neighbours, visited in
+    a shuffled order each round, until a round changes nothing or
+    ``max_iter`` rounds have run. A fixed ``seed`` makes runs reproducible.
+    """
+    offsets, neighbours = _undirected_adjacency(n, sources, targets)
+    labels = array("I", range(n))
+    order = list(range(n))
+    rng = random.Random(seed)
+    for iteration in range(max_iter):
+        rng.shuffle(order)
+        changed = 0
+        for v in order:
+            start, end = offsets[v], offsets[v + 1]
+            if start == end:
+                continue
+            label = majority_label(labels[v], (labels[u] for u in neighbours[start:end]))
+            if label != labels[v]:
+                labels[v] = label
+                changed += 1
+        print(f"[COMMUNITY] Round {iteration + 1}: {changed} labels changed")
+        if not changed:
+            break
+    return labels
@@ -0,0 +1,155 @@
+import queue
+import threading
+import time
+
+from arango.database import StandardDatabase
+from arango.exceptions import ArangoError
+
+from app.analytics.communities import majority_label
+
+
+class CommunityStore:
+    """Keeps ``component`` and ``community`` labels on users current between job runs.
+
+    A follow between two components relabels the smaller one, so components
+    stay exact as the graph grows. Both endpoints of a follow or unfollow
+    then take one label-propagation step over their neighbours' labels.
+    Unfollows never split a component here; the next community job run
+    does that.
+
+    Follow writes only enqueue the change; a background thread applies up
+    to ``batch_size`` queued changes at a time. The queue is bounded and
+    drops changes when full. Merges rewrite at most ``merge_chunk`` users
+    per query and skip components larger than ``max_merge``. Relabelling
+    looks at no more than ``neighbour_cap`` neighbours per user. Labels are
+    advisory, and the job run repairs anything skipped.
+    """
+
+    def __init__(
+            self,
+            db: StandardDatabase,
+            queue_size: int = 10_000,
+            batch_size: int = 100,
+            merge_chunk: int = 1000,
+            max_merge: int = 100_000,
+            neighbour_cap: int = 1000,
+            pause: float = 0.05,
+    ):
+        self.db = db
+        self.users = db.collection("users")
+        self.batch_size = batch_size
+        self.merge_chunk = merge_chunk
+        self.max_merge = max_merge
+        self.neighbour_cap = neighbour_cap
+        self.pause = pause
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+
+    def on_follow_change(self, follower: str, followed: str, created: bool = True):
+        try:
+            self._queue.put_nowait((follower, followed, created))
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                print(f"[WARN] Community update queue full, {self.dropped} changes dropped so far")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="community-updates", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        # Blocks until there is room, so the worker always sees the sentinel
+        self._queue.put(None)
+
+    def _run(self):
+        while (change := self._queue.get()) is not None:
+            changes = [change]
+            while len(changes) < self.batch_size:
+                try:
+                    change = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if change is None:
+                    self.apply_changes(changes)
+                    return
+                changes.append(change)
+            self.apply_changes(changes)
+
+    def apply_changes(self, changes: list[tuple[str, str, bool]]):
+        """Merge components for new follows, then relabel every endpoint once."""
+        try:
+            for follower, followed in dict.fromkeys((a, b) for a, b, created in changes if created):
+                self.merge_components(follower, followed)
+            self.relabel_communities(list(dict.fromkeys(name for a, b, _ in changes for name in (a, b))))
+        except ArangoError as e:
+            # Labels are advisory; the next job run repairs them
+            print(f"[WARN] Community update for {len(changes)} follow changes failed: {e}")
+
+    def merge_components(self, a: str, b: str):
+        labels = {doc["_key"]: doc.get("component") for doc in self.users.get_many([a, b])}
+        label_a, label_b = labels.get(a), labels.get(b)
+        if label_a is not None and label_a == label_b:
+            return
+        if label_a is None or label_b is None:
+            # At least one side was created after the last job run
+            label = label_a or label_b or a
+            for name, current in labels.items():
+                if current is None:
+                    self.users.update({"_key": name, "component": label})
+            return
+
+        sizes = list(self.db.aql.execute(
+            """
+            FOR label IN @labels
+                RETURN LENGTH(FOR u IN users FILTER u.component == label LIMIT @cap RETURN 1)
+            """,
+            bind_vars={"labels": [label_a, label_b], "cap": self.max_merge + 1},
+        ))
+        smaller, larger = (label_a, label_b) if sizes[0] < sizes[1] else (label_b, label_a)
+        if min(sizes) > self.max_merge:
+            print(f"[COMMUNITY] Components {smaller} and {larger} too large to merge; left to the job")
+            return
+        while True:
+            # Served by the sparse users_component index, one chunk per query
+            moved = len(list(self.db.aql.execute(
+                """
+                FOR u IN users
+                    FILTER u.component == @from
+                    LIMIT @chunk
+                    UPDATE u WITH { component: @to } IN users
+                    RETURN 1
+                """,
+                bind_vars={"from": smaller, "to": larger, "chunk": self.merge_chunk},
+            )))
+            if moved < self.merge_chunk:
+                break
+            time.sleep(self.pause)
+        print(f"[COMMUNITY] Merged component {smaller} into {larger}")
+
+    def relabel_communities(self, usernames: list[str]):
+        if not usernames:
+            return
+        rows = self.db.aql.execute(
+            """
+            FOR name IN @usernames
+                FOR u IN users
+                    FILTER u._key == name
+                    LET labels = (
+                        FOR v IN 1..1 ANY u follows
+                            LIMIT @cap
+                            FILTER v.community != null
+                            RETURN v.community
+                    )
+                    RETURN [u._key, u.community, labels]
+            """,
+            bind_vars={"usernames": usernames, "cap": self.neighbour_cap},
+        )
+        changed = []
+        for username, current, neighbour_labels in rows:
+            label = majority_label(current or username, neighbour_labels)
+            if label != current:
+                changed.append({"_key": username, "community": label})
+        if changed:
+            self.users.update_many(changed)
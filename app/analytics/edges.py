@@ -0,0 +1,69 @@
+from array import array
+from typing import Iterator
+
+from arango.database import StandardDatabase
+
+from app.cursors import stream_cursor
+
+
+class EdgeList:
+    """The whole follow graph as parallel integer arrays.
+
+    Vertex ids are dense (``0 .. n-1``) in the order users were first seen;
+    ``names[v]`` maps back to the username. Edges are stored as unsigned
+    32-bit ``sources``/``targets`` arrays, about 8 bytes per follow, and can
+    be handed to NumPy without copying.
+    """
+
+    def __init__(self):
+        self.names: list[str] = []
+        self.index: dict[str, int] = {}
+        self.sources = array("I")
+        self.targets = array("I")
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.sources)
+
+    def vertex(self, name: str) -> int:
+        vertex = self.index.get(name)
+        if vertex is None:
+            vertex = self.index[name] = len(self.names)
+            self.names.append(name)
+        return vertex
+
+    def add_edge(self, follower: str, followed: str):
+        self.sources.append(self.vertex(follower))
+        self.targets.append(self.vertex(followed))
+
+
+def stream_users(db: StandardDatabase, batch_size: int = 10_000) -> Iterator[str]:
+    cursor = db.aql.execute("FOR u IN users RETURN u._key", stream=True, batch_size=batch_size)
+    yield from stream_cursor(cursor)
+
+
+def stream_edges(db: StandardDatabase, batch_size: int = 10_000) -> Iterator[tuple[str, str]]:
+    # Streaming cursor: the server never materialises the full edge set
+    cursor = db.aql.execute(
+        "FOR e IN follows RETURN [PARSE_IDENTIFIER(e._from).key, PARSE_IDENTIFIER(e._to).key]",
+        stream=True,
+        batch_size=batch_size,
+    )
+    for follower, followed in stream_cursor(cursor):
+        yield follower, followed
+
+
+def load_edge_list(db: StandardDatabase, batch_size: int = 10_000) -> EdgeList:
+    """Load every user and follow edge; users without edges become isolated vertices."""
+    graph = EdgeList()
+    for name in stream_users(db, batch_size):
+        graph.vertex(name)
+    for follower, followed in stream_edges(db, batch_size):
+        graph.add_edge(follower, followed)
+        if graph.edge_count % 1_000_000 == 0:
+            print(f"[ANALYTICS] Loaded {graph.edge_count} edges")
+    print(f"[ANALYTICS] Loaded {len(graph)} users and {graph.edge_count} edges")
+    return graph
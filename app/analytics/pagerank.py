@@ -0,0 +1,128 @@
+"""PageRank and degree statistics over an in-memory edge list.
+
+With NumPy installed the iteration is vectorised (a SciPy CSR matrix-vector
+product when SciPy is available too, ``numpy.bincount`` otherwise), which
+handles tens of millions of edges in seconds per iteration. Without NumPy a
+pure-Python power iteration gives identical results, only far slower; the
+batch job refuses to use it unless asked to (see ``backend``).
+"""
+from array import array
+from typing import Sequence
+
+try:
+    import numpy as np
+except ImportError:  # optional
+    np = None
+
+try:
+    from scipy.sparse import csr_matrix
+except ImportError:  # optional
+    csr_matrix = None
+
+
+def backend() -> str:
+    """``scipy``, ``numpy`` or ``python``: the implementation ``pagerank`` uses."""
+    if np is None:
+        return "python"
+    return "scipy" if csr_matrix is not None else "numpy"
+
+
+def pagerank(
+        n: int,
+        sources: array,
+        targets: array,
+        damping: float = 0.85,
+        tol: float = 1e-6,
+        max_iter: int = 100,
+) -> Sequence[float]:
+    """Scores for vertices ``0 .. n-1``, summing to 1.
+
+    Edges point from follower to followed, so rank flows towards the
+    followed user. Users who follow nobody spread their rank uniformly.
+    Iteration stops once the L1 change between rounds drops below ``tol``.
+    """
+    if n == 0:
+        return []
+    if np is not None:
+        return _pagerank_numpy(n, sources, targets, damping, tol, max_iter)
+    return _pagerank_python(n, sources, targets, damping, tol, max_iter)
+
+
+def _pagerank_numpy(n, sources, targets, damping, tol, max_iter):
+    src = np.frombuffer(sources, dtype=np.uint32) if len(sources) else np.zeros(0, dtype=np.uint32)
+    dst = np.frombuffer(targets, dtype=np.uint32) if len(targets) else np.zeros(0, dtype=np.uint32)
+    out_degree = np.bincount(src, minlength=n).astype(np.float64)
+    dangling = out_degree == 0
+    inverse = np.zeros(n)
+    np.divide(1.0, out_degree, out=inverse, where=~dangling)
+
+    transition = None
+    if csr_matrix is not None:
+        transition = csr_matrix((inverse[src], (dst, src)), shape=(n, n))
+
+    ranks = np.full(n, 1.0 / n)
+    for iteration in range(max_iter):
+        if transition is not None:
+            spread = transition @ ranks
+        else:
+            spread = np.bincount(dst, weights=(ranks * inverse)[src], minlength=n)
+        updated = damping * spread + (damping * ranks[dangling].sum() + 1.0 - damping) / n
+        change = np.abs(updated - ranks).sum()
+        ranks = updated
+        if change < tol:
+            break
+    print(f"[PAGERANK] Converged after {iteration + 1} iterations (change {change:.2e})")
+    return ranks
+
+
+def _pagerank_python(n, sources, targets, damping, tol, max_iter):
+    out_degree = [0] * n
+    for s in sources:
+        out_degree[s] += 1
+    dangling = [v for v in range(n) if not out_degree[v]]
+
+    ranks = [1.0 / n] * n
+    for iteration in range(max_iter):
+        share = [r / d if d else 0.0 for r, d in zip(ranks, out_degree)]
+        base = (damping * sum(ranks[v] for v in dangling) + 1.0 - damping) / n
+        spread = [0.0] * n
+        for s, t in zip(sources, targets):
+            spread[t] += share[s]
+        updated = [base + damping * x for x in spread]
+        change = sum(abs(a - b) for a, b in zip(updated, ranks))
+        ranks = updated
+        if change < tol:
+            break
+    print(f"[PAGERANK] Converged after {iteration + 1} iterations (change {change:.2e})")
+    return ranks
+
+
+def rank_order(scores: Sequence[float]) -> list[int]:
+    """Vertex ids from highest to lowest score."""
+    if np is not None and isinstance(scores, np.ndarray):
+        return np.argsort(-scores, kind="stable").tolist()
+    return sorted(range(len(scores)), key=lambda v: -scores[v])
+
+
+def degrees(n: int, edges: array) -> array:
+    if np is not None and len(edges):
+        return array("I", np.bincount(np.frombuffer(edges, dtype=np.uint32), minlength=n).astype(np.uint32))
+    counts = array("I", bytes(4 * n))
+    for v in edges:
+        counts[v] += 1
+    return counts
+
+
+def degree_stats(n: int, sources: array, targets: array) -> dict:
+    """Summary of the in-degree (followers) and out-degree (following) distributions."""
+    stats = {"users": n, "edges": len(sources)}
+    for name, edges in (("in", targets), ("out", sources)):
+        ordered = sorted(degrees(n, edges))
+        stats[f"{name}_degree"] = {
+            "max": ordered[-1] if n else 0,
+            "mean": len(edges) / n if n else 0.0,
+            "median": ordered[n // 2] if n else 0,
+            "p99": ordered[min(n - 1, int(n * 0.99))] if n else 0,
+            "zero": ordered.count(0) if n else 0,
+        }
+    return stats
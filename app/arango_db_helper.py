@@ -9,6 +9,10 @@ from app.config import settings
 class CollectionTypes(Enum):
     users = ("users", False)
     follows = ("follows", True)
+    counters = ("counters", False)
+    follow_tombstones = ("follow_tombstones", False)
+    reach_sketches = ("reach_sketches", False)
+    blocks = ("blocks", True)
 
 
 class ArangoDBHelper:
@@ -24,7 +28,22 @@ class ArangoDBHelper:
 
         self._ensure_database_exists()
         self.db = self._connect_to_database()
+        self.read_db = self._connect_read_pool()
         self.collections = self._create_collections()
+        self._ensure_graph()
+        self._ensure_indexes()
+
+    def reconnect(self):
+        """Replace the HTTP clients with new ones without re-running setup.
+
+        A forked process inherits the parent's pooled sockets; sharing them
+        interleaves requests on one connection, so children call this first.
+        """
+        print(f"[CONNECT] Opening new connections to '{self.db_name}'...")
+        self.client = ArangoClient(hosts=settings.arango_url)
+        self.db = self._connect_to_database()
+        self.read_db = self._connect_read_pool()
+        self.collections = {name: self.db.collection(name) for name in self.collections}
 
     def _ensure_database_exists(self):
         print("[CHECK] Ensuring database exists...")
@@ -49,11 +68,64 @@ class ArangoDBHelper:
         print(f"[OK] Connected to '{self.db_name}'")
         return db
 
+    def _connect_read_pool(self):
+        read_hosts = self._split_keys(settings.arango_read_urls)
+        if not read_hosts:
+            return self.db
+
+        print(f"[CONNECT] Routing reads to {len(read_hosts)} read coordinator(s)...")
+        self.read_client = ArangoClient(hosts=read_hosts, host_resolver="roundrobin")
+        return self.read_client.db(
+            self.db_name,
+            username=settings.arango_user,
+            password=settings.arango_password,
+        )
+
+    @staticmethod
+    def _split_keys(value: str | None) -> list[str] | None:
+        if not value:
+            return None
+        return [key.strip() for key in value.split(",") if key.strip()]
+
+    def _collection_options(self, collection: CollectionTypes) -> dict:
+        # Sharding only matters in a cluster; single servers ignore these
+        options = {
+            "shard_count": settings.arango_shard_count,
+            "replication_factor": settings.arango_replication_factor,
+        }
+        if collection is CollectionTypes.users:
+            options["shard_fields"] = self._split_keys(settings.arango_users_shard_keys)
+        elif collection in (CollectionTypes.follows, CollectionTypes.blocks):
+            options["shard_fields"] = self._split_keys(settings.arango_follows_shard_keys)
+            if settings.arango_follows_distribute_like_users:
+                options["shard_like"] = CollectionTypes.users.value[0]
+        elif collection is CollectionTypes.counters:
+            options["shard_count"] = 1
+        return {key: value for key, value in options.items() if value is not None}
+
+    def _edge_definitions(self) -> list[dict]:
+        return [{
+            "edge_collection": CollectionTypes.follows.value[0],
+            "from_vertex_collections": [CollectionTypes.users.value[0]],
+            "to_vertex_collections": [CollectionTypes.users.value[0]],
+        }]
+
+    def _ensure_graph(self):
+        if self.db.has_graph(settings.arango_graph_name):
+            print(f"[OK] Graph '{settings.arango_graph_name}' already exists.")
+            return
+        print(f"[CREATE] Graph '{settings.arango_graph_name}' does not exist. Creating...")
+        self.db.create_graph(settings.arango_graph_name, edge_definitions=self._edge_definitions())
+
     def _create_collections(
         self,
         collections: tuple[CollectionTypes, ...] = (
             CollectionTypes.users,
             CollectionTypes.follows,
+            CollectionTypes.counters,
+            CollectionTypes.follow_tombstones,
+            CollectionTypes.reach_sketches,
+            CollectionTypes.blocks,
         ),
     ):
         print("[COLLECTIONS] Ensuring required collections exist...")
@@ -63,13 +135,43 @@ class ArangoDBHelper:
             name, is_edge = collection.value
             if not self.db.has_collection(name):
                 print(f"[CREATE] Collection '{name}' does not exist. Creating (edge={is_edge})...")
-                self.db.create_collection(name, edge=is_edge)
+                self.db.create_collection(name, edge=is_edge, **self._collection_options(collection))
             else:
                 print(f"[OK] Collection '{name}' already exists.")
             result[name] = self.db.collection(name)
 
         return result
 
+    def _ensure_indexes(self):
+        print("[INDEXES] Ensuring required indexes exist...")
+        # Resolves interned user ids back to usernames
+        self.collections[CollectionTypes.users.value[0]].add_persistent_index(
+            fields=["uid"], unique=True, sparse=True, name="users_uid"
+        )
+        # Top influencers, written by the PageRank job
+        self.collections[CollectionTypes.users.value[0]].add_persistent_index(
+            fields=["influenceRank"], sparse=True, name="users_influence_rank"
+        )
+        # Component relabelling on merges, written by the community job
+        self.collections[CollectionTypes.users.value[0]].add_persistent_index(
+            fields=["component"], sparse=True, name="users_component"
+        )
+        # Followers gained since a watermark: equality on _to, range on followedAt
+        self.collections[CollectionTypes.follows.value[0]].add_persistent_index(
+            fields=["_to", "followedAt"], name="follows_to_followed_at"
+        )
+        # Top-k-by-recency expansion: equality on _from, sorted by followedAt
+        self.collections[CollectionTypes.follows.value[0]].add_persistent_index(
+            fields=["_from", "followedAt"], name="follows_from_followed_at"
+        )
+        tombstones = self.collections[CollectionTypes.follow_tombstones.value[0]]
+        tombstones.add_persistent_index(
+            fields=["followed", "removedAt"], name="follow_tombstones_followed_removed_at"
+        )
+        tombstones.add_ttl_index(
+            fields=["removedAt"], expiry_time=settings.follow_tombstone_ttl, name="follow_tombstones_ttl"
+        )
+
     def get_collection(self, name: str) -> Union[StandardCollection, EdgeCollection]:
         print(f"[ACCESS] Getting collection '{name}'")
         return self.collections[name]
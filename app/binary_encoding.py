@@ -0,0 +1,101 @@
+"""Compact encodings of follow records for service-to-service callers.
+
+``application/x-follow-columnar`` (no dependencies), big-endian:
+
+    b"FC1"  uint32 count
+    int64[count]  followedAt as epoch microseconds (-1 when unknown)
+    count x (uint16 length, utf-8 username)
+
+``application/msgpack`` (needs the optional ``msgpack`` package) carries
+the same columns as ``{"followed": [...], "followed_at": [...]}``.
+"""
+import struct
+from datetime import datetime, timedelta, UTC
+
+from fastapi import Response
+
+try:
+    import msgpack
+except ImportError:  # optional
+    msgpack = None
+
+COLUMNAR = "application/x-follow-columnar"
+MSGPACK = "application/msgpack"
+
+_MAGIC = b"FC1"
+_COUNT = struct.Struct(">I")
+_LENGTH = struct.Struct(">H")
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+_MICROSECOND = timedelta(microseconds=1)
+_UNKNOWN = -1
+
+
+def _epoch_micros(value: str | None) -> int:
+    if not value:
+        return _UNKNOWN
+    timestamp = datetime.fromisoformat(value)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=UTC)
+    # timedelta arithmetic keeps the microseconds exact
+    return (timestamp - _EPOCH) // _MICROSECOND
+
+
+def _from_epoch_micros(value: int) -> str | None:
+    if value == _UNKNOWN:
+        return None
+    return (_EPOCH + value * _MICROSECOND).isoformat()
+
+
+def negotiate(accept: str | None) -> str | None:
+    """Binary media type the client asked for, or None for JSON."""
+    if not accept:
+        return None
+    requested = [part.split(";")[0].strip().lower() for part in accept.split(",")]
+    for media_type in requested:
+        if media_type == COLUMNAR:
+            return COLUMNAR
+        if media_type == MSGPACK and msgpack is not None:
+            return MSGPACK
+    return None
+
+
+def encode_columnar(records: list[dict]) -> bytes:
+    names = [(r.get("followed") or "").encode() for r in records]
+    times = [_epoch_micros(r.get("followedAt")) for r in records]
+    parts = [_MAGIC, _COUNT.pack(len(records)), struct.pack(f">{len(times)}q", *times)]
+    for name in names:
+        parts.append(_LENGTH.pack(len(name)))
+        parts.append(name)
+    return b"".join(parts)
+
+
+def decode_columnar(data: bytes) -> list[dict]:
+    if data[:3] != _MAGIC:
+        raise ValueError("Not a follow-columnar payload")
+    (count,) = _COUNT.unpack_from(data, 3)
+    offset = 3 + _COUNT.size
+    times = struct.unpack_from(f">{count}q", data, offset)
+    offset += 8 * count
+    records = []
+    for followed_at in times:
+        (length,) = _LENGTH.unpack_from(data, offset)
+        offset += _LENGTH.size
+        name = data[offset:offset + length].decode()
+        offset += length
+        records.append({"followed": name, "followedAt": _from_epoch_micros(followed_at)})
+    return records
+
+
+def encode(records: list[dict], media_type: str) -> bytes:
+    if media_type == COLUMNAR:
+        return encode_columnar(records)
+    if media_type == MSGPACK:
+        return msgpack.packb({
+            "followed": [r.get("followed") for r in records],
+            "followed_at": [_epoch_micros(r.get("followedAt")) for r in records],
+        })
+    raise ValueError(f"Unsupported media type {media_type!r}")
+
+
+def render(records: list[dict], media_type: str, headers: dict = None) -> Response:
+    return Response(content=encode(records, media_type), media_type=media_type, headers=headers)
@@ -0,0 +1,376 @@
+import json
+import socket
+import threading
+import time
+import uuid
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable
+from urllib.parse import urlparse
+
+# Values are stored as a one-byte tag followed by the payload:
+#   b"j"  compact JSON
+#   b"r"  follow records in columnar form: [[usernames...], [followedAt...]]
+#   b"z"  zlib-compressed form of one of the above
+_COMPRESS_THRESHOLD = 1024
+_RECORD_KEYS = {"followed", "followedAt"}
+
+
+def serialize(value: Any) -> bytes:
+    if (
+            isinstance(value, list)
+            and value
+            and all(isinstance(r, dict) and r.keys() == _RECORD_KEYS for r in value)
+    ):
+        payload = b"r" + json.dumps(
+            [[r["followed"] for r in value], [r["followedAt"] for r in value]],
+            separators=(",", ":"),
+        ).encode()
+    else:
+        payload = b"j" + json.dumps(value, separators=(",", ":")).encode()
+
+    if len(payload) > _COMPRESS_THRESHOLD:
+        return b"z" + zlib.compress(payload, 1)
+    return payload
+
+
+def deserialize(data: bytes) -> Any:
+    if data[:1] == b"z":
+        data = zlib.decompress(data[1:])
+    kind, body = data[:1], data[1:]
+    if kind == b"r":
+        names, times = json.loads(body)
+        return [{"followed": n, "followedAt": t} for n, t in zip(names, times)]
+    return json.loads(body)
+
+
+class CacheBackend(ABC):
+    """Key/value cache with tag-based invalidation and change broadcasting.
+
+    Tags let one write invalidate every key derived from a vertex without the
+    writer knowing the keys. Invalidation messages are broadcast so that
+    per-process caches in other replicas can drop their own entries.
+    """
+
+    def __init__(self):
+        self.origin = uuid.uuid4().hex
+        self._subscribers: list[Callable[[dict], None]] = []
+
+    @abstractmethod
+    def get_many(self, keys: list[str]) -> dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def set_many(self, values: dict[str, Any], ttl: int = None, tags: list[str] = None):
+        ...
+
+    @abstractmethod
+    def delete(self, keys: list[str], tags: list[str] = ()):
+        ...
+
+    @abstractmethod
+    def publish(self, message: dict):
+        ...
+
+    def get(self, key: str) -> Any:
+        return self.get_many([key]).get(key)
+
+    def set(self, key: str, value: Any, ttl: int = None, tags: list[str] = None):
+        self.set_many({key: value}, ttl=ttl, tags=tags)
+
+    def subscribe(self, callback: Callable[[dict], None]):
+        # callback(message) runs for invalidations published by other replicas
+        self._subscribers.append(callback)
+
+    def _dispatch(self, message: dict):
+        if message.get("origin") == self.origin:
+            return
+        for callback in self._subscribers:
+            callback(message)
+
+    def close(self):
+        pass
+
+
+class LocalLRUBackend(CacheBackend):
+    def __init__(self, max_entries: int = 10_000, default_ttl: int = None):
+        super().__init__()
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[bytes, float | None]] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+        self._key_tags: dict[str, set[str]] = {}
+
+    def _drop(self, key: str):
+        # Caller holds the lock; forgets the key in its tags so they don't grow forever
+        self._entries.pop(key, None)
+        for tag in self._key_tags.pop(key, ()):
+            members = self._tags.get(tag)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._tags[tag]
+
+    def get_many(self, keys: list[str]) -> dict[str, Any]:
+        found = {}
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                item = self._entries.get(key)
+                if item is None:
+                    continue
+                data, expires_at = item
+                if expires_at is not None and expires_at <= now:
+                    self._drop(key)
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = data
+        return {key: deserialize(data) for key, data in found.items()}
+
+    def set_many(self, values: dict[str, Any], ttl: int = None, tags: list[str] = None):
+        ttl = ttl if ttl is not None else self.default_ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        encoded = {key: serialize(value) for key, value in values.items()}
+        with self._lock:
+            for key, data in encoded.items():
+                self._entries[key] = (data, expires_at)
+                self._entries.move_to_end(key)
+            for tag in tags or ():
+                self._tags.setdefault(tag, set()).update(encoded)
+                for key in encoded:
+                    self._key_tags.setdefault(key, set()).add(tag)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def delete(self, keys: list[str], tags: list[str] = ()):
+        with self._lock:
+            doomed = set(keys)
+            for tag in tags:
+                doomed |= self._tags.pop(tag, set())
+            for key in doomed:
+                self._drop(key)
+
+    def publish(self, message: dict):
+        # A local cache has no other replicas to notify
+        pass
+
+
+class RedisProtocolError(Exception):
+    pass
+
+
+# Anything that means Redis could not answer; the cache is skipped, not the request
+_REDIS_ERRORS = (RedisProtocolError, ConnectionError, OSError, ValueError)
+
+
+class _RespConnection:
+    """Minimal RESP2 connection with pipelining."""
+
+    def __init__(self, host: str, port: int, db: int = 0, timeout: float = 5.0):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.reader = self.sock.makefile("rb")
+        if db:
+            self.pipeline([("SELECT", db)])
+
+    @staticmethod
+    def _encode(command) -> bytes:
+        parts = [b"*%d\r\n" % len(command)]
+        for arg in command:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    def pipeline(self, commands) -> list:
+        # All commands go out in one write; replies are read back in order
+        self.sock.sendall(b"".join(self._encode(c) for c in commands))
+        replies = [self.read_reply() for _ in commands]
+        for reply in replies:
+            if isinstance(reply, RedisProtocolError):
+                raise reply
+        return replies
+
+    def read_reply(self):
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            return RedisProtocolError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length == -1:
+                return None
+            data = self.reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(rest)
+            if length == -1:
+                return None
+            return [self.read_reply() for _ in range(length)]
+        raise RedisProtocolError(f"Unexpected reply type {kind!r}")
+
+    def close(self):
+        # Shut the socket down first so a thread blocked reading wakes up
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class RedisBackend(CacheBackend):
+    """Shared cache tier speaking the Redis protocol.
+
+    Tag membership lives in Redis sets (``tag:<name>``) so any replica can
+    invalidate keys written by another one. Reads and writes for several keys
+    are pipelined into a single round-trip.
+
+    Redis is treated as optional once running: a failed read is a miss, a
+    failed write, delete or publish is logged and dropped (entries still
+    expire by TTL), and a broken connection is replaced on the next call.
+    """
+
+    def __init__(
+            self,
+            url: str = "redis://localhost:6379/0",
+            default_ttl: int = 60,
+            channel: str = "follow-cache-invalidation",
+            key_prefix: str = "follow:",
+    ):
+        super().__init__()
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.default_ttl = default_ttl
+        self.channel = channel
+        self.key_prefix = key_prefix
+        self._lock = threading.Lock()
+        self._conn = _RespConnection(self.host, self.port, self.db)
+        self._listener: threading.Thread | None = None
+        self._listener_conn: _RespConnection | None = None
+        self._closed = False
+        print(f"[CACHE] Connected to Redis cache at {self.host}:{self.port}/{self.db}")
+
+    def _key(self, key: str) -> str:
+        return f"{self.key_prefix}{key}"
+
+    def _tag(self, tag: str) -> str:
+        return f"{self.key_prefix}tag:{tag}"
+
+    def _execute(self, commands) -> list:
+        with self._lock:
+            try:
+                if self._conn is None:
+                    self._conn = _RespConnection(self.host, self.port, self.db)
+                return self._conn.pipeline(commands)
+            except (ConnectionError, OSError, ValueError):
+                # Replies may be out of step with requests now; start over next call
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+                raise
+
+    def _try_execute(self, commands, action: str) -> list | None:
+        try:
+            return self._execute(commands)
+        except _REDIS_ERRORS as e:
+            print(f"[WARN] Redis cache {action} failed: {e}")
+            return None
+
+    def get_many(self, keys: list[str]) -> dict[str, Any]:
+        if not keys:
+            return {}
+        replies = self._try_execute([("MGET", *(self._key(k) for k in keys))], "read")
+        if replies is None:
+            return {}
+        values = replies[0]
+        return {key: deserialize(data) for key, data in zip(keys, values) if data is not None}
+
+    def set_many(self, values: dict[str, Any], ttl: int = None, tags: list[str] = None):
+        if not values:
+            return
+        ttl = ttl if ttl is not None else self.default_ttl
+        commands = []
+        for key, value in values.items():
+            command = ["SET", self._key(key), serialize(value)]
+            if ttl:
+                command += ["EX", ttl]
+            commands.append(command)
+        for tag in tags or ():
+            commands.append(("SADD", self._tag(tag), *(self._key(k) for k in values)))
+            if ttl:
+                commands.append(("EXPIRE", self._tag(tag), ttl))
+        self._try_execute(commands, "write")
+
+    def delete(self, keys: list[str], tags: list[str] = ()):
+        doomed = [self._key(k) for k in keys]
+        if tags:
+            members = self._try_execute([("SMEMBERS", self._tag(t)) for t in tags], "tag lookup") or []
+            for tag_members in members:
+                doomed.extend(m.decode() for m in tag_members or ())
+            doomed.extend(self._tag(t) for t in tags)
+        if doomed:
+            self._try_execute([("DEL", *doomed)], "delete")
+
+    def publish(self, message: dict):
+        payload = json.dumps({**message, "origin": self.origin}, separators=(",", ":"))
+        self._try_execute([("PUBLISH", self.channel, payload)], "publish")
+
+    def subscribe(self, callback: Callable[[dict], None]):
+        super().subscribe(callback)
+        if self._listener is None:
+            self._listener_conn = _RespConnection(self.host, self.port, self.db, timeout=None)
+            self._listener_conn.pipeline([("SUBSCRIBE", self.channel)])
+            self._listener = threading.Thread(target=self._listen, daemon=True)
+            self._listener.start()
+
+    def _listen(self):
+        delay = 0.1
+        while not self._closed:
+            try:
+                if self._listener_conn is None:
+                    conn = _RespConnection(self.host, self.port, self.db, timeout=None)
+                    conn.pipeline([("SUBSCRIBE", self.channel)])
+                    self._listener_conn = conn
+                    print("[CACHE] Invalidation subscription restored")
+                reply = self._listener_conn.read_reply()
+                delay = 0.1
+            except _REDIS_ERRORS as e:
+                if self._closed:
+                    break
+                # Invalidations sent meanwhile are lost; TTLs bound the staleness
+                print(f"[WARN] Invalidation subscription lost ({e}), retrying in {delay:.1f}s")
+                if self._listener_conn is not None:
+                    self._listener_conn.close()
+                    self._listener_conn = None
+                time.sleep(delay)
+                delay = min(delay * 2, 30.0)
+                continue
+            if isinstance(reply, list) and reply and reply[0] == b"message":
+                self._dispatch(json.loads(reply[2]))
+
+    def close(self):
+        self._closed = True
+        if self._conn is not None:
+            self._conn.close()
+        if self._listener_conn is not None:
+            self._listener_conn.close()
+
+
+def create_cache_backend(kind: str, **options) -> CacheBackend | None:
+    if kind == "local":
+        return LocalLRUBackend(
+            max_entries=options.get("max_entries", 10_000),
+            default_ttl=options.get("ttl"),
+        )
+    if kind == "redis":
+        return RedisBackend(url=options["url"], default_ttl=options.get("ttl", 60))
+    return None
@@ -0,0 +1,179 @@
+import threading
+import time
+from typing import Callable
+
+
+class RequestFrequency:
+    """Decayed request counts for the most requested usernames.
+
+    Counts are halved every ``half_life`` seconds, so users whose traffic
+    stops drop out within a few half-lives. At most ``capacity`` names are
+    tracked; a new name replaces the least requested one.
+    """
+
+    def __init__(self, capacity: int = 10_000, half_life: float = 300.0, clock=time.monotonic):
+        self.capacity = capacity
+        self.half_life = half_life
+        self.clock = clock
+        self._counts: dict[str, float] = {}
+        self._decayed_at = clock()
+        self._lock = threading.Lock()
+
+    def record(self, username: str):
+        with self._lock:
+            self._decay()
+            if username not in self._counts and len(self._counts) >= self.capacity:
+                coldest = min(self._counts, key=self._counts.get)
+                del self._counts[coldest]
+            self._counts[username] = self._counts.get(username, 0.0) + 1.0
+
+    def top(self, n: int, min_count: float = 0.0) -> list[str]:
+        with self._lock:
+            self._decay()
+            ranked = sorted(self._counts.items(), key=lambda item: -item[1])
+        return [name for name, count in ranked[:n] if count >= min_count]
+
+    def _decay(self):
+        halvings = int((self.clock() - self._decayed_at) / self.half_life)
+        if not halvings:
+            return
+        factor = 0.5 ** halvings
+        self._counts = {name: c * factor for name, c in self._counts.items() if c * factor >= 0.5}
+        self._decayed_at += halvings * self.half_life
+
+
+class KHopMaterialiser:
+    """Precomputed BFS neighbourhoods of the most requested users.
+
+    A background loop materialises depths ``2 .. max_depth`` for the
+    ``max_users`` users with the most BFS requests, stored column-wise as
+    two tuples rather than one dict per record. A follow or unfollow by any
+    vertex in a neighbourhood marks it dirty; dirty neighbourhoods are not
+    served and are rebuilt on the next refresh, so only the affected users
+    are recomputed. Users that fall out of the top set are dropped.
+    """
+
+    def __init__(
+            self,
+            compute: Callable[[str, int], list[dict]],
+            max_depth: int = 2,
+            max_users: int = 100,
+            min_requests: float = 20.0,
+            max_records: int = 200_000,
+            refresh_interval: float = 5.0,
+            frequency: RequestFrequency = None,
+    ):
+        self.compute = compute
+        self.depths = range(2, max(max_depth, 2) + 1)
+        self.max_users = max_users
+        self.min_requests = min_requests
+        self.max_records = max_records
+        self.refresh_interval = refresh_interval
+        self.frequency = frequency or RequestFrequency()
+
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[str, int], tuple[tuple, tuple]] = {}
+        self._touched: dict[tuple[str, int], frozenset[str]] = {}
+        self._by_vertex: dict[str, set[tuple[str, int]]] = {}
+        self._dirty: set[tuple[str, int]] = set()
+        self._building: set[tuple[str, int]] = set()
+        self._oversized: set[tuple[str, int]] = set()
+        self._stop = threading.Event()
+        self._thread = None
+        self.hits = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def record_request(self, username: str):
+        self.frequency.record(username)
+
+    def get(self, username: str, depth: int) -> list[dict] | None:
+        key = (username, depth)
+        with self._lock:
+            columns = self._entries.get(key)
+            if columns is None or key in self._dirty:
+                return None
+            self.hits += 1
+        return [{"followed": name, "followedAt": at} for name, at in zip(*columns)]
+
+    def on_follow_change(self, follower: str, followed: str, created: bool = True):
+        with self._lock:
+            keys = self._by_vertex.get(follower, set()) | self._building
+            self._dirty.update(keys)
+        if keys:
+            print(f"[KHOP] Follow change by '{follower}' dirtied {len(keys)} neighbourhoods")
+
+    def refresh(self) -> int:
+        """Materialise the current top users; return how many neighbourhoods were built."""
+        hot = self.frequency.top(self.max_users, self.min_requests)
+        wanted = {(name, depth) for name in hot for depth in self.depths}
+        with self._lock:
+            for key in [k for k in self._entries if k not in wanted]:
+                self._remove(key)
+            self._oversized &= wanted
+            pending = [
+                k for k in wanted
+                if (k not in self._entries or k in self._dirty) and k not in self._oversized
+            ]
+
+        built = 0
+        for key in pending:
+            with self._lock:
+                self._building.add(key)
+                self._dirty.discard(key)
+            try:
+                records = self.compute(*key)
+            except Exception as e:
+                print(f"[WARN] Materialising {key[1]}-hop neighbourhood of '{key[0]}' failed: {e}")
+                with self._lock:
+                    self._building.discard(key)
+                continue
+            with self._lock:
+                self._building.discard(key)
+                # A write during the build leaves the key dirty for next time
+                dirty = key in self._dirty
+                if key in self._entries:
+                    self._remove(key)
+                if len(records) > self.max_records:
+                    self._oversized.add(key)
+                    continue
+                touched = frozenset([key[0], *(r["followed"] for r in records)])
+                self._entries[key] = (
+                    tuple(r["followed"] for r in records),
+                    tuple(r.get("followedAt") for r in records),
+                )
+                if dirty:
+                    self._dirty.add(key)
+                self._touched[key] = touched
+                for vertex in touched:
+                    self._by_vertex.setdefault(vertex, set()).add(key)
+            built += 1
+        if built:
+            print(f"[KHOP] Materialised {built} neighbourhoods ({len(self._entries)} held)")
+        return built
+
+    def _remove(self, key: tuple[str, int]):
+        self._entries.pop(key, None)
+        self._dirty.discard(key)
+        for vertex in self._touched.pop(key, ()):
+            keys = self._by_vertex.get(vertex)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_vertex[vertex]
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"[WARN] K-hop refresh failed: {e}")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="khop-materialiser", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+
+
+@dataclass
+class _Entry:
+    value: list[dict]
+    version: int
+    touched: frozenset[str]
+    stored_at: float = field(default_factory=time.monotonic)
+    stale: bool = False
+    refreshing: bool = False
+
+
+class TraversalCache:
+    """LRU cache of traversal results keyed by ``(username, depth, mode)``.
+
+    Every follow write bumps a monotonically increasing graph version and
+    invalidates only the entries whose traversal touched the follower, since
+    an outbound traversal can only change if one of its visited vertices
+    gained or lost an outbound edge. Results computed concurrently with a
+    write to one of their vertices are never stored.
+    """
+
+    def __init__(
+            self,
+            max_entries: int = 1024,
+            max_records: int = 500_000,
+            stale_while_revalidate: bool = False,
+            stale_ttl: float = 30.0,
+            change_log_size: int = 10_000,
+    ):
+        self.max_entries = max_entries
+        self.max_records = max_records
+        self.stale_while_revalidate = stale_while_revalidate
+        self.stale_ttl = stale_ttl
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, _Entry] = OrderedDict()
+        self._by_vertex: dict[str, set[tuple]] = {}
+        self._records = 0
+        self._version = 0
+        # (version, follower) for recent writes, used to reject results that
+        # raced with a write; anything older than the log is rejected too
+        self._changes: deque[tuple[int, str]] = deque(maxlen=change_log_size)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, username: str, depth: int, mode: str) -> tuple[list[dict] | None, bool]:
+        """Return ``(result, needs_refresh)``; result is None on a miss."""
+        key = (username, depth, mode)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+
+            if entry.stale:
+                if time.monotonic() - entry.stored_at > self.stale_ttl:
+                    self._remove(key)
+                    self.misses += 1
+                    return None, False
+                needs_refresh = not entry.refreshing
+                entry.refreshing = True
+                self.hits += 1
+                return entry.value, needs_refresh
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value, False
+
+    def put(self, username: str, depth: int, mode: str, value: list[dict], version: int) -> bool:
+        """Store a result computed when the graph was at ``version``."""
+        key = (username, depth, mode)
+        touched = frozenset([username, *(r.get("followed") for r in value)])
+        with self._lock:
+            if self._changed_since(version, touched):
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.refreshing = False
+                return False
+
+            if key in self._entries:
+                self._remove(key)
+            if len(value) > self.max_records:
+                return False
+
+            self._entries[key] = _Entry(value=value, version=version, touched=touched)
+            self._records += len(value)
+            for vertex in touched:
+                self._by_vertex.setdefault(vertex, set()).add(key)
+            self._evict()
+            return True
+
+    def on_follow_change(self, follower: str, followed: str, created: bool = True):
+        with self._lock:
+            self._version += 1
+            self._changes.append((self._version, follower))
+            keys = list(self._by_vertex.get(follower, ()))
+            for key in keys:
+                if self.stale_while_revalidate:
+                    entry = self._entries[key]
+                    entry.stale = True
+                    entry.stored_at = time.monotonic()
+                else:
+                    self._remove(key)
+        if keys:
+            print(f"[CACHE] Follow change by '{follower}' invalidated {len(keys)} traversal entries")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_vertex.clear()
+            self._records = 0
+
+    def _changed_since(self, version: int, touched: frozenset[str]) -> bool:
+        if version == self._version:
+            return False
+        if not self._changes or self._changes[0][0] > version + 1:
+            return True
+        for v, vertex in reversed(self._changes):
+            if v <= version:
+                return False
+            if vertex in touched:
+                return True
+        return False
+
+    def _remove(self, key: tuple):
+        entry = self._entries.pop(key)
+        self._records -= len(entry.value)
+        for vertex in entry.touched:
+            keys = self._by_vertex.get(vertex)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_vertex[vertex]
+
+    def _evict(self):
+        while self._entries and (
+                len(self._entries) > self.max_entries or self._records > self.max_records
+        ):
+            self._remove(next(iter(self._entries)))
@@ -0,0 +1,141 @@
+import asyncio
+import gzip
+from typing import Callable
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+_COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/msgpack",
+    "application/x-follow-columnar",
+    "text/",
+)
+
+
+def available_encoders(level: int = 5) -> dict[str, Callable[[bytes], bytes]]:
+    """Encoders in server preference order; brotli/zstd only if installed."""
+    encoders = {}
+    if zstandard is not None:
+        encoders["zstd"] = zstandard.ZstdCompressor(level=min(level, 22)).compress
+    if brotli is not None:
+        encoders["br"] = lambda data: brotli.compress(data, quality=min(level, 11))
+    encoders["gzip"] = lambda data: gzip.compress(data, compresslevel=min(level, 9))
+    return encoders
+
+
+def choose_encoding(accept_encoding: str, encoders: dict) -> str | None:
+    # Highest q-value wins; ties go to the server's preference order
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+
+    best, best_q = None, 0.0
+    for name in encoders:
+        q = weights.get(name, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+class CompressionMiddleware:
+    """Compresses buffered responses above ``minimum_size`` bytes.
+
+    The encoding is negotiated from Accept-Encoding. Compression runs in a
+    worker thread so multi-megabyte traversal payloads do not stall the
+    event loop. Strong ETags get the encoding appended, since the body they
+    identify is now different; ``etag_matches`` strips it again, and a 304
+    answers with the suffixed tag the client holds. Streaming responses pass
+    through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, level: int = 5):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encoders = available_encoders(level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""), self.encoders)
+        if_none_match = request_headers.get("if-none-match", "")
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        chunks = []
+        passthrough = False
+
+        async def buffered_send(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+            elif message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if message.get("more_body", False):
+                    passthrough = True
+                    await send(start)
+                    await send({"type": "http.response.body", "body": b"".join(chunks), "more_body": True})
+                else:
+                    await self._send_compressed(start, b"".join(chunks), encoding, if_none_match, send)
+            else:
+                await send(message)
+
+        await self.app(scope, receive, buffered_send)
+
+    def _should_compress(self, headers: MutableHeaders, status: int, body: bytes) -> bool:
+        return (
+            200 <= status < 300
+            and status != 204
+            and len(body) >= self.minimum_size
+            and "content-encoding" not in headers
+            and headers.get("content-type", "").startswith(_COMPRESSIBLE_TYPES)
+        )
+
+    def _held_etag(self, etag: str, if_none_match: str) -> str:
+        # The 304 must repeat the validator of the copy the client holds,
+        # which is the suffixed tag if that copy was compressed
+        held = {c.strip().removeprefix("W/") for c in if_none_match.split(",")}
+        for name in self.encoders:
+            tag = f'{etag[:-1]}-{name}"'
+            if tag in held:
+                return tag
+        return etag
+
+    async def _send_compressed(self, start: dict, body: bytes, encoding: str, if_none_match: str, send):
+        headers = MutableHeaders(raw=start["headers"])
+        etag = headers.get("etag")
+        if start["status"] == 304 and etag and etag.endswith('"') and not etag.startswith("W/"):
+            headers["ETag"] = self._held_etag(etag, if_none_match)
+        if self._should_compress(headers, start["status"], body):
+            body = await asyncio.to_thread(self.encoders[encoding], body)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            etag = headers.get("etag")
+            if etag and etag.endswith('"') and not etag.startswith("W/"):
+                headers["ETag"] = f'{etag[:-1]}-{encoding}"'
+        headers.add_vary_header("Accept-Encoding")
+        await send(start)
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,32 @@
+from contextlib import closing
+from itertools import islice
+from typing import Callable, Iterator
+
+from arango.cursor import Cursor
+
+
+def stream_cursor(cursor: Cursor, resolve: Callable[[list], list] = None) -> Iterator:
+    """Yield cursor rows one server batch at a time.
+
+    ``resolve`` maps a whole batch at once, so lookups such as uid to
+    username resolution cost one query per batch. If the consumer stops
+    early (``close()``, ``break`` or garbage collection) the server-side
+    cursor is deleted instead of being left to time out.
+    """
+    try:
+        while True:
+            batch = list(cursor.batch())
+            cursor.batch().clear()
+            yield from resolve(batch) if resolve is not None else batch
+            if not cursor.has_more():
+                return
+            cursor.fetch()
+    finally:
+        if cursor.has_more():
+            cursor.close(ignore_missing=True)
+
+
+def first_n(iter_fn: Callable[..., Iterator], limit: int, *args) -> list:
+    # Materialise at most ``limit`` rows and release the rest of the cursor
+    with closing(iter_fn(*args)) as rows:
+        return list(islice(rows, limit))
@@ -0,0 +1,309 @@
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from datetime import datetime as dt, timedelta, UTC
+from typing import Iterator, Optional
+
+from arango.database import StandardDatabase
+
+# Snapshot file layout (native byte order, recorded in the header):
+#
+#   header          MAGIC, format version, byte order flag, vertex count,
+#                   edge count, creation time (epoch microseconds)
+#   name_offsets    u32[n + 1]  offsets into the name blob
+#   out_offsets     u32[n + 1]  CSR row pointers for outbound edges
+#   out_targets     u32[m]      followed vertex ids
+#   out_times       i64[m]      followedAt (epoch microseconds, -1 if unknown)
+#   in_offsets      u32[n + 1]  CSR row pointers for inbound edges
+#   in_sources      u32[m]      follower vertex ids
+#   in_times        i64[m]
+#   names           utf-8 usernames, sorted, so vertex id == rank of the name
+#
+# Every section starts on an 8-byte boundary so it can be exposed directly as a
+# typed memoryview over the mapping without copying.
+
+MAGIC = b"FSNP"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sIBxxxIIq")
+_BYTE_ORDER = 0 if sys.byteorder == "little" else 1
+_NO_TIME = -1
+_EPOCH = dt(1970, 1, 1, tzinfo=UTC)
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _to_micros(followed_at: Optional[str]) -> int:
+    if not followed_at:
+        return _NO_TIME
+    parsed = dt.fromisoformat(followed_at)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+    return (parsed - _EPOCH) // timedelta(microseconds=1)
+
+
+def _from_micros(micros: int) -> Optional[str]:
+    if micros == _NO_TIME:
+        return None
+    return (_EPOCH + timedelta(microseconds=micros)).isoformat()
+
+
+def write_snapshot(path: str, usernames, edges) -> None:
+    """Write a CSR snapshot to ``path`` atomically.
+
+    ``edges`` is an iterable of ``(follower, followed, followedAt)`` tuples.
+    The file is written next to ``path`` and moved into place with
+    ``os.replace`` so readers only ever see a complete snapshot.
+    """
+    names = set(usernames)
+    edge_list = []
+    for follower, followed, followed_at in edges:
+        names.add(follower)
+        names.add(followed)
+        edge_list.append((follower, followed, _to_micros(followed_at)))
+
+    ordered = sorted(names)
+    index = {name: i for i, name in enumerate(ordered)}
+    n, m = len(ordered), len(edge_list)
+
+    encoded = [name.encode("utf-8") for name in ordered]
+    name_offsets = array("I", [0])
+    for raw in encoded:
+        name_offsets.append(name_offsets[-1] + len(raw))
+
+    def build_csr(pairs):
+        pairs.sort()
+        offsets = array("I", [0] * (n + 1))
+        for src, _, _ in pairs:
+            offsets[src + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+        return offsets, array("I", (dst for _, dst, _ in pairs)), array("q", (t for _, _, t in pairs))
+
+    out_offsets, out_targets, out_times = build_csr(
+        [(index[a], index[b], t) for a, b, t in edge_list]
+    )
+    in_offsets, in_sources, in_times = build_csr(
+        [(index[b], index[a], t) for a, b, t in edge_list]
+    )
+
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, "wb") as fh:
+        fh.write(_HEADER.pack(MAGIC, FORMAT_VERSION, _BYTE_ORDER, n, m, time.time_ns() // 1000))
+        for section in (
+            name_offsets, out_offsets, out_targets, out_times,
+            in_offsets, in_sources, in_times,
+        ):
+            fh.write(b"\0" * (_align(fh.tell()) - fh.tell()))
+            section.tofile(fh)
+        fh.write(b"\0" * (_align(fh.tell()) - fh.tell()))
+        fh.write(b"".join(encoded))
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp_path, path)
+    print(f"[SNAPSHOT] Wrote snapshot '{path}' with {n} users and {m} follows.")
+
+
+def build_snapshot(db: StandardDatabase, path: str, batch_size: int = 10_000) -> None:
+    """Stream ``users`` and ``follows`` out of ArangoDB into a snapshot file."""
+    print(f"[SNAPSHOT] Building snapshot '{path}' from database '{db.name}'...")
+    users = db.aql.execute(
+        "FOR u IN users RETURN u._key", stream=True, batch_size=batch_size
+    )
+    edges = db.aql.execute(
+        """
+        FOR e IN follows
+            RETURN [PARSE_IDENTIFIER(e._from).key, PARSE_IDENTIFIER(e._to).key, e.followedAt]
+        """,
+        stream=True,
+        batch_size=batch_size,
+    )
+    write_snapshot(path, users, (tuple(row) for row in edges))
+
+
+class GraphSnapshot:
+    """Read-only, memory-mapped view of a snapshot file.
+
+    Pages are shared by every process that maps the same file, and lookups
+    read straight out of the mapping, so opening a snapshot costs no parsing.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as fh:
+            self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            self.stat = os.fstat(fh.fileno())
+
+        magic, version, byte_order, n, m, created_at = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"'{path}' is not a follow graph snapshot")
+        if byte_order != _BYTE_ORDER:
+            raise ValueError(f"Snapshot '{path}' was written with a different byte order")
+
+        self.vertex_count = n
+        self.edge_count = m
+        self.created_at = created_at
+
+        view = memoryview(self._mmap)
+        offset = _HEADER.size
+
+        def section(fmt: str, length: int):
+            nonlocal offset
+            offset = _align(offset)
+            size = length * struct.calcsize(fmt)
+            part = view[offset:offset + size].cast(fmt)
+            offset += size
+            return part
+
+        self._name_offsets = section("I", n + 1)
+        self._out_offsets = section("I", n + 1)
+        self._out_targets = section("I", m)
+        self._out_times = section("q", m)
+        self._in_offsets = section("I", n + 1)
+        self._in_sources = section("I", m)
+        self._in_times = section("q", m)
+        offset = _align(offset)
+        self._names = view[offset:offset + self._name_offsets[n]]
+
+    def _raw_name(self, vertex: int) -> bytes:
+        start, end = self._name_offsets[vertex], self._name_offsets[vertex + 1]
+        return bytes(self._names[start:end])
+
+    def username(self, vertex: int) -> str:
+        return self._raw_name(vertex).decode("utf-8")
+
+    def vertex_id(self, username: str) -> Optional[int]:
+        # Names are stored sorted, so the vertex id is found by binary search
+        # straight over the mapping instead of building a dict per process.
+        encoded = username.encode("utf-8")
+        i = bisect_left(range(self.vertex_count), encoded, key=self._raw_name)
+        if i < self.vertex_count and self._raw_name(i) == encoded:
+            return i
+        return None
+
+    def out_edges(self, vertex: int) -> Iterator[tuple[int, int]]:
+        for i in range(self._out_offsets[vertex], self._out_offsets[vertex + 1]):
+            yield self._out_targets[i], self._out_times[i]
+
+    def in_edges(self, vertex: int) -> Iterator[tuple[int, int]]:
+        for i in range(self._in_offsets[vertex], self._in_offsets[vertex + 1]):
+            yield self._in_sources[i], self._in_times[i]
+
+    def _record(self, vertex: int, micros: int) -> dict:
+        return {"followed": self.username(vertex), "followedAt": _from_micros(micros)}
+
+    def followers(self, username: str) -> list[dict]:
+        vertex = self.vertex_id(username)
+        if vertex is None:
+            return []
+        return [self._record(v, t) for v, t in self.in_edges(vertex)]
+
+    def following(self, username: str) -> list[dict]:
+        vertex = self.vertex_id(username)
+        if vertex is None:
+            return []
+        return [self._record(v, t) for v, t in self.out_edges(vertex)]
+
+    def _vertex_ids(self, usernames) -> set[int]:
+        ids = (self.vertex_id(name) for name in usernames)
+        return {vertex for vertex in ids if vertex is not None}
+
+    def bfs(self, username: str, max_depth: int, excluded=()) -> list[dict]:
+        # Mirrors OPTIONS { bfs: true, uniqueVertices: 'global' }; users in
+        # ``excluded`` are neither returned nor expanded, like PRUNE + FILTER
+        start = self.vertex_id(username)
+        if start is None:
+            return []
+        visited = {start} | self._vertex_ids(excluded)
+        frontier = [start]
+        results = []
+        for _ in range(max_depth):
+            next_frontier = []
+            for vertex in frontier:
+                for target, micros in self.out_edges(vertex):
+                    if target in visited:
+                        continue
+                    visited.add(target)
+                    next_frontier.append(target)
+                    results.append(self._record(target, micros))
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        return results
+
+    def dfs(self, username: str, max_depth: int, excluded=()) -> list[dict]:
+        # Mirrors OPTIONS { bfs: false, uniqueVertices: 'path' }
+        start = self.vertex_id(username)
+        if start is None:
+            return []
+        results = []
+        path = {start}
+        skipped = self._vertex_ids(excluded)
+
+        def visit(vertex: int, depth: int):
+            for target, micros in self.out_edges(vertex):
+                if target in path or target in skipped:
+                    continue
+                results.append(self._record(target, micros))
+                if depth < max_depth:
+                    path.add(target)
+                    visit(target, depth + 1)
+                    path.discard(target)
+
+        visit(start, 1)
+        return results
+
+
+class GraphSnapshotStore:
+    """Holds the current snapshot for a path and swaps to newer files.
+
+    Writers replace the file atomically; the store notices the new inode on
+    its next check and swaps its reference. Callers that still hold the old
+    snapshot keep a valid mapping until they drop it.
+    """
+
+    def __init__(self, path: str, check_interval: float = 5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._snapshot = GraphSnapshot(path)
+        self._checked_at = time.monotonic()
+        print(
+            f"[SNAPSHOT] Opened '{path}' "
+            f"({self._snapshot.vertex_count} users, {self._snapshot.edge_count} follows)"
+        )
+
+    @property
+    def snapshot(self) -> GraphSnapshot:
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            self.refresh()
+        return self._snapshot
+
+    def refresh(self) -> bool:
+        self._checked_at = time.monotonic()
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            print(f"[SNAPSHOT] '{self.path}' disappeared, keeping current snapshot")
+            return False
+
+        current = self._snapshot.stat
+        if (stat.st_ino, stat.st_mtime_ns) == (current.st_ino, current.st_mtime_ns):
+            return False
+
+        self._snapshot = GraphSnapshot(self.path)
+        print(f"[SNAPSHOT] Swapped to newer snapshot '{self.path}'")
+        return True
+
+
+if __name__ == "__main__":
+    from app import get_arango_db_helper
+    from app.config import settings
+
+    if not settings.graph_snapshot_path:
+        raise SystemExit("GRAPH_SNAPSHOT_PATH is not set")
+    build_snapshot(get_arango_db_helper().db, settings.graph_snapshot_path)
@@ -0,0 +1,50 @@
+from datetime import datetime, UTC
+from email.utils import format_datetime
+from urllib.parse import quote
+
+
+def list_validators(
+        username: str,
+        direction: str,
+        version: int,
+        modified_at: str | None,
+        variant: str = "",
+) -> dict[str, str]:
+    """ETag/Last-Modified headers for a follow list at ``version``.
+
+    ``variant`` distinguishes representations of the same list (e.g. a
+    ``limit``), since a strong ETag must identify the exact response body.
+    """
+    # Header values are latin-1 and ETags exclude '"', so the name is quoted
+    tag = f"{direction}-{quote(username, safe='')}-{version}"
+    if variant:
+        tag = f"{tag}-{variant}"
+    headers = {"ETag": f'"{tag}"', "Cache-Control": "private, no-cache"}
+    if modified_at:
+        timestamp = datetime.fromisoformat(modified_at)
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=UTC)
+        headers["Last-Modified"] = format_datetime(timestamp.astimezone(UTC), usegmt=True)
+    return headers
+
+
+# Appended to ETags by CompressionMiddleware for compressed bodies
+_ENCODING_SUFFIXES = ("-gzip\"", "-br\"", "-zstd\"")
+
+
+def _strip_encoding(tag: str) -> str:
+    for suffix in _ENCODING_SUFFIXES:
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)] + '"'
+    return tag
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored, and
+    # a tag for a compressed copy matches the uncompressed representation
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (c.strip() for c in if_none_match.split(","))
+    return etag in (_strip_encoding(c[2:] if c.startswith("W/") else c) for c in candidates)
@@ -0,0 +1,135 @@
+import threading
+from collections import OrderedDict
+
+from arango.database import StandardDatabase
+
+
+class _LRU:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        # Request threads share the interner; move_to_end racing popitem
+        # raises KeyError, so every access takes the lock
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class UserIdInterner:
+    """Assigns dense integer ids to users and resolves them back to usernames.
+
+    Ids come from a counter document in the ``counters`` collection and are
+    reserved in blocks, so creating a user costs one counter round-trip per
+    ``block_size`` users. Resolution goes through an LRU in both directions
+    and fetches all misses for a batch in a single query.
+    """
+
+    COUNTER_KEY = "user_uid"
+
+    def __init__(self, db: StandardDatabase, cache_size: int = 100_000, block_size: int = 64):
+        self.db = db
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._next = 0
+        self._block_end = 0
+        self._by_name = _LRU(cache_size)
+        self._by_uid = _LRU(cache_size)
+
+    def reserve(self, count: int) -> range:
+        # Atomically advance the counter and return the reserved id range
+        query = """
+        UPSERT { _key: @key }
+            INSERT { _key: @key, value: @count }
+            UPDATE { value: OLD.value + @count }
+            IN counters
+            RETURN NEW.value
+        """
+        end = next(self.db.aql.execute(query, bind_vars={"key": self.COUNTER_KEY, "count": count}))
+        return range(end - count + 1, end + 1)
+
+    def allocate(self) -> int:
+        with self._lock:
+            if self._next >= self._block_end:
+                block = self.reserve(self.block_size)
+                self._next, self._block_end = block.start, block.stop
+            uid = self._next
+            self._next += 1
+            return uid
+
+    def remember(self, username: str, uid: int):
+        self._by_name.put(username, uid)
+        self._by_uid.put(uid, username)
+
+    def uids_of(self, usernames) -> dict[str, int]:
+        found, missing = {}, []
+        for name in usernames:
+            uid = self._by_name.get(name)
+            if uid is None:
+                missing.append(name)
+            else:
+                found[name] = uid
+
+        if missing:
+            cursor = self.db.aql.execute(
+                "FOR u IN users FILTER u._key IN @names AND u.uid != null RETURN [u._key, u.uid]",
+                bind_vars={"names": missing},
+            )
+            for name, uid in cursor:
+                self.remember(name, uid)
+                found[name] = uid
+        return found
+
+    def usernames_of(self, uids) -> dict[int, str]:
+        found, missing = {}, []
+        for uid in uids:
+            name = self._by_uid.get(uid)
+            if name is None:
+                missing.append(uid)
+            else:
+                found[uid] = name
+
+        if missing:
+            # Served by the unique persistent index on users.uid
+            cursor = self.db.aql.execute(
+                "FOR u IN users FILTER u.uid IN @uids RETURN [u.uid, u._key]",
+                bind_vars={"uids": missing},
+            )
+            for uid, name in cursor:
+                self.remember(name, uid)
+                found[uid] = name
+        return found
+
+    def uid_of(self, username: str) -> int | None:
+        return self.uids_of([username]).get(username)
+
+    def resolve_records(self, rows) -> list[dict]:
+        """Turn ``[uid_or_username, followedAt]`` rows into API records.
+
+        Edges written before the migration carry no uid; for those the query
+        returns the username (the user key) directly.
+        """
+        rows = list(rows)
+        names = self.usernames_of({ref for ref, _ in rows if isinstance(ref, int)})
+        return [
+            {"followed": names.get(ref) if isinstance(ref, int) else ref, "followedAt": at}
+            for ref, at in rows
+        ]
+
+
+def compact_edge_key(follower_uid: int, followed_uid: int) -> str:
+    return f"{follower_uid}-{followed_uid}"
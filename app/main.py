@@ -2,10 +2,18 @@
 import asyncio
 from fastapi import FastAPI
 
+from app.admission import READ, TRAVERSAL, WRITE, AdmissionController
+from app.compression import CompressionMiddleware
+from app.config import settings
+
+from app.routes.block_routes import router as block_router
 from app.routes.follow_routes import router as follow_router
 from app.routes.traverse_bfs_routes import router as bfs_router
 from app.routes.traverse_dfs_routes import router as dfs_router
+from app.routes.reach_routes import router as reach_router
+from app.routes.influence_routes import router as influence_router
 from app.rabbitmq_consumer import start_consumer
+from app.repositories import community_store, edge_cleanup, khop_materialiser, single_flight, traversal_executor
 
 app = FastAPI(
     title="Follow Service",
@@ -13,14 +21,64 @@ app = FastAPI(
     description="Microservice responsible for follow/unfollow logic.",
 )
 
+admission_controller = None
+if settings.admission_control_enabled:
+    admission_controller = AdmissionController(
+        rates={
+            READ: (settings.admission_read_rate, settings.admission_read_burst),
+            WRITE: (settings.admission_write_rate, settings.admission_write_burst),
+            TRAVERSAL: (settings.admission_traversal_rate, settings.admission_traversal_burst),
+        },
+        traversal_concurrency=settings.admission_traversal_concurrency,
+        max_queue_wait=settings.admission_max_queue_wait,
+        client_header=settings.admission_client_header,
+    )
+    app.middleware("http")(admission_controller)
+
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_minimum_size,
+        level=settings.compression_level,
+    )
+
 app.include_router(follow_router)
+app.include_router(block_router)
 app.include_router(bfs_router)
 app.include_router(dfs_router)
+app.include_router(reach_router)
+app.include_router(influence_router)
+
+
+@app.get("/metrics/single-flight", tags=["Metrics"], summary="Request coalescing counters")
+async def single_flight_metrics() -> dict:
+    return single_flight.metrics()
+
+
+@app.get("/metrics/admission", tags=["Metrics"], summary="Admission control counters")
+async def admission_metrics() -> dict:
+    return admission_controller.metrics() if admission_controller is not None else {}
 
 
 @app.on_event("startup")
 async def startup_event():
     asyncio.create_task(start_consumer())
+    edge_cleanup.start()
+    if khop_materialiser is not None:
+        khop_materialiser.start()
+    if community_store is not None:
+        community_store.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if traversal_executor is not None:
+        traversal_executor.shutdown()
+    if khop_materialiser is not None:
+        khop_materialiser.stop()
+    if community_store is not None:
+        community_store.stop()
+    edge_cleanup.stop()
 
 
 if __name__ == "__main__":
@@ -12,4 +12,51 @@ class FollowOut(BaseModel):
     followed_at: str
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class UnfollowOut(BaseModel):
+    followed: str
+    removed_at: str
+
+
+class FollowDeltaOut(BaseModel):
+    added: list[FollowOut]
+    removed: list[UnfollowOut]
+    watermark: str
+    complete: bool
+
+
+class ReachOut(BaseModel):
+    username: str
+    depth: int
+    reach: int
+    exact: bool
+    relative_error: float
+
+
+class InfluenceOut(BaseModel):
+    username: str
+    pagerank: float
+    influence: float
+    rank: int
+    computed_at: str | None = None
+
+
+class BatchTraversalIn(BaseModel):
+    usernames: list[str]
+
+
+class BatchTraversalOut(BaseModel):
+    depth: int
+    results: dict[str, list[FollowOut]]
+
+
+class RelationCreate(BaseModel):
+    user: str
+    target: str
+
+
+class RelationOut(BaseModel):
+    username: str
+    kind: str
+    created_at: str
@@ -3,20 +3,48 @@ import os
 
 import aio_pika
 
-from app.repositories import user_repo
+from app.repositories import edge_cleanup, follow_repo, user_repo
 
 RABBITMQ_URL = os.getenv("RABBITMQ_URL")
 QUEUE_NAME = os.getenv("QUEUE_NAME", "user_created_queue")
 
 
+def _hide_user(username: str, deleted: bool):
+    if not user_repo.set_active(username, False, deleted=deleted):
+        return
+    # Reads filter the user out from now on; version bumps make cached
+    # lists and ETags of the user's own lists change immediately
+    follow_repo.record_visibility_change(username, username)
+    edge_cleanup.submit(username, purge=deleted)
+
+
+def _show_user(username: str):
+    # A purge still queued for the user finds deletedAt cleared and does nothing
+    follow_repo.record_visibility_change(username, username)
+    edge_cleanup.submit(username, purge=False, hidden=False)
+
+
 async def handle_message(message: aio_pika.IncomingMessage):
     async with message.process():
         data = json.loads(message.body.decode())
         username = data["username"]
-
-        print(f"[INFO] Received message: creating user with username='{username}'")
-        user_repo.create_user(username)
-        print(f"[INFO] User '{username}' successfully created in Follow service")
+        event = data.get("event", "user_created")
+
+        if event == "user_deleted":
+            print(f"[INFO] Received message: deleting user with username='{username}'")
+            _hide_user(username, deleted=True)
+        elif event == "user_deactivated":
+            print(f"[INFO] Received message: deactivating user with username='{username}'")
+            _hide_user(username, deleted=False)
+        elif event == "user_reactivated":
+            print(f"[INFO] Received message: reactivating user with username='{username}'")
+            if user_repo.set_active(username, True):
+                _show_user(username)
+        else:
+            print(f"[INFO] Received message: creating user with username='{username}'")
+            if user_repo.create_user(username):
+                _show_user(username)
+            print(f"[INFO] User '{username}' successfully created in Follow service")
 
 
 async def start_consumer():
@@ -26,4 +54,4 @@ async def start_consumer():
     queue = await channel.declare_queue(QUEUE_NAME, durable=True)
     await queue.consume(handle_message)
 
-    print(f"[INFO] Listening to the queue '{QUEUE_NAME}' for user creation events...")
+    print(f"[INFO] Listening to the queue '{QUEUE_NAME}' for user lifecycle events...")
@@ -1,17 +1,170 @@
 from app import get_arango_db_helper
+from app.analytics.community_store import CommunityStore
+from app.cache.backends import create_cache_backend
+from app.cache.khop_materialiser import KHopMaterialiser
+from app.cache.traversal_cache import TraversalCache
+from app.config import settings
+from app.interning import UserIdInterner
+from app.repositories.block_repo import BlockRepository
+from app.repositories.edge_cleanup import EdgeCleanup
 from app.repositories.follow_repo import FollowRepository
 from app.repositories.graph_traversal_repo import GraphTraversalRepository
 from app.repositories.user_repo import UserRepository
+from app.single_flight import SingleFlight
+from app.sketches.hyperloglog import HyperLogLog
+from app.sketches.reach_store import ReachSketchStore
+from app.traversal_planner import TraversalPlanner
 
 arango_helper = get_arango_db_helper(is_test_mode=False)
-graph_traversal_repo = GraphTraversalRepository(db=arango_helper.db)
+
+cache_backend = create_cache_backend(
+    settings.cache_backend,
+    url=settings.cache_redis_url,
+    ttl=settings.cache_ttl,
+    max_entries=settings.cache_local_max_entries,
+)
+
+interner = None
+if settings.user_id_interning:
+    interner = UserIdInterner(db=arango_helper.db, cache_size=settings.user_id_cache_size)
+
+traversal_cache = None
+if settings.traversal_cache_enabled:
+    traversal_cache = TraversalCache(
+        max_entries=settings.traversal_cache_max_entries,
+        max_records=settings.traversal_cache_max_records,
+        stale_while_revalidate=settings.traversal_cache_stale_while_revalidate,
+        stale_ttl=settings.traversal_cache_stale_ttl,
+    )
+
+traversal_planner = None
+if settings.traversal_planner_enabled:
+    traversal_planner = TraversalPlanner(
+        max_fanout=settings.traversal_max_fanout,
+        prune_threshold=settings.traversal_prune_threshold,
+        top_k_threshold=settings.traversal_top_k_threshold,
+        top_k=settings.traversal_top_k,
+        sample_size=settings.traversal_planner_sample_size,
+        plan_ttl=settings.traversal_plan_ttl,
+    )
+
+reach_sketches = None
+if settings.reach_sketches_enabled:
+    reach_sketches = ReachSketchStore(
+        db=arango_helper.db,
+        precision=HyperLogLog.precision_for_error(settings.reach_error),
+    )
+
+graph_traversal_repo = GraphTraversalRepository(
+    db=arango_helper.db,
+    cache=traversal_cache,
+    shared_cache=cache_backend,
+    interner=interner,
+    graph_name=settings.arango_graph_name,
+    read_db=arango_helper.read_db,
+    allow_dirty_reads=settings.arango_allow_dirty_reads,
+    batch_size=settings.arango_stream_batch_size,
+    planner=traversal_planner,
+    reach_sketches=reach_sketches,
+    reach_exact_threshold=settings.reach_exact_threshold,
+)
+khop_materialiser = None
+if settings.khop_materialisation_enabled:
+    khop_materialiser = KHopMaterialiser(
+        compute=graph_traversal_repo._traverse_bfs,
+        max_depth=settings.khop_max_depth,
+        max_users=settings.khop_max_users,
+        min_requests=settings.khop_min_requests,
+        max_records=settings.khop_max_records,
+        refresh_interval=settings.khop_refresh_interval,
+    )
+    graph_traversal_repo.materialiser = khop_materialiser
+
+if settings.graph_snapshot_path:
+    graph_traversal_repo.open_snapshot(
+        settings.graph_snapshot_path,
+        check_interval=settings.graph_snapshot_check_interval,
+    )
 
 follow_repo = FollowRepository(
     user_coll=arango_helper.get_collection("users"),
     follow_coll=arango_helper.get_collection("follows"),
-    db=arango_helper.db
+    db=arango_helper.db,
+    cache=cache_backend,
+    interner=interner,
+    read_db=arango_helper.read_db,
+    allow_dirty_reads=settings.arango_allow_dirty_reads,
+    tombstone_coll=arango_helper.get_collection("follow_tombstones"),
+    delta_grace=settings.follow_delta_grace,
+    tombstone_ttl=settings.follow_tombstone_ttl,
+    batch_size=settings.arango_stream_batch_size,
+    degree_counts=settings.follow_degree_counts,
+    block_coll=arango_helper.get_collection("blocks"),
+)
+if traversal_cache is not None:
+    follow_repo.add_change_listener(traversal_cache.on_follow_change)
+    follow_repo.add_visibility_listener(traversal_cache.on_follow_change)
+    if cache_backend is not None:
+        # Follow writes on other replicas invalidate this process's traversals
+        cache_backend.subscribe(
+            lambda message: traversal_cache.on_follow_change(
+                message["follower"], message["followed"], message.get("created", True)
+            )
+        )
+
+if khop_materialiser is not None:
+    follow_repo.add_change_listener(khop_materialiser.on_follow_change)
+    follow_repo.add_visibility_listener(khop_materialiser.on_follow_change)
+    if cache_backend is not None:
+        cache_backend.subscribe(
+            lambda message: khop_materialiser.on_follow_change(
+                message["follower"], message["followed"], message.get("created", True)
+            )
+        )
+
+if reach_sketches is not None:
+    follow_repo.add_change_listener(reach_sketches.on_follow_change)
+
+community_store = None
+if settings.community_updates_enabled:
+    community_store = CommunityStore(
+        db=arango_helper.db,
+        queue_size=settings.community_queue_size,
+        batch_size=settings.community_batch_size,
+        merge_chunk=settings.community_merge_chunk,
+        max_merge=settings.community_max_merge,
+        neighbour_cap=settings.community_neighbour_cap,
+    )
+    follow_repo.add_change_listener(community_store.on_follow_change)
+
+block_repo = BlockRepository(
+    block_coll=arango_helper.get_collection("blocks"),
+    db=arango_helper.db,
+    follow_repo=follow_repo,
+)
+
+edge_cleanup = EdgeCleanup(
+    db=arango_helper.db,
+    follow_repo=follow_repo,
+    chunk_size=settings.edge_cleanup_chunk_size,
+    pause=settings.edge_cleanup_pause,
+    degree_counts=settings.follow_degree_counts,
 )
 
 user_repo = UserRepository(
-    user_coll=arango_helper.get_collection("users")
+    user_coll=arango_helper.get_collection("users"),
+    interner=interner,
+    db=arango_helper.db,
 )
+
+single_flight = SingleFlight(default_timeout=settings.single_flight_timeout)
+
+traversal_executor = None
+if settings.traversal_executor == "process":
+    from app.traversal_executor import TraversalExecutor
+
+    traversal_executor = TraversalExecutor(
+        workers=settings.traversal_workers,
+        queue_limit=settings.traversal_queue_limit,
+        snapshot_path=settings.graph_snapshot_path,
+    )
@@ -0,0 +1,90 @@
+from datetime import datetime as dt, UTC
+
+from arango.collection import EdgeCollection
+from arango.database import StandardDatabase
+
+from app import get_arango_db_helper
+from app.repositories.follow_repo import FollowRepository
+from app.repositories.user_repo import UserNotFoundError
+from app.validators.username_validator import UserValidator
+
+BLOCK = "block"
+MUTE = "mute"
+
+
+class BlockRepository:
+    """Block and mute edges between users.
+
+    Both hide the target from the owner's follower/following lists and
+    traversals; the read queries filter them out in AQL. A block also
+    removes follows in both directions and stops either user from following
+    the other until it is lifted.
+    """
+
+    def __init__(
+            self,
+            block_coll: EdgeCollection = None,
+            db: StandardDatabase = None,
+            follow_repo: FollowRepository = None,
+            is_test_mode: bool = False,
+    ):
+        if block_coll is None or db is None:
+            helper = get_arango_db_helper(is_test_mode=is_test_mode)
+            block_coll = helper.get_collection("blocks")
+            db = helper.db
+        self.block_coll = block_coll
+        self.db = db
+        self.follow_repo = follow_repo or FollowRepository(is_test_mode=is_test_mode)
+
+    def set_relation(self, owner: str, target: str, kind: str) -> dict:
+        UserValidator.validate_username(owner)
+        UserValidator.validate_username(target)
+        if kind not in (BLOCK, MUTE):
+            raise ValueError(f"Unknown relation kind {kind!r}")
+        if owner == target:
+            raise ValueError(f"Cannot {kind} oneself")
+        if not (self.follow_repo._user_exists(owner) and self.follow_repo._user_exists(target)):
+            raise UserNotFoundError("User not found")
+
+        edge = {
+            "_key": f"{owner}__{target}",
+            "_from": f"users/{owner}",
+            "_to": f"users/{target}",
+            "kind": kind,
+            "createdAt": dt.now(tz=UTC).isoformat(),
+        }
+        # A block replaces a mute of the same pair and vice versa
+        self.block_coll.insert(edge, overwrite=True)
+        print(f"[INFO] {kind.capitalize()} saved: {owner} -> {target}")
+
+        if kind == BLOCK:
+            self.follow_repo.delete_follow(owner, target)
+            self.follow_repo.delete_follow(target, owner)
+        self.follow_repo.record_visibility_change(owner, target)
+        return edge
+
+    def remove_relation(self, owner: str, target: str, kind: str) -> bool:
+        UserValidator.validate_username(owner)
+        UserValidator.validate_username(target)
+        key = f"{owner}__{target}"
+        edge = self.block_coll.get(key)
+        if edge is None or edge.get("kind") != kind:
+            print(f"[INFO] No {kind} {owner} -> {target}")
+            return False
+        self.block_coll.delete(key)
+        print(f"[INFO] {kind.capitalize()} removed: {owner} -> {target}")
+        self.follow_repo.record_visibility_change(owner, target)
+        return True
+
+    def list_relations(self, owner: str, kind: str = None) -> list[dict]:
+        UserValidator.validate_username(owner)
+        cursor = self.db.aql.execute(
+            """
+            FOR b IN blocks
+                FILTER b._from == @owner AND (@kind == null OR b.kind == @kind)
+                SORT b.createdAt DESC
+                RETURN { username: PARSE_IDENTIFIER(b._to).key, kind: b.kind, createdAt: b.createdAt }
+            """,
+            bind_vars={"owner": f"users/{owner}", "kind": kind},
+        )
+        return list(cursor)
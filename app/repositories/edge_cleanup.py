@@ -0,0 +1,188 @@
+import queue
+import threading
+import time
+from datetime import datetime as dt, UTC
+
+from arango.database import StandardDatabase
+
+from app.repositories.follow_repo import FollowRepository
+
+
+class EdgeCleanup:
+    """Background follow-up work after an account is deactivated or deleted.
+
+    The account is hidden from reads as soon as its ``active`` flag is set;
+    the work queued here only brings neighbours up to date. Every step
+    touches at most ``chunk_size`` edges and is followed by a ``pause``, so
+    a user with millions of followers is processed as a long series of
+    small transactions rather than one that locks the collection.
+
+    Deactivation bumps the neighbours' list versions so their ETags change
+    and writes tombstones for the user's follows, so delta pollers of the
+    followed users see the follower go. Reactivation only bumps versions.
+    Deletion removes the user's follows in both directions, writes
+    tombstones for delta pollers, fixes materialised degree counts, drops
+    the user's blocks and finally the user document itself. Every removed
+    follow goes through the follow repository's change listeners. Each
+    purge query re-checks ``deletedAt`` on the server, so a user restored
+    while a purge is queued or running keeps its remaining edges.
+    """
+
+    def __init__(
+            self,
+            db: StandardDatabase,
+            follow_repo: FollowRepository,
+            chunk_size: int = 1000,
+            pause: float = 0.05,
+            degree_counts: bool = False,
+    ):
+        self.db = db
+        self.follow_repo = follow_repo
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self.degree_counts = degree_counts
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = None
+
+    def submit(self, username: str, purge: bool, hidden: bool = True):
+        self._queue.put((username, purge, hidden))
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="edge-cleanup", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._queue.put(None)
+
+    def _run(self):
+        while (job := self._queue.get()) is not None:
+            username, purge, hidden = job
+            try:
+                if purge:
+                    self.purge(username)
+                else:
+                    self.touch_neighbours(username, hidden=hidden)
+            except Exception as e:
+                # The account stays hidden; a repeated event retries the cleanup
+                print(f"[WARN] Edge cleanup for '{username}' failed: {e}")
+
+    def _invalidate_lists(self, direction: str, usernames: list[str]):
+        cache = self.follow_repo.cache
+        if cache is not None and usernames:
+            keys = [f"{direction}:{name}" for name in usernames]
+            keys += [f"{direction}_uids:{name}" for name in usernames]
+            keys += [f"{direction}_count:{name}" for name in usernames]
+            cache.delete(keys)
+
+    def touch_neighbours(self, username: str, hidden: bool = True) -> int:
+        """Bump the list versions of everyone the user follows or is followed by."""
+        user_id = f"users/{username}"
+        tombstones = self.follow_repo.tombstone_coll if hidden else None
+        touched = 0
+        for own_side, other_side, direction in (("_from", "_to", "followers"), ("_to", "_from", "following")):
+            cursor = self.db.aql.execute(
+                f"FOR e IN follows FILTER e.{own_side} == @userId RETURN PARSE_IDENTIFIER(e.{other_side}).key",
+                bind_vars={"userId": user_id},
+                stream=True,
+                batch_size=self.chunk_size,
+            )
+            while True:
+                names = list(cursor.batch())
+                cursor.batch().clear()
+                if names:
+                    self._bump(names, direction, 0)
+                    if tombstones is not None and own_side == "_from":
+                        removed_at = dt.now(tz=UTC).isoformat()
+                        tombstones.insert_many([
+                            {"follower": username, "followed": name, "removedAt": removed_at} for name in names
+                        ])
+                    touched += len(names)
+                    time.sleep(self.pause)
+                if not cursor.has_more():
+                    break
+                cursor.fetch()
+        print(f"[CLEANUP] Bumped list versions of {touched} neighbours of '{username}'")
+        return touched
+
+    def _bump(self, names: list[str], direction: str, delta: int):
+        count_field = "followerCount" if direction == "followers" else "followingCount"
+        # Drop cached lists before the version moves, so a new ETag is never
+        # paired with a cached body from before the change
+        self._invalidate_lists(direction, names)
+        self.db.aql.execute(
+            f"""
+            FOR name IN @names
+                FOR u IN users
+                    FILTER u._key == name
+                    UPDATE u WITH MERGE(
+                        {{ {direction}Version: (u.{direction}Version || 0) + 1, {direction}ModifiedAt: @now }},
+                        @counts ? {{ {count_field}: MAX([0, (u.{count_field} || 0) + @delta]) }} : {{}}
+                    ) IN users OPTIONS {{ exclusive: true }}
+            """,
+            bind_vars={
+                "names": names,
+                "now": dt.now(tz=UTC).isoformat(),
+                "counts": self.degree_counts and delta != 0,
+                "delta": delta,
+            },
+        )
+
+    def _remove_chunk(self, own_side: str, other_side: str, username: str) -> list[str]:
+        tombstone = (
+            "INSERT { follower: @username, followed: name, removedAt: @now } INTO follow_tombstones"
+            if own_side == "_from" else ""
+        )
+        cursor = self.db.aql.execute(
+            f"""
+            LET deleted = DOCUMENT(@userId).deletedAt != null
+            LET removed = (
+                FOR e IN follows
+                    FILTER deleted AND e.{own_side} == @userId
+                    LIMIT @chunk
+                    REMOVE e IN follows
+                    RETURN PARSE_IDENTIFIER(OLD.{other_side}).key
+            )
+            FOR name IN removed
+                {tombstone}
+                RETURN name
+            """,
+            bind_vars={
+                "userId": f"users/{username}",
+                "chunk": self.chunk_size,
+                **({"username": username, "now": dt.now(tz=UTC).isoformat()} if tombstone else {}),
+            },
+        )
+        return list(cursor)
+
+    def purge(self, username: str) -> int:
+        """Remove every follow of a deleted user, then the user itself."""
+        removed = 0
+        for own_side, other_side, direction in (("_from", "_to", "followers"), ("_to", "_from", "following")):
+            while names := self._remove_chunk(own_side, other_side, username):
+                # Neighbours lose one follower (or followed user) each
+                self._bump(names, direction, -1)
+                for name in names:
+                    pair = (username, name) if own_side == "_from" else (name, username)
+                    self.follow_repo.notify_change(*pair, created=False)
+                removed += len(names)
+                time.sleep(self.pause)
+                if len(names) < self.chunk_size:
+                    break
+
+        self.db.aql.execute(
+            """
+            LET deleted = DOCUMENT(@userId).deletedAt != null
+            FOR b IN blocks
+                FILTER deleted AND (b._from == @userId OR b._to == @userId)
+                REMOVE b IN blocks
+            """,
+            bind_vars={"userId": f"users/{username}"},
+        )
+        # Only remove the user if it was not restored while purging
+        self.db.aql.execute(
+            "FOR u IN users FILTER u._key == @username AND u.deletedAt != null REMOVE u IN users",
+            bind_vars={"username": username},
+        )
+        print(f"[CLEANUP] Purged {removed} follows of deleted user '{username}'")
+        return removed
@@ -1,9 +1,16 @@
-from datetime import datetime as dt, UTC
+from datetime import datetime as dt, timedelta, UTC
+from typing import Iterator
 
 from arango.collection import StandardCollection, EdgeCollection
 from arango.database import StandardDatabase
+from arango.exceptions import ArangoError
 
 from app import get_arango_db_helper
+from app.cache.backends import CacheBackend
+from app.cursors import stream_cursor
+from app.interning import UserIdInterner, compact_edge_key
+from app.repositories.user_repo import UserNotFoundError
+from app.repositories.visibility import hidden_lookup
 from app.validators.username_validator import UserValidator
 
 
@@ -14,16 +21,109 @@ class FollowRepository:
             follow_coll: EdgeCollection = None,
             db: StandardDatabase = None,
             is_test_mode: bool = False,
+            cache: CacheBackend = None,
+            interner: UserIdInterner = None,
+            read_db: StandardDatabase = None,
+            allow_dirty_reads: bool = False,
+            tombstone_coll: StandardCollection = None,
+            delta_grace: float = 2.0,
+            tombstone_ttl: int = None,
+            batch_size: int = 1000,
+            degree_counts: bool = False,
+            block_coll: EdgeCollection = None,
     ):
         if user_coll is None or follow_coll is None or db is None:
             helper = get_arango_db_helper(is_test_mode=is_test_mode)
             self.user_coll = helper.get_collection("users")
             self.follow_coll = helper.get_collection("follows")
+            self.tombstone_coll = helper.get_collection("follow_tombstones")
+            self.block_coll = helper.get_collection("blocks")
             self.db = helper.db
         else:
             self.user_coll = user_coll
             self.follow_coll = follow_coll
+            self.tombstone_coll = tombstone_coll
+            self.block_coll = block_coll
             self.db = db
+        self.cache = cache
+        self.interner = interner
+        self.read_db = read_db or self.db
+        self.allow_dirty_reads = allow_dirty_reads
+        self.delta_grace = delta_grace
+        self.tombstone_ttl = tombstone_ttl
+        self.batch_size = batch_size
+        self.degree_counts = degree_counts
+        self._change_listeners = []
+        self._visibility_listeners = []
+
+    def add_change_listener(self, listener):
+        # listener(follower, followed, created) is called after every
+        # follow (created=True) and unfollow (created=False)
+        self._change_listeners.append(listener)
+
+    def add_visibility_listener(self, listener):
+        # listener(owner, other, False) is called after a block or mute
+        # changes what the owner's lists and traversals show
+        self._visibility_listeners.append(listener)
+
+    def notify_change(self, follower: str, followed: str, created: bool):
+        """Drop caches and run change listeners for an edge written elsewhere.
+
+        Used by jobs that add or remove follows without going through
+        ``create_follow``/``delete_follow``.
+        """
+        self._invalidate_lists(follower, followed, created)
+        self._notify_listeners(follower, followed, created)
+
+    def _invalidate_lists(self, follower: str, followed: str, created: bool):
+        if self.cache is not None:
+            keys = [
+                f"followers:{followed}",
+                f"followers_uids:{followed}",
+                f"followers_count:{followed}",
+                f"following:{follower}",
+                f"following_uids:{follower}",
+                f"following_count:{follower}",
+            ]
+            # Traversals that visited the follower are tagged with it
+            self.cache.delete(keys, tags=[f"vertex:{follower}"])
+            self.cache.publish({"follower": follower, "followed": followed, "created": created, "keys": keys})
+
+    def _notify_listeners(self, follower: str, followed: str, created: bool):
+        # Listeners maintain derived data the next rebuild repairs; the edge
+        # is already saved, so one failing must not fail the write
+        for listener in self._change_listeners:
+            try:
+                listener(follower, followed, created)
+            except Exception as e:
+                print(f"[WARN] Follow change listener failed for {follower} -> {followed}: {e}")
+
+    def _cached_read(self, key: str, compute, read_your_writes: bool = False):
+        # A cache entry may have been filled from a lagging follower, so
+        # read-your-writes requests bypass it
+        if self.cache is None or read_your_writes:
+            return compute()
+        value = self.cache.get(key)
+        if value is not None:
+            print(f"[CACHE] Hit for '{key}'")
+            return value
+        value = compute()
+        if not self._dirty_reads:
+            self.cache.set(key, value)
+        return value
+
+    @property
+    def _dirty_reads(self) -> bool:
+        # A follower may not have applied a write whose invalidation already
+        # ran, so its answers are served but never cached
+        return self.allow_dirty_reads and self.read_db is not self.db
+
+    def _reader(self, read_your_writes: bool = False) -> tuple[StandardDatabase, dict]:
+        # Reads may be served by followers or read-only coordinators; writes
+        # and read-your-writes requests always go to the leader
+        if read_your_writes or self.read_db is self.db:
+            return self.db, {}
+        return self.read_db, {"allow_dirty_read": self.allow_dirty_reads}
 
     def _user_exists(self, username: str) -> bool:
         return self.user_coll.has(username)
@@ -39,7 +139,11 @@ class FollowRepository:
 
         if not (self._user_exists(follower) and self._user_exists(followed)):
             print("[ERROR] One or both users not found.")
-            raise ValueError("User not found")
+            raise UserNotFoundError("User not found")
+
+        if self._is_blocked(follower, followed):
+            print(f"[INFO] Follow {follower} -> {followed} rejected: blocked")
+            raise PermissionError("Follow not allowed: one user has blocked the other")
 
         edge_key = f"{follower}__{followed}"
         edge = {
@@ -48,41 +152,380 @@ class FollowRepository:
             "_to": f"users/{followed}",
             "followedAt": dt.now(tz=UTC).isoformat(),
         }
+        if self.interner is not None:
+            uids = self.interner.uids_of([follower, followed])
+            if len(uids) == 2:
+                edge.update(fromUid=uids[follower], toUid=uids[followed])
+                # A re-follow of a not yet migrated edge overwrites it in place
+                # rather than adding a compact duplicate next to it
+                if not self.follow_coll.has(edge_key):
+                    edge_key = compact_edge_key(uids[follower], uids[followed])
+                    edge["_key"] = edge_key
 
-        self.follow_coll.insert(edge, overwrite=True)
+        # return_old tells a re-follow (edge replaced) from a new edge
+        result = self.follow_coll.insert(edge, overwrite=True, return_old=True)
         print(f"[INFO] Follow saved: {edge_key}")
+        # Caches are dropped before the version moves, so a new ETag is
+        # never paired with a body cached before the change
+        self._invalidate_lists(follower, followed, created=True)
+        self._record_change(follower, followed, 0 if "old" in result else 1, edge["followedAt"])
+        self._notify_listeners(follower, followed, created=True)
         return edge
 
-    def get_followers(self, username: str) -> list[dict]:
-        print(f"[INFO] Getting followers for '{username}'")
+    def _is_blocked(self, a: str, b: str) -> bool:
+        if self.block_coll is None:
+            return False
+        # Primary-key reads of both directions in one round-trip
+        edges = self.block_coll.get_many([f"{a}__{b}", f"{b}__{a}"])
+        return any(edge.get("kind") == "block" for edge in edges)
+
+    def record_visibility_change(self, owner: str, other: str):
+        """Invalidate ``owner``'s lists and traversals after a block or mute.
 
+        Bumps both list versions so ETags change, drops the cached lists and
+        traversals, and tells other replicas through the cache backend.
+        """
+        try:
+            self.db.aql.execute(
+                """
+                FOR u IN users
+                    FILTER u._key == @owner
+                    UPDATE u WITH {
+                        followersVersion: (u.followersVersion || 0) + 1,
+                        followingVersion: (u.followingVersion || 0) + 1,
+                        followersModifiedAt: @changedAt,
+                        followingModifiedAt: @changedAt
+                    } IN users OPTIONS { exclusive: true }
+                """,
+                bind_vars={"owner": owner, "changedAt": dt.now(tz=UTC).isoformat()},
+            )
+        except ArangoError as e:
+            print(f"[WARN] Version update after block/mute by {owner} failed: {e}")
+        if self.cache is not None:
+            keys = [
+                f"followers:{owner}",
+                f"followers_uids:{owner}",
+                f"following:{owner}",
+                f"following_uids:{owner}",
+            ]
+            self.cache.delete(keys, tags=[f"vertex:{owner}"])
+            self.cache.publish({"follower": owner, "followed": other, "created": False, "keys": keys})
+        for listener in self._visibility_listeners:
+            listener(owner, other, False)
+
+    def _record_change(self, follower: str, followed: str, delta: int, changed_at: str):
+        # Bumps the list versions behind ETags and, when enabled, the
+        # materialised degrees used by the traversal planner. The exclusive
+        # lock avoids write-write conflicts on popular users' documents
         query = """
-        FOR v, e IN INBOUND @userDoc follows
-            RETURN {
-                followed: v.username,
-                followedAt: e.followedAt
-            }
+        FOR u IN users
+            FILTER u._key IN [@follower, @followed]
+            LET counts = @counts AND @delta != 0
+            UPDATE u WITH u._key == @follower
+                ? MERGE(
+                    { followingVersion: (u.followingVersion || 0) + 1, followingModifiedAt: @changedAt },
+                    counts ? { followingCount: MAX([0, (u.followingCount || 0) + @delta]) } : {}
+                )
+                : MERGE(
+                    { followersVersion: (u.followersVersion || 0) + 1, followersModifiedAt: @changedAt },
+                    counts ? { followerCount: MAX([0, (u.followerCount || 0) + @delta]) } : {}
+                )
+            IN users OPTIONS { exclusive: true }
+        """
+        try:
+            self.db.aql.execute(
+                query,
+                bind_vars={
+                    "follower": follower,
+                    "followed": followed,
+                    "delta": delta,
+                    "counts": self.degree_counts,
+                    "changedAt": changed_at,
+                },
+            )
+        except ArangoError as e:
+            # Counts are repaired by backfill_degree_counts; versions by the
+            # next change to the same list
+            print(f"[WARN] Version/degree update for {follower} -> {followed} failed: {e}")
+
+    def get_list_version(
+            self,
+            username: str,
+            direction: str,
+            read_your_writes: bool = False,
+    ) -> tuple[int, str | None]:
+        """``(version, modifiedAt)`` of a user's followers or following list.
+
+        One primary-index document read; the version is bumped after every
+        follow, re-follow and unfollow touching the list.
         """
-        cursor = self.db.aql.execute(query, bind_vars={"userDoc": f"users/{username}"})
+        if direction not in ("followers", "following"):
+            raise ValueError(f"Unknown list direction {direction!r}")
+        query = f"""
+        LET u = DOCUMENT(@userDoc)
+        RETURN [u.{direction}Version || 0, u.{direction}ModifiedAt]
+        """
+        db, options = self._reader(read_your_writes)
+        version, modified_at = next(db.aql.execute(
+            query, bind_vars={"userDoc": f"users/{username}"}, **options
+        ))
+        return version, modified_at
+
+    def get_followers(
+            self,
+            username: str,
+            read_your_writes: bool = False,
+            since: dt = None,
+            version: int = None,
+    ) -> list[dict]:
+        """Followers of ``username``.
+
+        ``version`` is the list version the caller read before asking (see
+        ``get_list_version``). The cache entry is then keyed by it, so a
+        body cached under one version is never served with another's ETag.
+        """
+        if since is not None:
+            return self._get_followers_since(username, _as_timestamp(since), read_your_writes)
+        if self.interner is not None:
+            return self._cached_uid_list("followers", "_to", "_from", "fromUid", username, read_your_writes, version)
+        return self._cached_read(
+            _list_key("followers", username, version),
+            lambda: self._get_followers(username, read_your_writes),
+            read_your_writes,
+        )
+
+    def _get_followers(self, username: str, read_your_writes: bool = False) -> list[dict]:
+        print(f"[INFO] Getting followers for '{username}'")
+        if self.interner is not None:
+            return self._get_edges_compact("_to", "_from", "fromUid", username, read_your_writes)
+
+        db, options = self._reader(read_your_writes)
+        cursor = db.aql.execute(
+            self._neighbours_query("INBOUND"), bind_vars={"userDoc": f"users/{username}"}, **options
+        )
         results = list(cursor)
         print(f"[INFO] Found {len(results)} followers.")
         return results
 
-    def get_following(self, username: str) -> list[dict]:
-        print(f"[INFO] Getting users followed by '{username}'")
+    def iter_followers(
+            self,
+            username: str,
+            read_your_writes: bool = False,
+            batch_size: int = None,
+    ) -> Iterator[dict]:
+        """Stream followers without materialising the whole list.
+
+        Bypasses the cache; closing the iterator early releases the server
+        cursor.
+        """
+        return self._iter_edges("INBOUND", "_to", "_from", "fromUid", username, read_your_writes, batch_size)
+
+    def _get_followers_since(self, username: str, since: str, read_your_writes: bool = False) -> list[dict]:
+        # Range scan on the [_to, followedAt] index, so the cost follows the
+        # number of new edges rather than the follower count
+        query = hidden_lookup("userDoc") + """
+        FOR e IN follows
+            FILTER e._to == @userDoc AND e.followedAt > @since
+            FILTER !HAS(hidden, e._from) AND DOCUMENT(e._from).active != false
+            SORT e.followedAt
+            RETURN [
+                e.fromUid != null ? e.fromUid : PARSE_IDENTIFIER(e._from).key,
+                e.followedAt
+            ]
+        """
+        db, options = self._reader(read_your_writes)
+        cursor = db.aql.execute(
+            query, bind_vars={"userDoc": f"users/{username}", "since": since}, **options
+        )
+        if self.interner is not None:
+            return self.interner.resolve_records(cursor)
+        return [{"followed": ref, "followedAt": at} for ref, at in cursor]
 
+    def _get_unfollows_since(self, username: str, since: str) -> list[dict]:
+        if self.tombstone_coll is None:
+            return []
         query = """
-        FOR v, e IN OUTBOUND @userDoc follows
-            RETURN {
-                followed: v.username,
-                followedAt: e.followedAt
-            }
+        FOR t IN follow_tombstones
+            FILTER t.followed == @username AND t.removedAt > @since
+            SORT t.removedAt
+            RETURN { followed: t.follower, removedAt: t.removedAt }
         """
-        cursor = self.db.aql.execute(query, bind_vars={"userDoc": f"users/{username}"})
+        cursor = self.db.aql.execute(query, bind_vars={"username": username, "since": since})
+        return list(cursor)
+
+    def get_followers_delta(self, username: str, since: dt) -> dict:
+        """Followers gained and lost after ``since``.
+
+        The returned ``watermark`` is the ``since`` value for the next poll.
+        Both lists are read from the leader so nothing written before the
+        watermark can be missing because of replication lag. ``complete`` is
+        False once ``since`` is older than the tombstone retention, in which
+        case the client should fetch the full list again.
+        """
+        now = dt.now(tz=UTC)
+        since_ts = _as_timestamp(since)
+        watermark = max(_as_timestamp(now - timedelta(seconds=self.delta_grace)), since_ts)
+
+        added = self._get_followers_since(username, since_ts, read_your_writes=True)
+        removed = self._get_unfollows_since(username, since_ts)
+
+        # An unfollow followed by a re-follow nets out to the re-follow
+        latest_add = {r["followed"]: r["followedAt"] for r in added}
+        removed = [
+            r for r in removed
+            if r["followed"] not in latest_add or r["removedAt"] > latest_add[r["followed"]]
+        ]
+        latest_remove = {r["followed"]: r["removedAt"] for r in removed}
+        added = [
+            r for r in added
+            if r["followed"] not in latest_remove or r["followedAt"] > latest_remove[r["followed"]]
+        ]
+
+        complete = (
+            self.tombstone_ttl is None
+            or since_ts >= _as_timestamp(now - timedelta(seconds=self.tombstone_ttl))
+        )
+        print(f"[INFO] Delta for '{username}' since {since_ts}: +{len(added)} -{len(removed)}")
+        return {"added": added, "removed": removed, "watermark": watermark, "complete": complete}
+
+    def get_following(self, username: str, read_your_writes: bool = False, version: int = None) -> list[dict]:
+        """Users ``username`` follows; ``version`` as in ``get_followers``."""
+        if self.interner is not None:
+            return self._cached_uid_list("following", "_from", "_to", "toUid", username, read_your_writes, version)
+        return self._cached_read(
+            _list_key("following", username, version),
+            lambda: self._get_following(username, read_your_writes),
+            read_your_writes,
+        )
+
+    def _get_following(self, username: str, read_your_writes: bool = False) -> list[dict]:
+        print(f"[INFO] Getting users followed by '{username}'")
+        if self.interner is not None:
+            return self._get_edges_compact("_from", "_to", "toUid", username, read_your_writes)
+
+        db, options = self._reader(read_your_writes)
+        cursor = db.aql.execute(
+            self._neighbours_query("OUTBOUND"), bind_vars={"userDoc": f"users/{username}"}, **options
+        )
         results = list(cursor)
         print(f"[INFO] Found {len(results)} followed users.")
         return results
 
+    def iter_following(
+            self,
+            username: str,
+            read_your_writes: bool = False,
+            batch_size: int = None,
+    ) -> Iterator[dict]:
+        """Stream followed users; see ``iter_followers``."""
+        return self._iter_edges("OUTBOUND", "_from", "_to", "toUid", username, read_your_writes, batch_size)
+
+    @staticmethod
+    def _neighbours_query(direction: str) -> str:
+        return hidden_lookup("userDoc") + f"""
+        FOR v, e IN {direction} @userDoc follows
+            FILTER !HAS(hidden, v._id) AND v.active != false
+            RETURN {{
+                followed: v.username,
+                followedAt: e.followedAt
+            }}
+        """
+
+    @staticmethod
+    def _compact_query(own_side: str, other_side: str, other_uid: str) -> str:
+        # Edge-index scan that never loads the neighbour documents; names are
+        # resolved from uids through the interner's LRU
+        return hidden_lookup("userDoc") + f"""
+        FOR e IN follows
+            FILTER e.{own_side} == @userDoc
+            FILTER !HAS(hidden, e.{other_side}) AND DOCUMENT(e.{other_side}).active != false
+            RETURN [
+                e.{other_uid} != null ? e.{other_uid} : PARSE_IDENTIFIER(e.{other_side}).key,
+                e.followedAt
+            ]
+        """
+
+    def _iter_edges(
+            self,
+            direction: str,
+            own_side: str,
+            other_side: str,
+            other_uid: str,
+            username: str,
+            read_your_writes: bool = False,
+            batch_size: int = None,
+    ) -> Iterator[dict]:
+        UserValidator.validate_username(username)
+        if self.interner is not None:
+            query = self._compact_query(own_side, other_side, other_uid)
+            resolve = self.interner.resolve_records
+        else:
+            query, resolve = self._neighbours_query(direction), None
+
+        db, options = self._reader(read_your_writes)
+        # A streaming query produces rows as they are fetched, so an early
+        # close also stops the work on the server
+        cursor = db.aql.execute(
+            query,
+            bind_vars={"userDoc": f"users/{username}"},
+            stream=True,
+            batch_size=batch_size or self.batch_size,
+            **options,
+        )
+        return stream_cursor(cursor, resolve)
+
+    def _get_edges_compact(
+            self,
+            own_side: str,
+            other_side: str,
+            other_uid: str,
+            username: str,
+            read_your_writes: bool = False,
+    ) -> list[dict]:
+        refs, times = self._get_edge_columns(own_side, other_side, other_uid, username, read_your_writes)
+        return self.interner.resolve_records(zip(refs, times))
+
+    def _get_edge_columns(
+            self,
+            own_side: str,
+            other_side: str,
+            other_uid: str,
+            username: str,
+            read_your_writes: bool = False,
+    ) -> list[list]:
+        # [[uid_or_username, ...], [followedAt, ...]]
+        db, options = self._reader(read_your_writes)
+        cursor = db.aql.execute(
+            self._compact_query(own_side, other_side, other_uid),
+            bind_vars={"userDoc": f"users/{username}"},
+            **options,
+        )
+        refs, times = [], []
+        for ref, at in cursor:
+            refs.append(ref)
+            times.append(at)
+        print(f"[INFO] Found {len(refs)} users.")
+        return [refs, times]
+
+    def _cached_uid_list(
+            self,
+            direction: str,
+            own_side: str,
+            other_side: str,
+            other_uid: str,
+            username: str,
+            read_your_writes: bool,
+            version: int | None,
+    ) -> list[dict]:
+        # The cache holds uid columns rather than username records; names are
+        # resolved per request through the interner's LRU
+        refs, times = self._cached_read(
+            _list_key(f"{direction}_uids", username, version),
+            lambda: self._get_edge_columns(own_side, other_side, other_uid, username, read_your_writes),
+            read_your_writes,
+        )
+        return self.interner.resolve_records(zip(refs, times))
+
     def delete_follow(self, follower: str, followed: str) -> bool:
         UserValidator.validate_username(follower)
         UserValidator.validate_username(followed)
@@ -90,34 +533,87 @@ class FollowRepository:
         edge_key = f"{follower}__{followed}"
         print(f"[INFO] Deleting follow: {follower} -> {followed}")
 
+        if self.interner is not None:
+            uids = self.interner.uids_of([follower, followed])
+            if len(uids) == 2:
+                compact_key = compact_edge_key(uids[follower], uids[followed])
+                # Edges not yet migrated still use the username key
+                if self.follow_coll.has(compact_key):
+                    edge_key = compact_key
+
         if self.follow_coll.has(edge_key):
             self.follow_coll.delete(edge_key)
             print("[INFO] Follow deleted.")
+            removed_at = dt.now(tz=UTC).isoformat()
+            if self.tombstone_coll is not None:
+                # Lets delta pollers see the unfollow; expired by a TTL index
+                self.tombstone_coll.insert({
+                    "follower": follower,
+                    "followed": followed,
+                    "removedAt": removed_at,
+                })
+            self._invalidate_lists(follower, followed, created=False)
+            self._record_change(follower, followed, -1, removed_at)
+            self._notify_listeners(follower, followed, created=False)
             return True
 
         print("[INFO] Follow not found.")
         return False
 
-    def count_followers(self, username: str) -> int:
+    def count_followers(self, username: str, read_your_writes: bool = False) -> int:
+        return self._cached_read(
+            f"followers_count:{username}",
+            lambda: self._count_followers(username, read_your_writes),
+            read_your_writes,
+        )
+
+    def _count_followers(self, username: str, read_your_writes: bool = False) -> int:
         query = """
         RETURN LENGTH(
             FOR v IN 1..1 INBOUND @user follows
+                FILTER v.active != false
                 RETURN 1
         )
         """
-        cursor = self.db.aql.execute(query, bind_vars={"user": f"users/{username}"})
+        db, options = self._reader(read_your_writes)
+        cursor = db.aql.execute(query, bind_vars={"user": f"users/{username}"}, **options)
         count = next(cursor)
         print(f"[INFO] [{dt.now(tz=UTC).isoformat()}] User '{username}' has {count} followers.")
         return count
 
-    def count_following(self, username: str) -> int:
+    def count_following(self, username: str, read_your_writes: bool = False) -> int:
+        return self._cached_read(
+            f"following_count:{username}",
+            lambda: self._count_following(username, read_your_writes),
+            read_your_writes,
+        )
+
+    def _count_following(self, username: str, read_your_writes: bool = False) -> int:
         query = """
         RETURN LENGTH(
             FOR v IN 1..1 OUTBOUND @user follows
+                FILTER v.active != false
                 RETURN 1
         )
         """
-        cursor = self.db.aql.execute(query, bind_vars={"user": f"users/{username}"})
+        db, options = self._reader(read_your_writes)
+        cursor = db.aql.execute(query, bind_vars={"user": f"users/{username}"}, **options)
         count = next(cursor)
         print(f"[INFO] [{dt.now(tz=UTC).isoformat()}] User '{username}' is following {count} users.")
         return count
+
+
+def _list_key(direction: str, username: str, version: int | None) -> str:
+    # Versioned entries need no invalidation: a write moves the version and
+    # readers of the new version miss; the old entry ages out with the TTL
+    if version is None:
+        return f"{direction}:{username}"
+    return f"{direction}:{username}@{version}"
+
+
+def _as_timestamp(value: dt) -> str:
+    # followedAt/removedAt are UTC isoformat strings, which sort by time as
+    # long as both sides use the same format; naive values are taken as UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return value.astimezone(UTC).isoformat()
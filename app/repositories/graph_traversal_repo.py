@@ -1,11 +1,126 @@
+import threading
+from functools import partial
+from typing import Iterator
+
 from arango.database import StandardDatabase
 
+from app.cache.backends import CacheBackend
+from app.cache.khop_materialiser import KHopMaterialiser
+from app.cache.traversal_cache import TraversalCache
+from app.cursors import stream_cursor
+from app.graph_snapshot import GraphSnapshotStore
+from app.interning import UserIdInterner
+from app.repositories.visibility import hidden_lookup
+from app.sketches.hyperloglog import HyperLogLog
+from app.sketches.reach_store import ReachSketchStore
+from app.traversal_planner import TraversalPlan, TraversalPlanner
 from app.validators.username_validator import UserValidator
 
 
 class GraphTraversalRepository:
-    def __init__(self, db: StandardDatabase):
+    def __init__(
+            self,
+            db: StandardDatabase,
+            snapshot_store: GraphSnapshotStore = None,
+            cache: TraversalCache = None,
+            shared_cache: CacheBackend = None,
+            shared_cache_max_records: int = 10_000,
+            interner: UserIdInterner = None,
+            graph_name: str = "follow_graph",
+            read_db: StandardDatabase = None,
+            allow_dirty_reads: bool = False,
+            batch_size: int = 1000,
+            planner: TraversalPlanner = None,
+            reach_sketches: ReachSketchStore = None,
+            reach_exact_threshold: int = 1000,
+            materialiser: KHopMaterialiser = None,
+    ):
         self.db = db
+        self.snapshot_store = snapshot_store
+        self.cache = cache
+        self.shared_cache = shared_cache
+        self.shared_cache_max_records = shared_cache_max_records
+        self.interner = interner
+        # Traversals go through the named graph so a cluster can run them on
+        # the DB servers holding the shards
+        self.graph_name = graph_name
+        self.read_db = read_db or db
+        self.allow_dirty_reads = allow_dirty_reads
+        self.batch_size = batch_size
+        self.planner = planner
+        self.reach_sketches = reach_sketches
+        self.reach_exact_threshold = reach_exact_threshold
+        self.materialiser = materialiser
+
+    def _reader(self, read_your_writes: bool = False) -> tuple[StandardDatabase, dict]:
+        # Reads may be served by followers or read-only coordinators; writes
+        # and read-your-writes requests always go to the leader
+        if read_your_writes or self.read_db is self.db:
+            return self.db, {}
+        return self.read_db, {"allow_dirty_read": self.allow_dirty_reads}
+
+    @property
+    def _dirty_reads(self) -> bool:
+        # A follower may not have applied a write whose invalidation already
+        # ran, so its answers are served but never cached
+        return self.allow_dirty_reads and self.read_db is not self.db
+
+    def open_snapshot(self, path: str, check_interval: float = 5.0) -> GraphSnapshotStore:
+        # Serve traversals from a memory-mapped snapshot instead of ArangoDB
+        self.snapshot_store = GraphSnapshotStore(path, check_interval=check_interval)
+        return self.snapshot_store
+
+    def get_followers(self, username: str, read_your_writes: bool = False) -> list[dict]:
+        UserValidator.validate_username(username)
+
+        if self.snapshot_store is not None and not read_your_writes:
+            results = self._without_hidden(username, self.snapshot_store.snapshot.followers(username))
+            print(f"[INFO] Snapshot followers lookup found {len(results)} users.")
+            return results
+
+        query = hidden_lookup("userDoc") + """
+        FOR v, e IN INBOUND @userDoc follows
+            FILTER !HAS(hidden, v._id) AND v.active != false
+            RETURN {
+                followed: v.username,
+                followedAt: e.followedAt
+            }
+        """
+        db, options = self._reader(read_your_writes)
+        cursor = db.aql.execute(query, bind_vars={"userDoc": f"users/{username}"}, **options)
+        return list(cursor)
+
+    def _hidden_among(self, username: str, names: set[str]) -> set[str]:
+        # Users ``username`` blocked or muted plus deactivated or deleted
+        # users among ``names``, in one round trip
+        cursor = self.db.aql.execute(
+            """
+            LET blocked = (FOR b IN blocks FILTER b._from == @userKey RETURN PARSE_IDENTIFIER(b._to).key)
+            LET inactive = (FOR u IN users FILTER u._key IN @names AND u.active == false RETURN u._key)
+            RETURN APPEND(blocked, inactive)
+            """,
+            bind_vars={"userKey": f"users/{username}", "names": sorted(names)},
+        )
+        return set(next(cursor, []))
+
+    def _without_hidden(self, username: str, results: list[dict]) -> list[dict]:
+        # Snapshots know nothing of blocks or account state, so their
+        # one-hop results are filtered against the database
+        hidden = self._hidden_among(username, {r["followed"] for r in results})
+        if not hidden:
+            return results
+        return [r for r in results if r["followed"] not in hidden]
+
+    def _snapshot_traversal(self, username: str, traverse) -> list[dict]:
+        # ``traverse(excluded)`` walks the snapshot without entering the
+        # excluded users. A first unfiltered walk finds every candidate; if
+        # some are hidden the walk is repeated without them. The second walk
+        # only reaches a subset of the first, so nothing hidden survives.
+        results = traverse(())
+        hidden = self._hidden_among(username, {r["followed"] for r in results})
+        if not hidden:
+            return results
+        return traverse(hidden)
 
     @staticmethod
     def _validate_max_depth(max_depth: int):
@@ -19,41 +134,405 @@ class GraphTraversalRepository:
         UserValidator.validate_username(username)
         cls._validate_max_depth(max_depth)
 
-    def traverse_bfs(self, username: str, max_depth: int = 3) -> list[dict]:
+    def _cached(self, mode: str, username: str, max_depth: int, compute) -> list[dict]:
+        if self.snapshot_store is not None or (self.cache is None and self.shared_cache is None):
+            return compute(username, max_depth)
+
+        if self.cache is not None:
+            cached, needs_refresh = self.cache.get(username, max_depth, mode)
+            if cached is not None:
+                print(f"[CACHE] {mode.upper()} cache hit for '{username}', depth = {max_depth}")
+                if needs_refresh:
+                    threading.Thread(
+                        target=self._refresh, args=(mode, username, max_depth, compute), daemon=True
+                    ).start()
+                return cached
+
+        return self._refresh(mode, username, max_depth, compute)
+
+    def _refresh(self, mode: str, username: str, max_depth: int, compute) -> list[dict]:
+        version = self.cache.version if self.cache is not None else None
+        results = None
+
+        if self.shared_cache is not None:
+            key = f"traversal:{mode}:{max_depth}:{username}"
+            results = self.shared_cache.get(key)
+            if results is None:
+                results = compute(username, max_depth)
+                if len(results) <= self.shared_cache_max_records and not self._dirty_reads:
+                    touched = {username, *(r["followed"] for r in results)}
+                    self.shared_cache.set(key, results, tags=[f"vertex:{v}" for v in touched])
+        else:
+            results = compute(username, max_depth)
+
+        if self.cache is not None and not self._dirty_reads:
+            self.cache.put(username, max_depth, mode, results, version)
+        return results
+
+    def _projection(self) -> str:
+        if self.interner is None:
+            return "{ followed: v.username, followedAt: e.followedAt }"
+        # Returning the edge's uid lets the optimizer skip loading vertex documents
+        return "[e.toUid != null ? e.toUid : PARSE_IDENTIFIER(e._to).key, e.followedAt]"
+
+    def _collect(self, cursor) -> list[dict]:
+        if self.interner is None:
+            return list(cursor)
+        return self.interner.resolve_records(cursor)
+
+    def traverse_bfs(self, username: str, max_depth: int = 3, read_your_writes: bool = False) -> list[dict]:
+        return self.traverse_bfs_planned(username, max_depth, read_your_writes)[0]
+
+    def traverse_bfs_planned(
+            self,
+            username: str,
+            max_depth: int = 3,
+            read_your_writes: bool = False,
+    ) -> tuple[list[dict], TraversalPlan | None]:
+        """BFS that returns the plan it ran with (None without a planner)."""
         self._validate_input(username, max_depth)
+        if self.materialiser is not None and not read_your_writes:
+            self.materialiser.record_request(username)
+            records = self.materialiser.get(username, max_depth)
+            if records is not None:
+                print(f"[INFO] BFS from '{username}', depth = {max_depth} served from materialisation")
+                return records, None
 
-        print(f"[INFO] BFS traversal from '{username}', max depth = {max_depth}")
+        plan = None
+        if self.planner is not None and (self.snapshot_store is None or read_your_writes):
+            # The traversal cache is keyed by strategy, so a remembered plan
+            # lets a cache hit skip the planning round-trip
+            plan = self.planner.cached_plan(username, max_depth)
+            if plan is None:
+                plan = self.plan_bfs(username, max_depth, read_your_writes)
+                self.planner.remember_plan(username, max_depth, plan)
+
+        if plan is None or plan.strategy == "full":
+            mode, compute = "bfs", self._traverse_bfs
+        elif plan.strategy == "pruned":
+            mode, compute = "bfs:pruned", partial(self._traverse_bfs_pruned, max_fanout=plan.max_fanout)
+        else:
+            mode, compute = "bfs:top_k", partial(self._traverse_bfs_top_k, k=plan.top_k)
+
+        if read_your_writes:
+            # Straight to the leader: no snapshot, no cache
+            return compute(username, max_depth, read_your_writes=True), plan
+        return self._cached(mode, username, max_depth, compute), plan
+
+    def plan_bfs(self, username: str, max_depth: int, read_your_writes: bool = False) -> TraversalPlan:
+        # Degrees come from materialised followingCount where present and
+        # from capped edge-index counts otherwise
         query = """
-        FOR v, e, p IN 1..@maxDepth OUTBOUND @userKey follows
-            OPTIONS { bfs: true, uniqueVertices: 'global' }
-            RETURN {
-                followed: v.username,
-                followedAt: e.followedAt
-            }
+        LET start = DOCUMENT(@userKey)
+        LET degree = start.followingCount != null ? start.followingCount : LENGTH(
+            FOR e IN follows FILTER e._from == @userKey LIMIT @cap RETURN 1
+        )
+        LET sample = (
+            FOR e IN follows
+                FILTER e._from == @userKey
+                LIMIT @sampleSize
+                LET v = DOCUMENT(e._to)
+                RETURN v.followingCount != null ? v.followingCount : LENGTH(
+                    FOR x IN follows FILTER x._from == e._to LIMIT @cap RETURN 1
+                )
+        )
+        RETURN { degree: degree, sample: sample, hasCounts: start.followingCount != null }
         """
-        cursor = self.db.aql.execute(
-            query, bind_vars={"userKey": f"users/{username}", "maxDepth": max_depth}
+        db, options = self._reader(read_your_writes)
+        stats = next(db.aql.execute(
+            query,
+            bind_vars={
+                "userKey": f"users/{username}",
+                "sampleSize": self.planner.sample_size,
+                "cap": self.planner.top_k_threshold + 1,
+            },
+            **options,
+        ))
+        plan = self.planner.choose(stats["degree"], stats["sample"], max_depth, stats["hasCounts"])
+        print(
+            f"[INFO] BFS plan for '{username}', depth = {max_depth}: {plan.strategy} "
+            f"(degree {plan.degree}, estimated frontier {plan.estimated_frontier})"
+        )
+        return plan
+
+    def _traverse_bfs(self, username: str, max_depth: int, read_your_writes: bool = False) -> list[dict]:
+        print(f"[INFO] BFS traversal from '{username}', max depth = {max_depth}")
+        if self.snapshot_store is not None and not read_your_writes:
+            snapshot = self.snapshot_store.snapshot
+            results = self._snapshot_traversal(username, partial(snapshot.bfs, username, max_depth))
+            print(f"[INFO] Snapshot BFS traversal found {len(results)} users.")
+            return results
+
+        db, options = self._reader(read_your_writes)
+        cursor = db.aql.execute(
+            self._bfs_query(),
+            bind_vars={"userKey": f"users/{username}", "maxDepth": max_depth, "graphName": self.graph_name},
+            **options,
         )
-        results = list(cursor)
+        results = self._collect(cursor)
         print(f"[INFO] BFS traversal found {len(results)} users.")
         return results
 
-    def traverse_dfs(self, username: str, max_depth: int = 3) -> list[dict]:
+    def _traverse_bfs_pruned(
+            self,
+            username: str,
+            max_depth: int,
+            read_your_writes: bool = False,
+            max_fanout: int = 1000,
+    ) -> list[dict]:
+        # Supernodes are returned but not expanded; vertices without a
+        # materialised count compare as null and are always expanded
+        query = hidden_lookup("userKey") + f"""
+        FOR v, e, p IN 1..@maxDepth OUTBOUND @userKey GRAPH @graphName
+            PRUNE v.followingCount > @maxFanout OR HAS(hidden, e._to) OR v.active == false
+            OPTIONS {{ bfs: true, uniqueVertices: 'global' }}
+            FILTER !HAS(hidden, e._to) AND v.active != false
+            RETURN {self._projection()}
+        """
+        db, options = self._reader(read_your_writes)
+        cursor = db.aql.execute(
+            query,
+            bind_vars={
+                "userKey": f"users/{username}",
+                "maxDepth": max_depth,
+                "graphName": self.graph_name,
+                "maxFanout": max_fanout,
+            },
+            **options,
+        )
+        results = self._collect(cursor)
+        print(f"[INFO] Pruned BFS traversal found {len(results)} users.")
+        return results
+
+    def _traverse_bfs_top_k(
+            self,
+            username: str,
+            max_depth: int,
+            read_your_writes: bool = False,
+            k: int = 50,
+            frontier_chunk: int = 1000,
+    ) -> list[dict]:
+        # Level-by-level BFS that follows only the k most recent edges of
+        # each vertex; the [_from, followedAt] index serves the sort
+        query = hidden_lookup("userKey") + """
+        FOR vid IN @frontier
+            LET recent = (
+                FOR e IN follows
+                    FILTER e._from == vid AND !HAS(hidden, e._to) AND DOCUMENT(e._to).active != false
+                    SORT e.followedAt DESC
+                    LIMIT @k
+                    RETURN [e._to, e.toUid != null ? e.toUid : PARSE_IDENTIFIER(e._to).key, e.followedAt]
+            )
+            FOR r IN recent
+                RETURN r
+        """
+        db, options = self._reader(read_your_writes)
+        start = f"users/{username}"
+        visited, frontier, rows = {start}, [start], []
+        for _ in range(max_depth):
+            next_frontier = []
+            for i in range(0, len(frontier), frontier_chunk):
+                cursor = db.aql.execute(
+                    query,
+                    bind_vars={"frontier": frontier[i:i + frontier_chunk], "k": k, "userKey": start},
+                    **options,
+                )
+                for vertex_id, ref, followed_at in cursor:
+                    if vertex_id not in visited:
+                        visited.add(vertex_id)
+                        next_frontier.append(vertex_id)
+                        rows.append([ref, followed_at])
+            if not next_frontier:
+                break
+            frontier = next_frontier
+
+        if self.interner is not None:
+            results = self.interner.resolve_records(rows)
+        else:
+            results = [{"followed": ref, "followedAt": at} for ref, at in rows]
+        print(f"[INFO] Top-{k} BFS traversal found {len(results)} users.")
+        return results
+
+    def _bfs_query(self) -> str:
+        # Hidden vertices are neither returned nor expanded
+        return hidden_lookup("userKey") + f"""
+        FOR v, e, p IN 1..@maxDepth OUTBOUND @userKey GRAPH @graphName
+            PRUNE HAS(hidden, e._to) OR v.active == false
+            OPTIONS {{ bfs: true, uniqueVertices: 'global' }}
+            FILTER !HAS(hidden, e._to) AND v.active != false
+            RETURN {self._projection()}
+        """
+
+    def traverse_bfs_multi(
+            self,
+            usernames: list[str],
+            max_depth: int = 3,
+            read_your_writes: bool = False,
+    ) -> dict[str, list[dict]]:
+        """BFS from every start user at once; results keyed by start user.
+
+        Each level expands the union of all sources' frontiers with one edge
+        index lookup per distinct vertex, so overlapping neighbourhoods are
+        read once, and the whole traversal is a single query.
+        """
+        for username in usernames:
+            UserValidator.validate_username(username)
+        self._validate_max_depth(max_depth)
+        usernames = list(dict.fromkeys(usernames))
+
+        if self.snapshot_store is not None and not read_your_writes:
+            snapshot = self.snapshot_store.snapshot
+            return {
+                username: self._snapshot_traversal(username, partial(snapshot.bfs, username, max_depth))
+                for username in usernames
+            }
+
+        db, options = self._reader(read_your_writes)
+        cursor = db.aql.execute(
+            self._multi_bfs_query(max_depth),
+            bind_vars={"sources": usernames},
+            **options,
+        )
+        results = {username: [] for username in usernames}
+        for source, followed, followed_at in cursor:
+            results[source].append({"followed": followed, "followedAt": followed_at})
+        print(
+            f"[INFO] Multi-source BFS from {len(usernames)} users, max depth = {max_depth}, "
+            f"found {sum(map(len, results.values()))} users."
+        )
+        return results
+
+    @staticmethod
+    def _multi_bfs_query(max_depth: int) -> str:
+        # AQL has no loops, so levels are unrolled. ``seen`` holds "source id"
+        # pairs; a vertex first reached at one level is not repeated later,
+        # and vertices a source blocked or muted start out as seen.
+        levels = [
+            """
+            LET frontier0 = (FOR s IN @sources RETURN { s: s, v: CONCAT("users/", s) })
+            LET hidden = (
+                FOR s IN @sources
+                    FOR b IN blocks
+                        FILTER b._from == CONCAT("users/", s)
+                        RETURN CONCAT(s, " ", b._to)
+            )
+            LET start = APPEND(frontier0[* RETURN CONCAT(CURRENT.s, " ", CURRENT.v)], hidden)
+            LET seen0 = ZIP(start, start[* RETURN true])
+            """
+        ]
+        for d in range(1, max_depth + 1):
+            levels.append(f"""
+            LET grouped{d} = (
+                FOR e IN follows
+                    FILTER e._from IN UNIQUE(frontier{d - 1}[*].v)
+                    FILTER DOCUMENT(e._to).active != false
+                    COLLECT from = e._from INTO edges = [e._to, e.followedAt]
+                    RETURN [from, edges]
+            )
+            LET adjacency{d} = ZIP(grouped{d}[*][0], grouped{d}[*][1])
+            LET frontier{d} = (
+                FOR f IN frontier{d - 1}
+                    FOR t IN (adjacency{d}[f.v] || [])
+                        FILTER !HAS(seen{d - 1}, CONCAT(f.s, " ", t[0]))
+                        COLLECT s = f.s, v = t[0] AGGREGATE at = MIN(t[1])
+                        RETURN {{ s: s, v: v, at: at }}
+            )
+            LET seen{d} = MERGE(seen{d - 1}, ZIP(
+                frontier{d}[* RETURN CONCAT(CURRENT.s, " ", CURRENT.v)], frontier{d}[* RETURN true]
+            ))
+            """)
+        found = ", ".join(f"frontier{d}" for d in range(1, max_depth + 1))
+        return "".join(levels) + f"""
+            FOR r IN FLATTEN([{found}])
+                RETURN [r.s, PARSE_IDENTIFIER(r.v).key, r.at]
+        """
+
+    def iter_bfs(
+            self,
+            username: str,
+            max_depth: int = 3,
+            read_your_writes: bool = False,
+            batch_size: int = None,
+    ) -> Iterator[dict]:
+        """Stream BFS results nearest-first without materialising them.
+
+        Skips the result caches, which only hold complete traversals.
+        Closing the iterator early releases the server cursor, and because
+        the query is streamed the server stops expanding levels as well.
+        """
         self._validate_input(username, max_depth)
+        if self.snapshot_store is not None and not read_your_writes:
+            snapshot = self.snapshot_store.snapshot
+            results = self._snapshot_traversal(username, partial(snapshot.bfs, username, max_depth))
+            return (r for r in results)
+
+        db, options = self._reader(read_your_writes)
+        cursor = db.aql.execute(
+            self._bfs_query(),
+            bind_vars={"userKey": f"users/{username}", "maxDepth": max_depth, "graphName": self.graph_name},
+            stream=True,
+            batch_size=batch_size or self.batch_size,
+            **options,
+        )
+        resolve = self.interner.resolve_records if self.interner is not None else None
+        return stream_cursor(cursor, resolve)
+
+    def estimate_reach(self, username: str, max_depth: int = 2) -> dict:
+        """Number of users within ``max_depth`` outbound hops.
+
+        Levels below ``max_depth`` are enumerated exactly by BFS; the last
+        and largest level is estimated by merging the 1-hop sketches of
+        those users, so it is never expanded. Estimates at or below the
+        exact threshold are replaced by an exact count.
+        """
+        self._validate_input(username, max_depth)
+        if max_depth < 1:
+            raise ValueError("max_depth must be at least 1")
+
+        if self.reach_sketches is not None and max_depth > 1:
+            inner = [r["followed"] for r in self.traverse_bfs(username, max_depth - 1)]
+            sketch = HyperLogLog(self.reach_sketches.precision)
+            sketch.update(inner)
+            for payload in self.reach_sketches.payloads(inner).values():
+                sketch.merge_bytes(payload)
+            estimate = round(sketch.count())
+            if estimate > self.reach_exact_threshold:
+                print(f"[INFO] Estimated reach of '{username}' at depth {max_depth}: ~{estimate}")
+                return {"reach": estimate, "exact": False, "relative_error": sketch.relative_error}
 
+        reach = len(self.traverse_bfs(username, max_depth))
+        print(f"[INFO] Exact reach of '{username}' at depth {max_depth}: {reach}")
+        return {"reach": reach, "exact": True, "relative_error": 0.0}
+
+    def traverse_dfs(self, username: str, max_depth: int = 3, read_your_writes: bool = False) -> list[dict]:
+        self._validate_input(username, max_depth)
+        if read_your_writes:
+            # Straight to the leader: no snapshot, no cache
+            return self._traverse_dfs(username, max_depth, read_your_writes=True)
+        return self._cached("dfs", username, max_depth, self._traverse_dfs)
+
+    def _traverse_dfs(self, username: str, max_depth: int, read_your_writes: bool = False) -> list[dict]:
         print(f"[INFO] DFS traversal from '{username}', max depth = {max_depth}")
-        query = """
-        FOR v, e, p IN 1..@maxDepth OUTBOUND @userKey follows
-            OPTIONS { bfs: false, uniqueVertices: 'path' }
-            RETURN {
-                followed: v.username,
-                followedAt: e.followedAt
-            }
+        if self.snapshot_store is not None and not read_your_writes:
+            snapshot = self.snapshot_store.snapshot
+            results = self._snapshot_traversal(username, partial(snapshot.dfs, username, max_depth))
+            print(f"[INFO] Snapshot DFS traversal found {len(results)} users.")
+            return results
+
+        query = hidden_lookup("userKey") + f"""
+        FOR v, e, p IN 1..@maxDepth OUTBOUND @userKey GRAPH @graphName
+            PRUNE HAS(hidden, e._to) OR v.active == false
+            OPTIONS {{ bfs: false, uniqueVertices: 'path' }}
+            FILTER !HAS(hidden, e._to) AND v.active != false
+            RETURN {self._projection()}
         """
-        cursor = self.db.aql.execute(
-            query, bind_vars={"userKey": f"users/{username}", "maxDepth": max_depth}
+        db, options = self._reader(read_your_writes)
+        cursor = db.aql.execute(
+            query,
+            bind_vars={"userKey": f"users/{username}", "maxDepth": max_depth, "graphName": self.graph_name},
+            **options,
         )
-        results = list(cursor)
+        results = self._collect(cursor)
         print(f"[INFO] DFS traversal found {len(results)} users.")
         return results
 
@@ -1,28 +1,116 @@
+from datetime import datetime as dt, UTC
+
 from arango.collection import StandardCollection
+from arango.database import StandardDatabase
 
 from app import get_arango_db_helper
+from app.interning import UserIdInterner
 from app.validators.username_validator import UserValidator
 
 
+class UserNotFoundError(ValueError):
+    """A referenced user does not exist; routes answer 404 instead of 400."""
+
+
 class UserRepository:
-    def __init__(self, user_coll: StandardCollection = None, is_test_mode: bool = False):
+    def __init__(
+            self,
+            user_coll: StandardCollection = None,
+            is_test_mode: bool = False,
+            interner: UserIdInterner = None,
+            db: StandardDatabase = None,
+    ):
         if user_coll is None:
             helper = get_arango_db_helper(is_test_mode=is_test_mode)
             user_coll = helper.get_collection("users")
+            db = helper.db
         self.user_coll = user_coll
+        self.db = db
+        self.interner = interner
 
-    def create_user(self, username: str) -> None:
+    def create_user(self, username: str) -> bool:
+        """Create a user; returns True when a hidden account was restored instead."""
         UserValidator.validate_username(username)
 
         if self.user_coll.has(username):
+            existing = self.user_coll.get(username) or {}
+            if existing.get("deletedAt") is not None:
+                # Re-created after a delete: bring it back so a queued purge
+                # leaves it alone. A deactivated account stays deactivated, or a
+                # redelivered create would undo the deactivation
+                return self.set_active(username, True)
             print(f"[INFO] User '{username}' already exists.")
-            return
+            return False
 
-        self.user_coll.insert({"_key": username, "username": username})
+        user = {"_key": username, "username": username}
+        if self.interner is not None:
+            user["uid"] = self.interner.allocate()
+            self.interner.remember(username, user["uid"])
+        self.user_coll.insert(user)
         print(f"[INFO] User '{username}' created.")
+        return False
 
     def user_exists(self, username: str) -> bool:
         UserValidator.validate_username(username)
         exists = self.user_coll.has(username)
         print(f"[INFO] Exists check for '{username}': {exists}")
         return exists
+
+    def set_active(self, username: str, active: bool, deleted: bool = False) -> bool:
+        """Flag a user (in)active; read queries skip users with ``active == false``.
+
+        Reactivation clears ``deletedAt`` and ``deactivatedAt``; edge cleanup
+        only purges users that still carry ``deletedAt``.
+        """
+        UserValidator.validate_username(username)
+        if not self.user_coll.has(username):
+            print(f"[INFO] Cannot change state of unknown user '{username}'")
+            return False
+        changes = {"_key": username, "active": active}
+        timestamp = dt.now(tz=UTC).isoformat()
+        if deleted:
+            changes["deletedAt"] = timestamp
+        elif not active:
+            changes["deactivatedAt"] = timestamp
+        else:
+            changes.update(deletedAt=None, deactivatedAt=None)
+        self.user_coll.update(changes, keep_none=False)
+        state = "deleted" if deleted else "active" if active else "deactivated"
+        print(f"[INFO] User '{username}' marked {state}")
+        return True
+
+    def get_influence(self, username: str) -> dict | None:
+        """PageRank scores from the last analytics run, or None if never scored."""
+        UserValidator.validate_username(username)
+        user = self.user_coll.get(username)
+        if user is None:
+            raise UserNotFoundError(f"User '{username}' does not exist")
+        if user.get("influenceRank") is None:
+            return None
+        return {
+            "username": username,
+            "pagerank": user["pagerank"],
+            "influence": user["influence"],
+            "rank": user["influenceRank"],
+            "computed_at": user.get("pagerankComputedAt"),
+        }
+
+    def top_influencers(self, limit: int = 100) -> list[dict]:
+        # Served from the sparse users_influence_rank index
+        cursor = self.db.aql.execute(
+            """
+            FOR u IN users
+                FILTER u.influenceRank != null
+                SORT u.influenceRank
+                LIMIT @limit
+                RETURN {
+                    username: u._key,
+                    pagerank: u.pagerank,
+                    influence: u.influence,
+                    rank: u.influenceRank,
+                    computed_at: u.pagerankComputedAt
+                }
+            """,
+            bind_vars={"limit": limit},
+        )
+        return list(cursor)
@@ -0,0 +1,11 @@
+def hidden_lookup(owner: str) -> str:
+    """AQL that binds ``hidden`` to an ``{_id: true}`` object of the users
+    ``owner`` (a bind parameter holding a ``users/...`` id) blocked or muted.
+
+    One edge-index scan of ``blocks`` per query; queries then drop hidden
+    vertices with ``!HAS(hidden, <id>)`` instead of a lookup per row.
+    """
+    return f"""
+        LET hiddenIds = (FOR b IN blocks FILTER b._from == @{owner} RETURN b._to)
+        LET hidden = ZIP(hiddenIds, hiddenIds[* RETURN true])
+    """
@@ -0,0 +1,84 @@
+import asyncio
+
+from fastapi import APIRouter, HTTPException, status
+
+from app.models import RelationCreate, RelationOut
+from app.repositories import block_repo
+from app.repositories.block_repo import BLOCK, MUTE
+from app.repositories.user_repo import UserNotFoundError
+
+router = APIRouter(
+    prefix="/follow",
+    tags=["Blocks"],
+    responses={404: {"description": "User or relation not found"}},
+)
+
+
+async def _set(payload: RelationCreate, kind: str) -> RelationOut:
+    try:
+        edge = await asyncio.to_thread(block_repo.set_relation, payload.user, payload.target, kind)
+    except UserNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return RelationOut(username=payload.target, kind=kind, created_at=edge["createdAt"])
+
+
+async def _remove(payload: RelationCreate, kind: str):
+    try:
+        removed = await asyncio.to_thread(block_repo.remove_relation, payload.user, payload.target, kind)
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if not removed:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{kind.capitalize()} not found")
+
+
+async def _list(username: str, kind: str) -> list[RelationOut]:
+    try:
+        rows = await asyncio.to_thread(block_repo.list_relations, username, kind)
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return [RelationOut(username=r["username"], kind=r["kind"], created_at=r["createdAt"]) for r in rows]
+
+
+@router.post(
+    "/blocks/",
+    response_model=RelationOut,
+    status_code=status.HTTP_201_CREATED,
+    summary="Block a user",
+    description="Hide `target` from `user`'s lists and traversals, remove follows between them "
+                "in both directions and prevent new ones.",
+)
+async def create_block(payload: RelationCreate):
+    return await _set(payload, BLOCK)
+
+
+@router.delete("/blocks/", status_code=status.HTTP_204_NO_CONTENT, summary="Unblock a user")
+async def delete_block(payload: RelationCreate):
+    await _remove(payload, BLOCK)
+
+
+@router.get("/blocks/{username}", response_model=list[RelationOut], summary="Users blocked by a user")
+async def get_blocks(username: str):
+    return await _list(username, BLOCK)
+
+
+@router.post(
+    "/mutes/",
+    response_model=RelationOut,
+    status_code=status.HTTP_201_CREATED,
+    summary="Mute a user",
+    description="Hide `target` from `user`'s lists and traversals without touching follows.",
+)
+async def create_mute(payload: RelationCreate):
+    return await _set(payload, MUTE)
+
+
+@router.delete("/mutes/", status_code=status.HTTP_204_NO_CONTENT, summary="Unmute a user")
+async def delete_mute(payload: RelationCreate):
+    await _remove(payload, MUTE)
+
+
+@router.get("/mutes/{username}", response_model=list[RelationOut], summary="Users muted by a user")
+async def get_mutes(username: str):
+    return await _list(username, MUTE)
@@ -1,7 +1,15 @@
-from fastapi import APIRouter, HTTPException, status
+import asyncio
+from datetime import datetime
 
-from app.models import FollowCreate, FollowOut
-from app.repositories import follow_repo
+from fastapi import APIRouter, Header, HTTPException, Query, Response, status
+
+from app.binary_encoding import negotiate, render
+from app.cursors import first_n
+from app.http_caching import etag_matches, list_validators
+from app.models import FollowCreate, FollowDeltaOut, FollowOut, UnfollowOut
+from app.repositories import follow_repo, graph_traversal_repo, single_flight
+from app.repositories.user_repo import UserNotFoundError
+from app.validators.username_validator import UserValidator
 
 router = APIRouter(
     prefix="/follow",
@@ -20,8 +28,12 @@ router = APIRouter(
 async def create_follow(payload: FollowCreate):
     try:
         edge = follow_repo.create_follow(payload.follower, payload.followed)
-    except ValueError as e:
+    except UserNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except PermissionError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
 
     return FollowOut(
         followed=payload.followed,
@@ -29,14 +41,93 @@ async def create_follow(payload: FollowCreate):
     )
 
 
+_MEDIA_VARIANTS = {None: "", "application/x-follow-columnar": "col", "application/msgpack": "mp"}
+
+
+def _validate_username(username: str):
+    # Checked up front so every list path answers a bad name the same way
+    try:
+        UserValidator.validate_username(username)
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+async def _check_list_version(
+        response: Response,
+        username: str,
+        direction: str,
+        limit: int | None,
+        media_type: str | None,
+        read_your_writes: bool,
+        if_none_match: str | None,
+) -> tuple[Response | None, int]:
+    # The version is read before the list, so an ETag can only be older than
+    # the body it is sent with, never newer. Callers pass it on so cached
+    # bodies are looked up by the same version
+    version, modified_at = await asyncio.to_thread(
+        follow_repo.get_list_version, username, direction, read_your_writes
+    )
+    variant = "-".join(v for v in (f"l{limit}" if limit else "", _MEDIA_VARIANTS[media_type]) if v)
+    headers = list_validators(username, direction, version, modified_at, variant=variant)
+    headers["Vary"] = "Accept"
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers), version
+    response.headers.update(headers)
+    return None, version
+
+
 @router.get(
     "/followers/{username}",
     response_model=list[FollowOut],
     summary="Get followers",
-    description="Return all users that follow the given username.",
+    description="Return all users that follow the given username, or only those "
+                "who followed after `since` when it is given.",
 )
-async def get_followers(username: str):
-    records = follow_repo.get_followers(username)
+async def get_followers(
+        response: Response,
+        username: str,
+        since: datetime | None = Query(None, description="Only followers gained after this time"),
+        limit: int | None = Query(None, ge=1, description="Return at most this many followers"),
+        read_your_writes: bool = Header(False, alias="X-Read-Your-Writes"),
+        if_none_match: str | None = Header(None),
+        accept: str | None = Header(None),
+):
+    media_type = negotiate(accept)
+    _validate_username(username)
+    use_snapshot = graph_traversal_repo.snapshot_store is not None and not read_your_writes
+    version = None
+    if since is None and not use_snapshot:
+        # Snapshot bodies lag the database version, so they carry no validators
+        not_modified, version = await _check_list_version(
+            response, username, "followers", limit, media_type, read_your_writes, if_none_match
+        )
+        if not_modified is not None:
+            return not_modified
+
+    args, options = (username, read_your_writes), {}
+    if since is not None:
+        # Index range scan; the snapshot and caches only hold full lists
+        fetch, options = follow_repo.get_followers, {"since": since}
+    elif limit is not None and not use_snapshot:
+        # Stream and stop after `limit` rows instead of loading every follower
+        fetch, args = first_n, (follow_repo.iter_followers, limit, username, read_your_writes)
+    elif use_snapshot:
+        fetch = graph_traversal_repo.get_followers
+    else:
+        fetch, options = follow_repo.get_followers, {"version": version}
+    try:
+        # Requests that read different versions must not share one body
+        records = await single_flight.do(
+            ("get_followers", username, read_your_writes, since, limit, version), fetch, *args, **options
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Followers lookup timed out")
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if limit is not None:
+        records = records[:limit]
+    if media_type is not None:
+        return render(records, media_type, headers=dict(response.headers))
     return [
         FollowOut(
             followed=r["followed"],
@@ -46,14 +137,70 @@ async def get_followers(username: str):
     ]
 
 
+@router.get(
+    "/followers/{username}/delta",
+    response_model=FollowDeltaOut,
+    summary="Get follower changes",
+    description="Return followers gained and lost after `since`. Pass the returned "
+                "`watermark` as `since` on the next poll; when `complete` is false "
+                "the window is older than the unfollow history and the full list "
+                "should be fetched again.",
+)
+async def get_followers_delta(
+        username: str,
+        since: datetime = Query(..., description="Watermark from the previous poll"),
+):
+    _validate_username(username)
+    try:
+        delta = await single_flight.do(
+            ("get_followers_delta", username, since), follow_repo.get_followers_delta, username, since
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Followers delta timed out")
+    return FollowDeltaOut(
+        added=[FollowOut(followed=r["followed"], followed_at=r["followedAt"]) for r in delta["added"]],
+        removed=[UnfollowOut(followed=r["followed"], removed_at=r["removedAt"]) for r in delta["removed"]],
+        watermark=delta["watermark"],
+        complete=delta["complete"],
+    )
+
+
 @router.get(
     "/following/{username}",
     response_model=list[FollowOut],
     summary="Get following",
     description="Return all users that the given username is following.",
 )
-async def get_following(username: str):
-    records = follow_repo.get_following(username)
+async def get_following(
+        response: Response,
+        username: str,
+        limit: int | None = Query(None, ge=1, description="Return at most this many users"),
+        read_your_writes: bool = Header(False, alias="X-Read-Your-Writes"),
+        if_none_match: str | None = Header(None),
+        accept: str | None = Header(None),
+):
+    media_type = negotiate(accept)
+    _validate_username(username)
+    not_modified, version = await _check_list_version(
+        response, username, "following", limit, media_type, read_your_writes, if_none_match
+    )
+    if not_modified is not None:
+        return not_modified
+
+    if limit is not None:
+        fetch, args = first_n, (follow_repo.iter_following, limit, username, read_your_writes)
+    else:
+        fetch, args = follow_repo.get_following, (username, read_your_writes, version)
+    try:
+        records = await single_flight.do(
+            ("get_following", username, read_your_writes, limit, version), fetch, *args
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Following lookup timed out")
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if media_type is not None:
+        return render(records, media_type, headers=dict(response.headers))
     return [
         FollowOut(
             followed=r["followed"],
@@ -70,7 +217,10 @@ async def get_following(username: str):
     description="Remove a follow edge between two usernames.",
 )
 async def delete_follow(payload: FollowCreate):
-    removed = follow_repo.delete_follow(payload.follower, payload.followed)
+    try:
+        removed = follow_repo.delete_follow(payload.follower, payload.followed)
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     if not removed:
         raise HTTPException(status_code=404, detail="Follow relation not found")
 
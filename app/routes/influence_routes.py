@@ -0,0 +1,43 @@
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Query, status
+
+from app.models import InfluenceOut
+from app.repositories import single_flight, user_repo
+from app.repositories.user_repo import UserNotFoundError
+
+router = APIRouter(
+    prefix="/follow/influence",
+    tags=["Influence"],
+)
+
+
+@router.get(
+    "",
+    response_model=list[InfluenceOut],
+    summary="Top influencers",
+    description="Users with the highest PageRank from the last analytics run.",
+)
+async def top_influencers(limit: int = Query(100, ge=1, le=1000)):
+    try:
+        return await single_flight.do(("top_influencers", limit), user_repo.top_influencers, limit)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Influence lookup timed out")
+
+
+@router.get(
+    "/{username}",
+    response_model=InfluenceOut,
+    summary="Influence of a user",
+    description="PageRank score and rank of the given username from the last analytics run.",
+)
+async def get_influence(username: str):
+    try:
+        result = await asyncio.to_thread(user_repo.get_influence, username)
+    except UserNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No influence score for '{username}' yet")
+    return result
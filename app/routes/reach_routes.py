@@ -0,0 +1,30 @@
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Query, status
+
+from app.models import ReachOut
+from app.repositories import graph_traversal_repo, single_flight
+
+router = APIRouter(
+    prefix="/follow/reach",
+    tags=["Reach"],
+)
+
+
+@router.get(
+    "/{username}",
+    response_model=ReachOut,
+    summary="Estimate reach",
+    description="Approximate number of users within `depth` follow hops of the given "
+                "username. `exact` tells whether the count was estimated from sketches.",
+)
+async def estimate_reach(username: str, depth: int = Query(2, ge=1, le=10)):
+    try:
+        result = await single_flight.do(
+            ("estimate_reach", username, depth), graph_traversal_repo.estimate_reach, username, depth
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Reach estimation timed out")
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return ReachOut(username=username, depth=depth, **result)
@@ -1,15 +1,102 @@
-from fastapi import APIRouter, Query
-from app.repositories import graph_traversal_repo
-from app.models import FollowOut
+import asyncio
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response, status
+from app.repositories import graph_traversal_repo, single_flight, traversal_executor
+from app.cursors import first_n
+from app.traversal_executor import ClientDisconnected, TraversalQueueFull, cancel_on_disconnect
+from app.binary_encoding import negotiate, render
+from app.config import settings
+from app.models import BatchTraversalIn, BatchTraversalOut, FollowOut
 
 router = APIRouter(
     prefix="/follow/traverse/bfs",
     tags=["Traversal - BFS"],
 )
 
+@router.post(
+    "/batch",
+    response_model=BatchTraversalOut,
+    summary="BFS from many users",
+    description="Runs one multi-source traversal and returns the users reachable from each "
+                "start user, nearest first. Unknown users get an empty list.",
+)
+async def traverse_bfs_batch(
+        body: BatchTraversalIn,
+        depth: int = Query(3, ge=1, le=10),
+        read_your_writes: bool = Header(False, alias="X-Read-Your-Writes"),
+):
+    if not body.usernames:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="usernames must not be empty")
+    if len(body.usernames) > settings.traversal_batch_max_sources:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.traversal_batch_max_sources} usernames per batch",
+        )
+    key = ("traverse_bfs_batch", tuple(sorted(set(body.usernames))), depth, read_your_writes)
+    try:
+        results = await single_flight.do(
+            key, graph_traversal_repo.traverse_bfs_multi, body.usernames, depth, read_your_writes
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Traversal timed out")
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return BatchTraversalOut(
+        depth=depth,
+        results={
+            source: [FollowOut(followed=r["followed"], followed_at=r.get("followedAt")) for r in records]
+            for source, records in results.items()
+        },
+    )
+
+
 @router.get("/{username}", response_model=list[FollowOut])
-async def traverse_bfs(username: str, depth: int = Query(3, ge=1, le=10)):
-    records = graph_traversal_repo.traverse_bfs(username, max_depth=depth)
+async def traverse_bfs(
+        request: Request,
+        response: Response,
+        username: str,
+        depth: int = Query(3, ge=1, le=10),
+        limit: int | None = Query(None, ge=1, description="Return at most this many users, nearest first"),
+        read_your_writes: bool = Header(False, alias="X-Read-Your-Writes"),
+        accept: str | None = Header(None),
+):
+    key = ("traverse_bfs", username, depth, read_your_writes, limit)
+    try:
+        if limit is not None and (traversal_executor is None or read_your_writes):
+            # Stop the streamed traversal once `limit` users have been read
+            records = await single_flight.do(
+                key, first_n, graph_traversal_repo.iter_bfs, limit, username, depth, read_your_writes
+            )
+        elif traversal_executor is not None and not read_your_writes:
+            # The shared call is only cancelled once every coalesced client has left
+            records = await cancel_on_disconnect(
+                single_flight.do(key, traversal_executor.run, "bfs", username, depth),
+                request,
+            )
+        else:
+            records, plan = await single_flight.do(
+                key, graph_traversal_repo.traverse_bfs_planned, username, depth, read_your_writes
+            )
+            if plan is not None:
+                response.headers["X-Traversal-Strategy"] = plan.strategy
+    except TraversalQueueFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
+    except ClientDisconnected as e:
+        # nginx-style 499: nobody is left to read it, but the request ends cleanly
+        raise HTTPException(status_code=499, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Traversal timed out")
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if limit is not None:
+        records = records[:limit]
+    media_type = negotiate(accept)
+    if media_type is not None:
+        return render(records, media_type, headers=dict(response.headers))
     return [
         FollowOut(
             followed=r.get("followed"),
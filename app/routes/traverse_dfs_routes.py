@@ -1,5 +1,9 @@
-from fastapi import APIRouter, Query
-from app.repositories import graph_traversal_repo
+import asyncio
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request, status
+from app.repositories import graph_traversal_repo, single_flight, traversal_executor
+from app.traversal_executor import ClientDisconnected, TraversalQueueFull, cancel_on_disconnect
+from app.binary_encoding import negotiate, render
 from app.models import FollowOut
 
 router = APIRouter(
@@ -8,8 +12,41 @@ router = APIRouter(
 )
 
 @router.get("/{username}", response_model=list[FollowOut])
-async def traverse_dfs(username: str, depth: int = Query(3, ge=1, le=10)):
-    records = graph_traversal_repo.traverse_dfs(username, max_depth=depth)
+async def traverse_dfs(
+        request: Request,
+        username: str,
+        depth: int = Query(3, ge=1, le=10),
+        read_your_writes: bool = Header(False, alias="X-Read-Your-Writes"),
+        accept: str | None = Header(None),
+):
+    key = ("traverse_dfs", username, depth, read_your_writes)
+    try:
+        if traversal_executor is not None and not read_your_writes:
+            # The shared call is only cancelled once every coalesced client has left
+            records = await cancel_on_disconnect(
+                single_flight.do(key, traversal_executor.run, "dfs", username, depth),
+                request,
+            )
+        else:
+            records = await single_flight.do(
+                key, graph_traversal_repo.traverse_dfs, username, depth, read_your_writes
+            )
+    except TraversalQueueFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
+    except ClientDisconnected as e:
+        # nginx-style 499: nobody is left to read it, but the request ends cleanly
+        raise HTTPException(status_code=499, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Traversal timed out")
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    media_type = negotiate(accept)
+    if media_type is not None:
+        return render(records, media_type)
     return [
         FollowOut(
             followed=r.get("followed"),
@@ -0,0 +1,72 @@
+import asyncio
+import inspect
+from collections import defaultdict
+
+
+class SingleFlight:
+    """Share one in-flight call between concurrent identical requests.
+
+    Calls are keyed by ``(method, *args)``. The first caller for a key starts
+    the work; callers arriving while it runs await the same result instead of
+    issuing their own query. Nothing is kept once the call finishes, so results
+    are never stale.
+    """
+
+    def __init__(self, default_timeout: float = None, timeouts: dict[str, float] = None):
+        self.default_timeout = default_timeout
+        self.timeouts = timeouts or {}
+        self._in_flight: dict[tuple, asyncio.Task] = {}
+        self._waiters: dict[tuple, int] = {}
+        self._metrics = defaultdict(lambda: {"calls": 0, "executions": 0, "coalesced": 0, "timeouts": 0})
+
+    def metrics(self) -> dict[str, dict[str, int]]:
+        return {method: dict(counters) for method, counters in self._metrics.items()}
+
+    async def do(self, key: tuple, fn, *args, **kwargs):
+        method = key[0]
+        counters = self._metrics[method]
+        counters["calls"] += 1
+
+        task = self._in_flight.get(key)
+        if task is None:
+            counters["executions"] += 1
+            task = asyncio.ensure_future(self._call(fn, *args, **kwargs))
+            self._in_flight[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda _: self._forget(key, task))
+        else:
+            counters["coalesced"] += 1
+            print(f"[INFO] Coalesced {method} call for {key[1:]!r}")
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(task), self.timeouts.get(method, self.default_timeout)
+            )
+        except asyncio.TimeoutError:
+            counters["timeouts"] += 1
+            print(f"[WARN] {method} call for {key[1:]!r} timed out waiting on shared result")
+            raise
+        finally:
+            self._release(key, task)
+
+    @staticmethod
+    async def _call(fn, *args, **kwargs):
+        if inspect.iscoroutinefunction(fn):
+            return await fn(*args, **kwargs)
+        # Repository methods are blocking, run them off the event loop
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+    def _release(self, key: tuple, task: asyncio.Task):
+        if self._in_flight.get(key) is not task:
+            return
+        self._waiters[key] -= 1
+        if self._waiters[key] == 0 and not task.done():
+            # Every caller gave up (timeout or cancellation), stop the work
+            task.cancel()
+            self._forget(key, task)
+
+    def _forget(self, key: tuple, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+            del self._waiters[key]
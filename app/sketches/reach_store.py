@@ -0,0 +1,88 @@
+import base64
+
+from arango.database import StandardDatabase
+from arango.exceptions import DocumentRevisionError, DocumentUpdateError
+
+from app.sketches.hyperloglog import HyperLogLog
+
+
+class ReachSketchStore:
+    """Per-user HyperLogLog sketches of the users each user follows.
+
+    Sketches live in the ``reach_sketches`` collection and are built lazily
+    from the follows collection the first time they are needed. A follow
+    adds to the follower's sketch in place; an unfollow drops it, since a
+    sketch cannot forget a member, and the next read rebuilds it.
+    """
+
+    def __init__(self, db: StandardDatabase, precision: int = 12, chunk_size: int = 1000):
+        self.db = db
+        self.precision = precision
+        self.chunk_size = chunk_size
+        self.collection = db.collection("reach_sketches")
+
+    @staticmethod
+    def _encode(sketch: HyperLogLog) -> str:
+        return base64.b64encode(sketch.to_bytes()).decode()
+
+    def payloads(self, usernames) -> dict[str, bytes]:
+        """Serialized 1-hop sketches for ``usernames``, building any missing."""
+        usernames = list(dict.fromkeys(usernames))
+        found: dict[str, bytes] = {}
+        for i in range(0, len(usernames), self.chunk_size):
+            chunk = usernames[i:i + self.chunk_size]
+            cursor = self.db.aql.execute(
+                "FOR s IN reach_sketches FILTER s._key IN @keys AND s.p == @p RETURN [s._key, s.data]",
+                bind_vars={"keys": chunk, "p": self.precision},
+            )
+            stored = {key: base64.b64decode(data) for key, data in cursor}
+            missing = [name for name in chunk if name not in stored]
+            if missing:
+                stored.update({name: s.to_bytes() for name, s in self.build(missing).items()})
+            found.update(stored)
+        return found
+
+    def build(self, usernames: list[str]) -> dict[str, HyperLogLog]:
+        cursor = self.db.aql.execute(
+            """
+            FOR name IN @names
+                LET following = (
+                    FOR e IN follows
+                        FILTER e._from == CONCAT("users/", name)
+                        RETURN PARSE_IDENTIFIER(e._to).key
+                )
+                RETURN [name, following]
+            """,
+            bind_vars={"names": usernames},
+        )
+        sketches = {}
+        for name, following in cursor:
+            sketch = HyperLogLog(self.precision)
+            sketch.update(following)
+            sketches[name] = sketch
+
+        self.collection.import_bulk(
+            [{"_key": name, "p": self.precision, "data": self._encode(s)} for name, s in sketches.items()],
+            on_duplicate="replace",
+        )
+        print(f"[SKETCH] Built {len(sketches)} reach sketches")
+        return sketches
+
+    def on_follow_change(self, follower: str, followed: str, created: bool = True):
+        if not created:
+            self.collection.delete(follower, ignore_missing=True)
+            return
+
+        doc = self.collection.get(follower)
+        if doc is None or doc.get("p") != self.precision:
+            # Built with the new edge included on the next read
+            return
+        sketch = HyperLogLog.from_bytes(base64.b64decode(doc["data"]))
+        sketch.add(followed)
+        try:
+            self.collection.update(
+                {"_key": follower, "_rev": doc["_rev"], "data": self._encode(sketch)}, check_rev=True
+            )
+        except (DocumentRevisionError, DocumentUpdateError):
+            # Lost a race with another write to the same sketch; rebuild later
+            self.collection.delete(follower, ignore_missing=True)
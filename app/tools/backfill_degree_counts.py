@@ -0,0 +1,56 @@
+"""Recompute materialised followerCount/followingCount on user documents.
+
+Usage:
+    python -m app.tools.backfill_degree_counts [--batch-size 5000] [--test]
+
+Run once before enabling FOLLOW_DEGREE_COUNTS, and again whenever the
+counts may have drifted (bulk ingest, failed count updates). Writes made
+while it runs may be counted twice or not at all for the users they touch.
+"""
+import argparse
+import time
+
+from arango.database import StandardDatabase
+
+
+def backfill_degree_counts(db: StandardDatabase, batch_size: int) -> int:
+    total = 0
+    last_key = ""
+    while True:
+        # Keyset pagination so each batch is an index range scan
+        updated = list(db.aql.execute(
+            """
+            FOR u IN users
+                FILTER u._key > @lastKey
+                SORT u._key
+                LIMIT @batch
+                LET following = LENGTH(FOR e IN follows FILTER e._from == u._id RETURN 1)
+                LET followers = LENGTH(FOR e IN follows FILTER e._to == u._id RETURN 1)
+                UPDATE u WITH { followingCount: following, followerCount: followers } IN users
+                RETURN NEW._key
+            """,
+            bind_vars={"lastKey": last_key, "batch": batch_size},
+        ))
+        if not updated:
+            return total
+        total += len(updated)
+        last_key = max(updated)
+        print(f"[BACKFILL] Counted degrees for {total} users")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--test", action="store_true", help="Run against the test database")
+    args = parser.parse_args()
+
+    from app import get_arango_db_helper
+
+    db = get_arango_db_helper(is_test_mode=args.test).db
+    started = time.perf_counter()
+    users = backfill_degree_counts(db, args.batch_size)
+    print(f"[BACKFILL] Done: {users} users in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""Bulk-load users and follow edges from NDJSON or CSV files.
+
+Usage:
+    python -m app.tools.bulk_ingest [--users users.ndjson] [--follows follows.csv]
+        [--chunk-size 5000] [--workers 4] [--checkpoint ingest.ckpt] [--test]
+
+Users are read from ``{"username": ...}`` lines or a CSV with a ``username``
+column; follows from ``{"follower", "followed", "followedAt"?}`` lines or the
+matching CSV columns. ``-`` reads from stdin. Files ending in ``.csv`` are
+parsed as CSV, everything else as NDJSON.
+
+Chunks are written with ``import_bulk(on_duplicate="ignore")``, so reruns and
+overlaps with users created by the consumer are harmless. With
+``--checkpoint`` the number of records fully loaded per input is saved after
+every chunk and a rerun skips them. Load users before the follows that
+reference them; edges are not checked against the users collection. With
+USER_ID_INTERNING on, a pair that already has an edge under the legacy
+``follower__followed`` key keeps that key instead of gaining a compact copy.
+
+Bulk writes bypass the repositories, so caches expire on their TTL, graph
+snapshots pick the data up on their next rebuild, and list versions (ETags)
+are not bumped: run this before serving traffic for the loaded users.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime as dt, UTC
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+
+from arango.collection import StandardCollection
+
+from app.interning import UserIdInterner, compact_edge_key
+from app.validators.username_validator import UserValidator
+
+
+def read_records(path: str) -> Iterator[dict]:
+    stream = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+    try:
+        if path.endswith(".csv"):
+            yield from csv.DictReader(stream)
+        else:
+            for line in stream:
+                if line.strip():
+                    yield json.loads(line)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def chunked(records: Iterable, size: int) -> Iterator[list]:
+    records = iter(records)
+    while chunk := list(islice(records, size)):
+        yield chunk
+
+
+def _valid_usernames(names: list) -> tuple[list[str], list]:
+    try:
+        return UserValidator.validate_many(names), []
+    except ValueError:
+        # Only pay for the per-name pass when the chunk has bad rows
+        valid, rejected = [], []
+        for name in names:
+            try:
+                UserValidator.validate_username(name)
+                valid.append(name)
+            except (TypeError, ValueError):
+                rejected.append(name)
+        return valid, rejected
+
+
+def user_documents(rows: list[dict], interner: UserIdInterner = None) -> tuple[list[dict], list]:
+    names, rejected = _valid_usernames([row.get("username") for row in rows])
+    docs = [{"_key": name, "username": name} for name in names]
+    if interner is not None and docs:
+        # Ids reserved for users that turn out to exist already are skipped
+        for doc, uid in zip(docs, interner.reserve(len(docs))):
+            doc["uid"] = uid
+    return docs, rejected
+
+
+def follow_documents(
+        rows: list[dict],
+        interner: UserIdInterner = None,
+        follow_coll: StandardCollection = None,
+) -> tuple[list[dict], list]:
+    valid, _ = _valid_usernames(
+        list({name for row in rows for name in (row.get("follower"), row.get("followed"))})
+    )
+    valid = set(valid)
+    uids = interner.uids_of(valid) if interner is not None else {}
+    now = dt.now(tz=UTC).isoformat()
+
+    docs, rejected, compact = [], [], {}
+    for row in rows:
+        follower, followed = row.get("follower"), row.get("followed")
+        if follower not in valid or followed not in valid or follower == followed:
+            rejected.append(row)
+            continue
+        edge = {
+            "_key": f"{follower}__{followed}",
+            "_from": f"users/{follower}",
+            "_to": f"users/{followed}",
+            "followedAt": row.get("followedAt") or now,
+        }
+        if follower in uids and followed in uids:
+            compact[edge["_key"]] = edge
+            edge.update(
+                _key=compact_edge_key(uids[follower], uids[followed]),
+                fromUid=uids[follower],
+                toUid=uids[followed],
+            )
+        docs.append(edge)
+
+    if follow_coll is not None and compact:
+        # Pairs already stored under the legacy username key keep it, as in
+        # create_follow; a compact copy would be a second edge for the pair
+        for existing in follow_coll.get_many(list(compact)):
+            compact[existing["_key"]]["_key"] = existing["_key"]
+    return docs, rejected
+
+
+class Checkpoint:
+    """Records loaded so far per input, persisted as JSON after every chunk."""
+
+    def __init__(self, path: str | None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._done: dict[str, int] = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self._done = json.load(f)
+
+    def records_done(self, stream: str) -> int:
+        return self._done.get(stream, 0)
+
+    def save(self, stream: str, records_done: int):
+        with self._lock:
+            self._done[stream] = records_done
+            if not self.path:
+                return
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._done, f)
+            os.replace(tmp_path, self.path)
+
+
+def ingest(
+        collection: StandardCollection,
+        records: Iterable[dict],
+        build: Callable[[list[dict]], tuple[list[dict], list]],
+        stream: str,
+        checkpoint: Checkpoint,
+        chunk_size: int = 5000,
+        workers: int = 4,
+) -> dict[str, int]:
+    """Load ``records`` in parallel chunks and return import totals.
+
+    Chunks finish out of order, so the checkpoint only advances over the
+    contiguous prefix of finished chunks; anything after it is re-imported
+    on resume and ignored as a duplicate.
+    """
+    skip = checkpoint.records_done(stream)
+    if skip:
+        print(f"[INGEST] {stream}: resuming after {skip} records")
+    records = islice(records, skip, None)
+
+    totals = {"records": skip, "created": 0, "ignored": 0, "errors": 0, "rejected": 0}
+    loaded = 0
+    sizes: dict[int, int] = {}
+    finished: set[int] = set()
+    next_unfinished = 0
+    started = time.perf_counter()
+
+    def load(chunk: list[dict]) -> dict:
+        docs, rejected = build(chunk)
+        result = collection.import_bulk(docs, on_duplicate="ignore") if docs else {}
+        if rejected:
+            print(f"[INGEST] {stream}: rejected {rejected!r}", file=sys.stderr)
+        return {
+            "created": result.get("created", 0),
+            "ignored": result.get("ignored", 0),
+            "errors": result.get("errors", 0),
+            "rejected": len(rejected),
+        }
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+        chunks = enumerate(chunked(records, chunk_size))
+        while True:
+            # Keep a bounded number of chunks in memory
+            for index, chunk in islice(chunks, workers * 2 - len(pending)):
+                sizes[index] = len(chunk)
+                pending[pool.submit(load, chunk)] = index
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                for key, value in future.result().items():
+                    totals[key] += value
+                totals["records"] += sizes[index]
+                loaded += sizes[index]
+                finished.add(index)
+
+            advanced = 0
+            while next_unfinished in finished:
+                finished.discard(next_unfinished)
+                advanced += sizes.pop(next_unfinished)
+                next_unfinished += 1
+            if advanced:
+                skip += advanced
+                checkpoint.save(stream, skip)
+
+            elapsed = time.perf_counter() - started
+            rate = loaded / elapsed if elapsed else 0
+            print(
+                f"[INGEST] {stream}: {totals['records']} records "
+                f"({totals['created']} created, {totals['ignored']} existing, "
+                f"{totals['errors']} errors, {totals['rejected']} rejected) {rate:,.0f} rec/s"
+            )
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", help="NDJSON/CSV file of usernames")
+    parser.add_argument("--follows", help="NDJSON/CSV file of follow edges")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--checkpoint", help="File recording progress for resuming")
+    parser.add_argument("--test", action="store_true", help="Run against the test database")
+    args = parser.parse_args()
+    if not args.users and not args.follows:
+        parser.error("nothing to load: pass --users and/or --follows")
+
+    from app import get_arango_db_helper
+    from app.config import settings
+
+    helper = get_arango_db_helper(is_test_mode=args.test)
+    interner = UserIdInterner(db=helper.db) if settings.user_id_interning else None
+    follow_coll = helper.get_collection("follows")
+    checkpoint = Checkpoint(args.checkpoint)
+
+    jobs = [
+        ("users", args.users, lambda rows: user_documents(rows, interner)),
+        ("follows", args.follows, lambda rows: follow_documents(rows, interner, follow_coll)),
+    ]
+    for name, path, build in jobs:
+        if not path:
+            continue
+        started = time.perf_counter()
+        totals = ingest(
+            helper.get_collection(name),
+            read_records(path),
+            build,
+            stream=f"{name}:{path}",
+            checkpoint=checkpoint,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+        )
+        elapsed = time.perf_counter() - started
+        print(f"[INGEST] Done {name}: {totals} in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
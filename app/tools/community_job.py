@@ -0,0 +1,93 @@
+"""Label every user with its connected component and community.
+
+Usage:
+    python -m app.tools.community_job [--max-iter 20] [--seed 0]
+        [--batch-size 10000] [--test]
+
+Follows are treated as undirected. ``component`` is the weakly connected
+component found with union-find over the edge stream; ``community`` comes
+from label propagation. Both are stored on ``users`` as the username of a
+member, along with ``communityComputedAt``. With COMMUNITY_UPDATES_ENABLED
+the service keeps the labels roughly current between runs.
+"""
+import argparse
+import json
+import time
+from collections import Counter
+from datetime import datetime as dt, UTC
+
+from arango.database import StandardDatabase
+
+from app.analytics.communities import connected_components, label_propagation
+from app.analytics.edges import EdgeList, load_edge_list
+
+
+def write_labels(
+        db: StandardDatabase,
+        graph: EdgeList,
+        components,
+        communities,
+        batch_size: int = 10_000,
+        computed_at: str = None,
+) -> int:
+    computed_at = computed_at or dt.now(UTC).isoformat()
+    names = graph.names
+    written = 0
+    for start in range(0, len(graph), batch_size):
+        rows = [
+            [names[v], names[components[v]], names[communities[v]]]
+            for v in range(start, min(start + batch_size, len(graph)))
+        ]
+        db.aql.execute(
+            """
+            FOR row IN @rows
+                UPDATE { _key: row[0] } WITH {
+                    component: row[1],
+                    community: row[2],
+                    communityComputedAt: @computedAt
+                } IN users OPTIONS { ignoreErrors: true }
+            """,
+            bind_vars={"rows": rows, "computedAt": computed_at},
+        )
+        written += len(rows)
+        print(f"[COMMUNITY] Wrote labels for {written}/{len(graph)} users")
+    return written
+
+
+def run(db: StandardDatabase, max_iter: int = 20, seed: int = 0, batch_size: int = 10_000) -> dict:
+    started = time.perf_counter()
+    graph = load_edge_list(db, batch_size)
+    components = connected_components(len(graph), graph.sources, graph.targets)
+    communities = label_propagation(len(graph), graph.sources, graph.targets, max_iter=max_iter, seed=seed)
+    write_labels(db, graph, components, communities, batch_size)
+
+    component_sizes = Counter(components)
+    community_sizes = Counter(communities)
+    return {
+        "users": len(graph),
+        "edges": graph.edge_count,
+        "components": len(component_sizes),
+        "largest_component": max(component_sizes.values(), default=0),
+        "communities": len(community_sizes),
+        "largest_community": max(community_sizes.values(), default=0),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-iter", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--test", action="store_true", help="Run against the test database")
+    args = parser.parse_args()
+
+    from app import get_arango_db_helper
+
+    db = get_arango_db_helper(is_test_mode=args.test).db
+    stats = run(db, max_iter=args.max_iter, seed=args.seed, batch_size=args.batch_size)
+    print(f"[COMMUNITY] Done: {json.dumps(stats)}")
+
+
+if __name__ == "__main__":
+    main()
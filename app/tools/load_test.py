@@ -0,0 +1,448 @@
+"""Drive the HTTP API with a traffic mix and report latency per endpoint.
+
+Usage:
+    python -m app.tools.load_test [--rps 200] [--duration 30] [--mix mix.json]
+        [--replay traffic.ndjson] [--users 1000] [--depths 2,3] [--seed 1]
+        [--prepare 10] [--capacity --p99-slo 250 --max-error-rate 0.01]
+        [--base-url http://host:8000 [--rabbitmq-url amqp://...]] [--test] [--json]
+
+Requests go to the FastAPI app in-process through httpx's ASGI transport,
+so no server or network hop is involved (the app still uses its configured
+ArangoDB; ``--test`` points it at the test database). The app runs on its
+own event loop in a separate thread, so its synchronous handlers cannot
+delay the sender's schedule. Startup/shutdown events are not run, so the
+queue consumer and background workers stay off. ``--base-url`` sends the
+same traffic to a running service instead.
+
+Scheduling is open loop: request ``i`` is sent at ``start + i / rps``
+whether or not earlier requests have finished, and latency is measured from
+that scheduled time. A service that falls behind therefore shows the
+queueing delay in its percentiles instead of quietly lowering the load.
+
+Synthetic traffic draws operations from a weighted mix (``--mix`` is a JSON
+object of operation -> weight, see ``OPERATIONS``) over users
+``load_0 .. load_{users-1}``, with low-numbered users far more popular.
+Unfollows undo the stream's earlier follows when there are any; a 404
+from an unfollow (its follow had not landed yet) is an expected result, not
+an error. ``--prepare N`` first creates those users and about N follows
+each: through the repositories in-process, or for ``--base-url`` by
+publishing ``user_created`` events to the service's queue (users have no
+HTTP endpoint) and posting the follows to its API. ``--replay`` sends NDJSON
+lines of ``{"method", "path", "json"?, "label"?, "expect"?}`` in order
+instead, looping if the run outlasts the file; ``expect`` lists error
+statuses that count as correct.
+
+``--capacity`` raises the rate by 1.5x per step until p99 exceeds
+``--p99-slo`` ms or the error rate exceeds ``--max-error-rate``, and
+reports the last rate that met both: the release's capacity number.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter, deque
+from typing import Iterable, Iterator
+
+try:
+    import httpx
+except ImportError:  # optional
+    httpx = None
+
+# operation -> (method, path template, body builder). {user} and {depth} are
+# filled per request; body builders get (user, other user, batch of users)
+OPERATIONS = {
+    "follow": ("POST", "/follow/", lambda user, other, batch: {"follower": user, "followed": other}),
+    "unfollow": ("DELETE", "/follow/", lambda user, other, batch: {"follower": user, "followed": other}),
+    "followers": ("GET", "/follow/followers/{user}", None),
+    "following": ("GET", "/follow/following/{user}", None),
+    "delta": ("GET", "/follow/followers/{user}/delta?since=2025-01-01T00:00:00Z", None),
+    "bfs": ("GET", "/follow/traverse/bfs/{user}?depth={depth}", None),
+    "dfs": ("GET", "/follow/traverse/dfs/{user}?depth={depth}", None),
+    "batch_bfs": ("POST", "/follow/traverse/bfs/batch?depth={depth}", lambda user, other, batch: {"usernames": batch}),
+    "reach": ("GET", "/follow/reach/{user}?depth={depth}", None),
+}
+
+DEFAULT_MIX = {
+    "followers": 35,
+    "following": 25,
+    "follow": 12,
+    "unfollow": 8,
+    "bfs": 12,
+    "dfs": 5,
+    "batch_bfs": 3,
+}
+
+TRAVERSALS = ("bfs", "dfs", "batch_bfs", "reach")
+
+# Error statuses that are a correct answer for the operation: an unfollow
+# sent before its follow completed finds no relation
+EXPECTED_STATUSES = {"unfollow": [404]}
+
+
+def username(index: int) -> str:
+    return f"load_{index}"
+
+
+def _popular_user(rng: random.Random, users: int) -> int:
+    # Log-uniform over 1..users: user 0 is drawn about as often as users
+    # 1-2 together, a heavy head like real follower counts
+    return min(int(users ** rng.random()) - 1, users - 1)
+
+
+def synthetic_requests(
+        mix: dict[str, float],
+        users: int,
+        depths: list[int],
+        seed: int = 1,
+        batch_size: int = 10,
+) -> Iterator[dict]:
+    """Endless, reproducible stream of requests drawn from ``mix``."""
+    unknown = set(mix) - set(OPERATIONS)
+    if unknown:
+        raise ValueError(f"Unknown operations in mix: {', '.join(sorted(unknown))}")
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    # Unfollows undo earlier follows of the same stream where possible, so
+    # they exercise the delete path rather than returning 404
+    followed = deque(maxlen=10_000)
+    while True:
+        op = rng.choices(names, weights)[0]
+        method, template, body = OPERATIONS[op]
+        user, other = _popular_user(rng, users), rng.randrange(users)
+        if other == user:
+            other = (other + 1) % users
+        if op == "follow":
+            followed.append((user, other))
+        elif op == "unfollow" and followed:
+            user, other = followed.popleft()
+        depth = rng.choice(depths)
+        request = {
+            "method": method,
+            "path": template.format(user=username(user), depth=depth),
+            "label": f"{op} depth={depth}" if op in TRAVERSALS else op,
+        }
+        if op in EXPECTED_STATUSES:
+            request["expect"] = EXPECTED_STATUSES[op]
+        if body is not None:
+            batch = [username(_popular_user(rng, users)) for _ in range(batch_size)] if op == "batch_bfs" else None
+            request["json"] = body(username(user), username(other), batch)
+        yield request
+
+
+def replayed_requests(path: str) -> Iterator[dict]:
+    with open(path, encoding="utf-8") as f:
+        recorded = [json.loads(line) for line in f if line.strip()]
+    if not recorded:
+        raise ValueError(f"No requests in {path}")
+    for request in itertools.cycle(recorded):
+        yield {**request, "label": request.get("label") or f"{request['method']} {request['path'].split('?')[0]}"}
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    # Nearest-rank percentile of an already sorted list
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class LoadReport:
+    """Latencies, status codes and errors per endpoint label."""
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {}
+        self.statuses: dict[str, Counter] = {}
+        self.errors: Counter = Counter()
+        self.elapsed = 0.0
+        self.late = 0
+
+    def record(self, label: str, latency: float, status: int | str, expected=()):
+        self.latencies.setdefault(label, []).append(latency)
+        self.statuses.setdefault(label, Counter())[status] += 1
+        if self._is_error(status) and status not in expected:
+            self.errors[label] += 1
+
+    @staticmethod
+    def _is_error(status) -> bool:
+        # Transport failures are recorded by exception name
+        return not isinstance(status, int) or status >= 400
+
+    def _summary(self, latencies: list[float], statuses: Counter, errors: int) -> dict:
+        latencies = sorted(latencies)
+        return {
+            "requests": len(latencies),
+            "errors": errors,
+            "error_rate": round(errors / len(latencies), 4) if latencies else 0.0,
+            "throughput": round(len(latencies) / self.elapsed, 1) if self.elapsed else 0.0,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+            "statuses": {str(status): n for status, n in sorted(statuses.items(), key=str)},
+        }
+
+    def summary(self) -> dict:
+        endpoints = {
+            label: self._summary(self.latencies[label], self.statuses[label], self.errors[label])
+            for label in sorted(self.latencies)
+        }
+        total = self._summary(
+            [x for values in self.latencies.values() for x in values],
+            sum(self.statuses.values(), Counter()),
+            sum(self.errors.values()),
+        )
+        return {"elapsed_s": round(self.elapsed, 3), "late_sends": self.late, "total": total, "endpoints": endpoints}
+
+
+def format_report(summary: dict) -> str:
+    header = f"{'endpoint':<24}{'reqs':>8}{'err%':>8}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}"
+    lines = [header, "-" * len(header)]
+    rows = list(summary["endpoints"].items()) + [("TOTAL", summary["total"])]
+    for label, s in rows:
+        lines.append(
+            f"{label:<24}{s['requests']:>8}{s['error_rate'] * 100:>7.2f}%{s['throughput']:>9.1f}"
+            f"{s['p50_ms']:>9.1f}{s['p95_ms']:>9.1f}{s['p99_ms']:>9.1f}{s['max_ms']:>9.1f}"
+        )
+    lines.append(f"elapsed {summary['elapsed_s']}s, sends more than 10 ms behind schedule: {summary['late_sends']}")
+    return "\n".join(lines)
+
+
+async def _send(client, request: dict, scheduled: float, report: LoadReport, clock):
+    try:
+        response = await client.request(request["method"], request["path"], json=request.get("json"))
+        status = response.status_code
+    except Exception as e:
+        status = type(e).__name__
+    report.record(request["label"], clock() - scheduled, status, request.get("expect", ()))
+
+
+if httpx is not None:
+    class ThreadedASGITransport(httpx.AsyncBaseTransport):
+        """ASGI transport that runs the app on its own event loop thread.
+
+        Sync route handlers and CPU work then block the app's loop only, not
+        the loop that keeps the open-loop schedule and takes timestamps.
+        Responses are fully buffered by the ASGI transport, so handing them
+        back across loops is safe.
+        """
+
+        def __init__(self, app):
+            self._inner = httpx.ASGITransport(app=app)
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, name="load-test-app", daemon=True)
+            self._thread.start()
+
+        async def handle_async_request(self, request):
+            future = asyncio.run_coroutine_threadsafe(self._inner.handle_async_request(request), self._loop)
+            return await asyncio.wrap_future(future)
+
+        async def aclose(self):
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            await asyncio.to_thread(self._thread.join)
+            self._loop.close()
+
+
+async def run_load(
+        requests: Iterable[dict],
+        rps: float,
+        duration: float,
+        app=None,
+        base_url: str = None,
+        timeout: float = 30.0,
+) -> LoadReport:
+    """Send ``rps * duration`` requests on an open-loop schedule."""
+    if httpx is None:
+        raise RuntimeError("The load test needs httpx (pip install httpx)")
+    if (app is None) == (base_url is None):
+        raise ValueError("Pass exactly one of app or base_url")
+
+    transport = ThreadedASGITransport(app) if app is not None else None
+    report = LoadReport()
+    loop = asyncio.get_running_loop()
+    async with httpx.AsyncClient(transport=transport, base_url=base_url or "http://load-test", timeout=timeout) as client:
+        start = loop.time()
+        tasks = []
+        for i, request in zip(range(int(rps * duration)), requests):
+            scheduled = start + i / rps
+            delay = scheduled - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            elif delay < -0.01:
+                report.late += 1
+            tasks.append(asyncio.create_task(_send(client, request, scheduled, report, loop.time)))
+        await asyncio.gather(*tasks)
+        report.elapsed = loop.time() - start
+    return report
+
+
+async def find_capacity(
+        make_requests,
+        start_rps: float,
+        duration: float,
+        p99_slo_ms: float,
+        max_error_rate: float,
+        max_rps: float = 100_000,
+        step: float = 1.5,
+        **target,
+) -> dict:
+    """Highest tested rate whose p99 and error rate stay within the limits."""
+    rps, best, steps = start_rps, None, []
+    while rps <= max_rps:
+        summary = (await run_load(make_requests(), rps, duration, **target)).summary()
+        total = summary["total"]
+        ok = total["p99_ms"] <= p99_slo_ms and total["error_rate"] <= max_error_rate
+        steps.append({"rps": round(rps, 1), "p99_ms": total["p99_ms"], "error_rate": total["error_rate"], "ok": ok})
+        print(f"[LOAD] {rps:,.1f} rps: p99 {total['p99_ms']} ms, errors {total['error_rate']:.2%} -> {'ok' if ok else 'over'}")
+        if not ok:
+            break
+        best = round(rps, 1)
+        rps *= step
+    return {"capacity_rps": best, "steps": steps}
+
+
+def _seed_follows(users: int, follows_per_user: int, seed: int) -> Iterator[tuple[str, str]]:
+    # A skewed follow graph: everyone follows mostly popular users
+    rng = random.Random(seed)
+    for i in range(users):
+        for _ in range(follows_per_user):
+            other = _popular_user(rng, users)
+            if other != i:
+                yield username(i), username(other)
+
+
+def prepare(users: int, follows_per_user: int, seed: int = 1):
+    """Create the synthetic users and follows through the local repositories."""
+    from app.repositories import follow_repo, user_repo
+
+    for i in range(users):
+        user_repo.create_user(username(i))
+    created = 0
+    for follower, followed in _seed_follows(users, follows_per_user, seed):
+        follow_repo.create_follow(follower, followed)
+        created += 1
+    print(f"[LOAD] Prepared {users} users and {created} follows")
+
+
+async def prepare_remote(
+        base_url: str,
+        rabbitmq_url: str,
+        queue_name: str,
+        users: int,
+        follows_per_user: int,
+        seed: int = 1,
+        concurrency: int = 32,
+        wait: float = 60.0,
+) -> Counter:
+    """Seed a running service: users through its queue, follows over HTTP.
+
+    Follows are retried on 404 until the service's consumer has created
+    both users or ``wait`` seconds have passed. Returns the final statuses.
+    """
+    if httpx is None:
+        raise RuntimeError("The load test needs httpx (pip install httpx)")
+    import aio_pika
+
+    connection = await aio_pika.connect_robust(rabbitmq_url)
+    async with connection:
+        channel = await connection.channel()
+        for i in range(users):
+            body = json.dumps({"username": username(i), "event": "user_created"}).encode()
+            await channel.default_exchange.publish(
+                aio_pika.Message(body, delivery_mode=aio_pika.DeliveryMode.PERSISTENT),
+                routing_key=queue_name,
+            )
+    print(f"[LOAD] Published {users} user_created events to '{queue_name}'")
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    slots = asyncio.Semaphore(concurrency)
+
+    async def follow(client, follower: str, followed: str):
+        async with slots:
+            while True:
+                response = await client.post("/follow/", json={"follower": follower, "followed": followed})
+                if response.status_code != 404 or loop.time() > deadline:
+                    return response.status_code
+                await asyncio.sleep(0.5)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=30.0) as client:
+        statuses = Counter(await asyncio.gather(*(
+            follow(client, a, b) for a, b in _seed_follows(users, follows_per_user, seed)
+        )))
+    print(f"[LOAD] Prepared {users} users on {base_url}; follow statuses {dict(statuses)}")
+    return statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rps", type=float, default=200.0, help="Target requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds per run")
+    parser.add_argument("--mix", help="JSON file of operation -> weight")
+    parser.add_argument("--replay", help="NDJSON file of recorded requests")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--depths", default="2,3", help="Comma-separated traversal depths")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--prepare", type=int, metavar="N", help="Create users with about N follows each first")
+    parser.add_argument("--capacity", action="store_true", help="Step the rate up to find the capacity")
+    parser.add_argument("--p99-slo", type=float, default=250.0, help="p99 limit in ms for --capacity")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Error rate limit for --capacity")
+    parser.add_argument("--base-url", help="Load a running service instead of the in-process app")
+    parser.add_argument(
+        "--rabbitmq-url", default=os.getenv("RABBITMQ_URL"), help="Queue of the --base-url service, for --prepare"
+    )
+    parser.add_argument("--queue", default=os.getenv("QUEUE_NAME", "user_created_queue"))
+    parser.add_argument("--test", action="store_true", help="Serve the in-process app from the test database")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    target = {"base_url": args.base_url}
+    if args.base_url is None:
+        import app as app_package
+
+        if args.test:
+            # The app's repositories use the production helper; hand them the test one
+            app_package._arango_helper_instance = app_package.get_arango_db_helper(is_test_mode=True)
+        from app.main import app
+
+        target = {"app": app}
+    if args.prepare and args.base_url is not None:
+        if not args.rabbitmq_url:
+            parser.error("--prepare with --base-url needs --rabbitmq-url (or RABBITMQ_URL)")
+        asyncio.run(prepare_remote(
+            args.base_url, args.rabbitmq_url, args.queue, args.users, args.prepare, args.seed
+        ))
+    elif args.prepare:
+        prepare(args.users, args.prepare, args.seed)
+    elif not args.replay:
+        print("[WARN] Without --prepare the synthetic users must already exist, or follows will fail")
+
+    mix = DEFAULT_MIX
+    if args.mix:
+        with open(args.mix, encoding="utf-8") as f:
+            mix = json.load(f)
+    depths = [int(d) for d in args.depths.split(",")]
+
+    def make_requests():
+        if args.replay:
+            return replayed_requests(args.replay)
+        return synthetic_requests(mix, args.users, depths, args.seed)
+
+    if args.capacity:
+        result = asyncio.run(find_capacity(
+            make_requests, args.rps, args.duration, args.p99_slo, args.max_error_rate, **target
+        ))
+        print(json.dumps(result, indent=2) if args.json else f"[LOAD] Capacity: {result['capacity_rps']} rps")
+        return
+
+    started = time.perf_counter()
+    summary = asyncio.run(run_load(make_requests(), args.rps, args.duration, **target)).summary()
+    print(json.dumps(summary, indent=2) if args.json else format_report(summary))
+    print(f"[LOAD] Finished in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
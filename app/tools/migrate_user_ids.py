@@ -0,0 +1,84 @@
+"""Backfill interned user ids and rewrite follow edges to compact keys.
+
+Usage:
+    python -m app.tools.migrate_user_ids [--batch-size 5000] [--test]
+
+Safe to re-run: users that already have a ``uid`` and edges that already
+carry ``fromUid``/``toUid`` are skipped.
+"""
+import argparse
+import time
+
+from arango.database import StandardDatabase
+
+from app.interning import UserIdInterner, compact_edge_key
+
+
+def assign_user_ids(db: StandardDatabase, interner: UserIdInterner, batch_size: int) -> int:
+    users = db.collection("users")
+    total = 0
+    while True:
+        keys = list(db.aql.execute(
+            "FOR u IN users FILTER u.uid == null LIMIT @batch RETURN u._key",
+            bind_vars={"batch": batch_size},
+        ))
+        if not keys:
+            return total
+
+        uids = interner.reserve(len(keys))
+        users.update_many([{"_key": key, "uid": uid} for key, uid in zip(keys, uids)])
+        total += len(keys)
+        print(f"[MIGRATE] Assigned ids to {total} users")
+
+
+def rewrite_edges(db: StandardDatabase, batch_size: int) -> int:
+    follows = db.collection("follows")
+    total = 0
+    while True:
+        edges = list(db.aql.execute(
+            """
+            FOR e IN follows
+                FILTER e.fromUid == null
+                LET f = DOCUMENT(e._from)
+                LET t = DOCUMENT(e._to)
+                FILTER f.uid != null AND t.uid != null
+                LIMIT @batch
+                RETURN MERGE(UNSET(e, "_id", "_rev"), { fromUid: f.uid, toUid: t.uid })
+            """,
+            bind_vars={"batch": batch_size},
+        ))
+        if not edges:
+            return total
+
+        old_keys = [e["_key"] for e in edges]
+        for edge in edges:
+            edge["_key"] = compact_edge_key(edge["fromUid"], edge["toUid"])
+
+        # Insert first so a crash between the two steps never loses an edge;
+        # a rerun then only deletes the leftover legacy copies
+        follows.import_bulk(edges, on_duplicate="ignore")
+        follows.delete_many([{"_key": key} for key in old_keys])
+        total += len(edges)
+        print(f"[MIGRATE] Rewrote {total} follow edges")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--test", action="store_true", help="Run against the test database")
+    args = parser.parse_args()
+
+    from app import get_arango_db_helper
+
+    db = get_arango_db_helper(is_test_mode=args.test).db
+    interner = UserIdInterner(db=db)
+
+    started = time.perf_counter()
+    users = assign_user_ids(db, interner, args.batch_size)
+    edges = rewrite_edges(db, args.batch_size)
+    elapsed = time.perf_counter() - started
+    print(f"[MIGRATE] Done: {users} users, {edges} edges in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
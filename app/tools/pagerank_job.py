@@ -0,0 +1,109 @@
+"""Compute PageRank influence scores for every user and store them on ``users``.
+
+Usage:
+    python -m app.tools.pagerank_job [--damping 0.85] [--max-iter 100]
+        [--batch-size 10000] [--test] [--allow-pure-python]
+
+The whole follow graph is streamed into memory as integer arrays (about 8
+bytes per edge plus the usernames), ranked, and written back in batches as
+``pagerank`` (sums to 1 over all users), ``influence`` (``pagerank`` times
+the user count, so 1.0 is an average user), ``influenceRank`` (1 is the most
+influential) and ``pagerankComputedAt``. Users created after the job ran
+have no scores until the next run. NumPy (and ideally SciPy) are needed and
+are not in requirements.txt; install them where the job runs. Without NumPy
+the job exits with an error unless ``--allow-pure-python`` is given, which
+only suits graphs of a few million edges at most.
+"""
+import argparse
+import json
+import time
+from datetime import datetime as dt, UTC
+from typing import Sequence
+
+from arango.database import StandardDatabase
+
+from app.analytics.edges import EdgeList, load_edge_list
+from app.analytics.pagerank import backend, degree_stats, pagerank, rank_order
+
+
+def write_scores(
+        db: StandardDatabase,
+        graph: EdgeList,
+        scores: Sequence[float],
+        batch_size: int = 10_000,
+        computed_at: str = None,
+) -> int:
+    computed_at = computed_at or dt.now(UTC).isoformat()
+    n = len(graph)
+    order = rank_order(scores)
+    written = 0
+    for start in range(0, n, batch_size):
+        rows = [
+            [graph.names[v], float(scores[v]), start + i + 1]
+            for i, v in enumerate(order[start:start + batch_size])
+        ]
+        # Edges may reference users that were never created; skip them
+        db.aql.execute(
+            """
+            FOR row IN @rows
+                UPDATE { _key: row[0] } WITH {
+                    pagerank: row[1],
+                    influence: row[1] * @n,
+                    influenceRank: row[2],
+                    pagerankComputedAt: @computedAt
+                } IN users OPTIONS { ignoreErrors: true }
+            """,
+            bind_vars={"rows": rows, "n": n, "computedAt": computed_at},
+        )
+        written += len(rows)
+        print(f"[PAGERANK] Wrote scores for {written}/{n} users")
+    return written
+
+
+def run(
+        db: StandardDatabase,
+        damping: float = 0.85,
+        max_iter: int = 100,
+        batch_size: int = 10_000,
+) -> dict:
+    started = time.perf_counter()
+    graph = load_edge_list(db, batch_size)
+    loaded = time.perf_counter()
+    scores = pagerank(len(graph), graph.sources, graph.targets, damping=damping, max_iter=max_iter)
+    ranked = time.perf_counter()
+    write_scores(db, graph, scores, batch_size)
+    stats = degree_stats(len(graph), graph.sources, graph.targets)
+    stats["seconds"] = {
+        "load": round(loaded - started, 3),
+        "rank": round(ranked - loaded, 3),
+        "write": round(time.perf_counter() - ranked, 3),
+    }
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--damping", type=float, default=0.85)
+    parser.add_argument("--max-iter", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--test", action="store_true", help="Run against the test database")
+    parser.add_argument(
+        "--allow-pure-python", action="store_true", help="Run without NumPy (small graphs only)"
+    )
+    args = parser.parse_args()
+    if backend() == "python" and not args.allow_pure_python:
+        parser.error(
+            "NumPy is not installed, and the pure-Python PageRank is too slow for production graphs. "
+            "Install numpy (and scipy), or pass --allow-pure-python for a small graph."
+        )
+    print(f"[PAGERANK] Using the {backend()} implementation")
+
+    from app import get_arango_db_helper
+
+    db = get_arango_db_helper(is_test_mode=args.test).db
+    stats = run(db, damping=args.damping, max_iter=args.max_iter, batch_size=args.batch_size)
+    print(f"[PAGERANK] Done: {json.dumps(stats)}")
+
+
+if __name__ == "__main__":
+    main()
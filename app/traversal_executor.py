@@ -0,0 +1,138 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+from fastapi import Request
+
+from app.repositories.graph_traversal_repo import GraphTraversalRepository
+
+# Per-process repository, created once by the pool initializer. When a snapshot
+# path is configured every worker maps the same file, so the adjacency data is
+# shared read-only through the page cache instead of being copied per worker.
+_worker_repo: GraphTraversalRepository | None = None
+
+
+class TraversalQueueFull(Exception):
+    pass
+
+
+class ClientDisconnected(Exception):
+    pass
+
+
+def _init_worker(snapshot_path: str | None, is_test_mode: bool):
+    global _worker_repo
+    from app import get_arango_db_helper
+    from app.config import settings
+    from app.interning import UserIdInterner
+    from app.traversal_planner import TraversalPlanner
+
+    # Forked workers inherit the parent's helper; give each its own sockets.
+    # Snapshot results are filtered against the database (blocks, inactive
+    # users), so snapshot workers need a connection as well
+    helper = get_arango_db_helper(is_test_mode=is_test_mode)
+    helper.reconnect()
+
+    # Same options as the in-process repository, minus the result caches
+    interner = None
+    if settings.user_id_interning:
+        interner = UserIdInterner(db=helper.db, cache_size=settings.user_id_cache_size)
+    planner = None
+    if settings.traversal_planner_enabled:
+        planner = TraversalPlanner(
+            max_fanout=settings.traversal_max_fanout,
+            prune_threshold=settings.traversal_prune_threshold,
+            top_k_threshold=settings.traversal_top_k_threshold,
+            top_k=settings.traversal_top_k,
+            sample_size=settings.traversal_planner_sample_size,
+            plan_ttl=settings.traversal_plan_ttl,
+        )
+    _worker_repo = GraphTraversalRepository(
+        db=helper.db,
+        interner=interner,
+        graph_name=settings.arango_graph_name,
+        read_db=helper.read_db,
+        allow_dirty_reads=settings.arango_allow_dirty_reads,
+        batch_size=settings.arango_stream_batch_size,
+        planner=planner,
+    )
+    if snapshot_path:
+        _worker_repo.open_snapshot(snapshot_path)
+
+
+def _run_traversal(mode: str, username: str, max_depth: int) -> list[dict]:
+    if mode == "bfs":
+        return _worker_repo.traverse_bfs(username, max_depth=max_depth)
+    if mode == "dfs":
+        return _worker_repo.traverse_dfs(username, max_depth=max_depth)
+    raise ValueError(f"Unknown traversal mode '{mode}'")
+
+
+async def cancel_on_disconnect(awaitable, request: Request, poll_interval: float = 0.1):
+    # Await the work, cancelling it if the HTTP client goes away first.
+    # Queued pool work is dropped; work already running in a worker finishes
+    # there but its result is discarded. The disconnect is raised as
+    # ClientDisconnected rather than CancelledError, so the route can answer
+    # it like any other outcome instead of the server seeing a cancellation.
+    task = asyncio.ensure_future(awaitable)
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=poll_interval)
+        if done:
+            return task.result()
+        if await request.is_disconnected():
+            task.cancel()
+            print("[INFO] Client disconnected, traversal cancelled.")
+            raise ClientDisconnected("Client closed request")
+
+
+class TraversalExecutor:
+    def __init__(
+            self,
+            workers: int = 4,
+            queue_limit: int = 32,
+            snapshot_path: str = None,
+            is_test_mode: bool = False,
+            pool: Executor = None,
+            disconnect_poll_interval: float = 0.1,
+    ):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.disconnect_poll_interval = disconnect_poll_interval
+        self.pool = pool or ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(snapshot_path, is_test_mode),
+        )
+        self._in_flight = 0
+        print(f"[INIT] Traversal executor started with {workers} workers, queue limit {queue_limit}")
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def run(
+            self,
+            mode: str,
+            username: str,
+            max_depth: int,
+            request: Request = None,
+    ) -> list[dict]:
+        # Validate in the API process so bad input fails without a dispatch
+        GraphTraversalRepository._validate_input(username, max_depth)
+
+        if self._in_flight >= self.workers + self.queue_limit:
+            print(f"[WARN] Traversal queue full ({self._in_flight} in flight), rejecting {mode} for '{username}'")
+            raise TraversalQueueFull("Traversal queue is full")
+
+        self._in_flight += 1
+        future = self.pool.submit(_run_traversal, mode, username, max_depth)
+        try:
+            result = asyncio.wrap_future(future)
+            if request is None:
+                return await result
+            return await cancel_on_disconnect(result, request, self.disconnect_poll_interval)
+        finally:
+            self._in_flight -= 1
+
+    def shutdown(self):
+        print("[SHUTDOWN] Stopping traversal executor...")
+        self.pool.shutdown(wait=False, cancel_futures=True)
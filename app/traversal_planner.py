@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+# Estimates are only compared against thresholds, so stop growing them here
+_ESTIMATE_CAP = 10 ** 12
+
+
+@dataclass(frozen=True)
+class TraversalPlan:
+    """How a BFS will run and why.
+
+    ``full``    plain traversal, every vertex expanded
+    ``pruned``  vertices with more than ``max_fanout`` outbound edges are
+                returned but not expanded (needs materialised degree counts)
+    ``top_k``   every vertex is expanded through its ``top_k`` most recent
+                edges only
+    """
+    strategy: str
+    degree: int
+    estimated_frontier: int
+    max_fanout: int | None = None
+    top_k: int | None = None
+
+
+class TraversalPlanner:
+    """Picks a BFS strategy from the start vertex's degree and a sample of
+    its neighbours' degrees.
+
+    The frontier at depth ``d`` is estimated as ``degree * mean ** (d - 1)``
+    where ``mean`` is the sampled neighbour out-degree. A handful of
+    supernodes at depth 1 is enough to push the estimate over the
+    thresholds, which is exactly the case a full traversal handles worst.
+
+    Plans are remembered per ``(username, depth)`` for ``plan_ttl`` seconds
+    so that a BFS served from cache does not pay for a planning query.
+    """
+
+    def __init__(
+            self,
+            max_fanout: int = 1000,
+            prune_threshold: int = 10_000,
+            top_k_threshold: int = 100_000,
+            top_k: int = 50,
+            sample_size: int = 100,
+            plan_ttl: float = 60.0,
+            plan_cache_size: int = 10_000,
+    ):
+        self.max_fanout = max_fanout
+        self.prune_threshold = prune_threshold
+        self.top_k_threshold = top_k_threshold
+        self.top_k = top_k
+        self.sample_size = sample_size
+        self.plan_ttl = plan_ttl
+        self.plan_cache_size = plan_cache_size
+        self._lock = threading.Lock()
+        self._plans: OrderedDict[tuple[str, int], tuple[TraversalPlan, float]] = OrderedDict()
+
+    def cached_plan(self, username: str, max_depth: int) -> TraversalPlan | None:
+        key = (username, max_depth)
+        with self._lock:
+            item = self._plans.get(key)
+            if item is None:
+                return None
+            plan, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._plans[key]
+                return None
+            self._plans.move_to_end(key)
+            return plan
+
+    def remember_plan(self, username: str, max_depth: int, plan: TraversalPlan):
+        with self._lock:
+            self._plans[(username, max_depth)] = (plan, time.monotonic() + self.plan_ttl)
+            self._plans.move_to_end((username, max_depth))
+            while len(self._plans) > self.plan_cache_size:
+                self._plans.popitem(last=False)
+
+    @staticmethod
+    def estimate(degree: int, sampled_degrees: list[int], max_depth: int) -> int:
+        if not degree or not sampled_degrees:
+            return degree
+        mean = sum(sampled_degrees) / len(sampled_degrees)
+        total, level = 0.0, float(degree)
+        for _ in range(max_depth):
+            total += level
+            if total >= _ESTIMATE_CAP:
+                return _ESTIMATE_CAP
+            level *= mean
+        return int(total)
+
+    def choose(
+            self,
+            degree: int,
+            sampled_degrees: list[int],
+            max_depth: int,
+            has_degree_counts: bool = False,
+    ) -> TraversalPlan:
+        estimated = self.estimate(degree, sampled_degrees, max_depth)
+        if estimated <= self.prune_threshold:
+            strategy = "full"
+        elif estimated <= self.top_k_threshold and has_degree_counts:
+            strategy = "pruned"
+        else:
+            strategy = "top_k"
+
+        return TraversalPlan(
+            strategy=strategy,
+            degree=degree,
+            estimated_frontier=estimated,
+            max_fanout=self.max_fanout if strategy == "pruned" else None,
+            top_k=self.top_k if strategy == "top_k" else None,
+        )
@@ -1,9 +1,36 @@
+import re
+from functools import lru_cache
+
+# Usernames are used verbatim as ArangoDB document keys, so they must follow
+# the _key rules: 1-254 bytes of letters, digits and _-:.@()+,=;$!*'%
+_KEY_PATTERN = re.compile(r"[A-Za-z0-9_\-:.@()+,=;$!*'%]{1,254}")
+
+
+@lru_cache(maxsize=4096)
+def _check_key(username: str) -> bool:
+    # Memo of recently seen names; the regex only runs on a miss
+    return _KEY_PATTERN.fullmatch(username) is not None
+
+
 class UserValidator:
     @staticmethod
     def validate_username(username: str):
-        # Validate that username is a non-empty string
-        print(f"[VALIDATION] Validating username: {username!r}")
+        # Validate that username is a non-empty string usable as a document key
         if not isinstance(username, str) or not username.strip():
-            print("[VALIDATION] Validation failed: username must be a non-empty string")
             raise TypeError("Username must be a non-empty string")
-        print("[VALIDATION] Username validation passed")
\ No newline at end of file
+        if not _check_key(username):
+            raise ValueError(f"Username {username!r} contains characters not allowed in a key")
+
+    @classmethod
+    def validate_many(cls, usernames) -> list[str]:
+        # Validate a batch, reporting every invalid name at once
+        usernames = list(usernames)
+        invalid = []
+        for username in usernames:
+            try:
+                cls.validate_username(username)
+            except (TypeError, ValueError):
+                invalid.append(username)
+        if invalid:
+            raise ValueError(f"Invalid usernames: {invalid!r}")
+        return usernames
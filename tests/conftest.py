@@ -0,0 +1,10 @@
+import app
+from tests.fakes.arango import FakeArangoDBHelper
+
+# app.repositories builds its module-level repositories from the production
+# helper on import. Hand it the in-memory fake first so the unit, route and
+# performance suites import without an ArangoDB server. The integration suite
+# asks for the test-mode helper and still talks to a real database.
+if app._arango_helper_instance is None:
+    app._arango_helper_instance = FakeArangoDBHelper()
+    print("[INIT] Using in-memory FakeArangoDBHelper for the production helper")
@@ -0,0 +1,865 @@
+import re
+import threading
+import time
+from collections import deque
+
+from arango.exceptions import (
+    DocumentDeleteError,
+    DocumentInsertError,
+    DocumentUpdateError,
+)
+from arango.request import Request
+from arango.response import Response
+
+from app.arango_db_helper import CollectionTypes
+
+
+def _server_error(cls, method: str, endpoint: str, status: int, code: int, message: str):
+    # Builds the same exception python-arango raises for a server error reply
+    resp = Response(method, endpoint, {}, status, "", "")
+    resp.error_code = code
+    resp.error_message = message
+    return cls(resp, Request(method, endpoint))
+
+
+def _key_of(document) -> str:
+    return document["_key"] if isinstance(document, dict) else str(document).split("/")[-1]
+
+
+def _key_from_id(doc_id) -> str | None:
+    return doc_id.split("/", 1)[1] if isinstance(doc_id, str) and "/" in doc_id else None
+
+
+class SimulatedClock:
+    """Stand-in for ``time.sleep`` that only adds up the requested delays.
+
+    Latency charged through it costs no wall time, so benchmarks of the
+    number and size of round trips are exact and instant.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+        self._lock = threading.Lock()
+
+    def sleep(self, seconds: float):
+        with self._lock:
+            self.now += seconds
+
+
+class Latency:
+    """Deterministic cost of talking to the fake server.
+
+    Every round trip (document call, query, cursor fetch) costs ``request``
+    seconds plus ``row`` seconds per document or row transferred. At most
+    ``max_concurrency`` requests are "on the server" at once, so batching
+    and concurrency changes show up as they would against a real
+    coordinator. ``sleep`` can be a ``SimulatedClock.sleep``.
+    """
+
+    def __init__(
+            self,
+            request: float = 0.0,
+            row: float = 0.0,
+            sleep=time.sleep,
+            max_concurrency: int = None,
+    ):
+        self.request = request
+        self.row = row
+        self.sleep = sleep
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.rows = 0
+
+    def charge(self, rows: int = 0):
+        with self._lock:
+            self.requests += 1
+            self.rows += rows
+        seconds = self.request + self.row * rows
+        if not seconds:
+            return
+        if self._slots is None:
+            self.sleep(seconds)
+            return
+        with self._slots:
+            self.sleep(seconds)
+
+
+class FakeCursor:
+    """Batches rows the way python-arango's Cursor does.
+
+    The first batch arrives with the query; every ``fetch`` is another
+    round trip.
+    """
+
+    def __init__(self, rows: list, batch_size: int, latency: Latency):
+        self._pending = deque(rows)
+        self._batch = deque()
+        self._count = len(rows)
+        self._batch_size = batch_size
+        self._latency = latency
+        self.closed = False
+        self._take()
+
+    def _take(self) -> int:
+        n = min(self._batch_size, len(self._pending))
+        self._batch.extend(self._pending.popleft() for _ in range(n))
+        return n
+
+    def batch(self) -> deque:
+        return self._batch
+
+    def has_more(self) -> bool:
+        return bool(self._pending)
+
+    def count(self) -> int:
+        return self._count
+
+    def empty(self) -> bool:
+        return not self._batch
+
+    def fetch(self) -> dict:
+        self._latency.charge(self._take())
+        return {"batch": list(self._batch), "has_more": self.has_more()}
+
+    def close(self, ignore_missing: bool = False) -> bool:
+        self._pending.clear()
+        self.closed = True
+        return True
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self._batch and self._pending:
+            self.fetch()
+        if not self._batch:
+            raise StopIteration
+        return self._batch.popleft()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close(ignore_missing=True)
+
+
+class FakeCollection:
+    """Document or edge collection held in a dict.
+
+    Edge collections keep ``_from``/``_to`` indexes in insertion order, so
+    neighbour lookups cost the degree of the vertex, like the edge index.
+    """
+
+    def __init__(self, db: "FakeDatabase", name: str, edge: bool = False):
+        self.db = db
+        self.name = name
+        self.edge = edge
+        self.docs: dict[str, dict] = {}
+        self.indexes: list[dict] = []
+        self._from: dict[str, dict[str, None]] = {}
+        self._to: dict[str, dict[str, None]] = {}
+        self._next_key = 0
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    # -- helpers used by the AQL emulation (callers hold the database lock)
+
+    def outbound(self, vertex_id: str) -> list[dict]:
+        return [self.docs[k] for k in self._from.get(vertex_id, ())]
+
+    def inbound(self, vertex_id: str) -> list[dict]:
+        return [self.docs[k] for k in self._to.get(vertex_id, ())]
+
+    def _put(self, doc: dict):
+        self.docs[doc["_key"]] = doc
+        if self.edge:
+            self._from.setdefault(doc["_from"], {})[doc["_key"]] = None
+            self._to.setdefault(doc["_to"], {})[doc["_key"]] = None
+
+    def _drop(self, key: str) -> dict:
+        doc = self.docs.pop(key)
+        if self.edge:
+            for index, side in ((self._from, "_from"), (self._to, "_to")):
+                keys = index[doc[side]]
+                del keys[key]
+                if not keys:
+                    del index[doc[side]]
+        return doc
+
+    def _meta(self, doc: dict) -> dict:
+        return {"_id": doc["_id"], "_key": doc["_key"], "_rev": doc["_rev"]}
+
+    def _insert(self, document: dict, overwrite: bool, return_new: bool, return_old: bool) -> dict:
+        doc = dict(document)
+        if "_key" not in doc:
+            self._next_key += 1
+            doc["_key"] = str(self._next_key)
+        if self.edge and not ("_from" in doc and "_to" in doc):
+            raise _server_error(
+                DocumentInsertError, "post", f"/_api/document/{self.name}", 400, 1233,
+                "edge attribute missing or invalid",
+            )
+        old = self.docs.get(doc["_key"])
+        if old is not None and not overwrite:
+            raise _server_error(
+                DocumentInsertError, "post", f"/_api/document/{self.name}", 409, 1210,
+                "unique constraint violated",
+            )
+        if old is not None:
+            self._drop(doc["_key"])
+        doc["_id"] = f"{self.name}/{doc['_key']}"
+        doc["_rev"] = self.db._revision()
+        self._put(doc)
+        result = self._meta(doc)
+        if return_new:
+            result["new"] = dict(doc)
+        if return_old and old is not None:
+            result["old"] = old
+        return result
+
+    # -- python-arango collection API
+
+    def has(self, document, rev=None, check_rev=True, allow_dirty_read=False) -> bool:
+        with self.db._lock:
+            found = _key_of(document) in self.docs
+        self.db.latency.charge()
+        return found
+
+    def get(self, document, rev=None, check_rev=True, allow_dirty_read=False) -> dict | None:
+        with self.db._lock:
+            doc = self.docs.get(_key_of(document))
+            doc = dict(doc) if doc is not None else None
+        self.db.latency.charge(1 if doc is not None else 0)
+        return doc
+
+    def get_many(self, documents, allow_dirty_read=False) -> list[dict]:
+        with self.db._lock:
+            found = [dict(self.docs[k]) for k in map(_key_of, documents) if k in self.docs]
+        self.db.latency.charge(len(found))
+        return found
+
+    def insert(
+            self,
+            document: dict,
+            return_new: bool = False,
+            sync=None,
+            silent: bool = False,
+            overwrite: bool = False,
+            return_old: bool = False,
+            **options,
+    ):
+        with self.db._lock:
+            result = self._insert(document, overwrite, return_new, return_old)
+        self.db.latency.charge(1)
+        return True if silent else result
+
+    def insert_many(
+            self,
+            documents: list[dict],
+            return_new: bool = False,
+            sync=None,
+            silent: bool = False,
+            overwrite: bool = False,
+            return_old: bool = False,
+            **options,
+    ):
+        results = []
+        with self.db._lock:
+            for document in documents:
+                try:
+                    results.append(self._insert(document, overwrite, return_new, return_old))
+                except DocumentInsertError as e:
+                    # Like the server, a failed document does not stop the batch
+                    results.append(e)
+        self.db.latency.charge(len(documents))
+        return True if silent else results
+
+    def update(
+            self,
+            document: dict,
+            check_rev: bool = True,
+            merge: bool = True,
+            keep_none: bool = True,
+            return_new: bool = False,
+            return_old: bool = False,
+            sync=None,
+            silent: bool = False,
+    ):
+        key = _key_of(document)
+        with self.db._lock:
+            old = self.docs.get(key)
+            if old is None:
+                raise _server_error(
+                    DocumentUpdateError, "patch", f"/_api/document/{self.name}/{key}", 404, 1202,
+                    "document not found",
+                )
+            doc = self.db._merge(old, document, keep_none)
+            result = self._meta(doc) | {"_old_rev": old["_rev"]}
+            if return_new:
+                result["new"] = dict(doc)
+            if return_old:
+                result["old"] = old
+        self.db.latency.charge(1)
+        return True if silent else result
+
+    def delete(
+            self,
+            document,
+            rev=None,
+            check_rev: bool = True,
+            ignore_missing: bool = False,
+            return_old: bool = False,
+            sync=None,
+            silent: bool = False,
+    ):
+        key = _key_of(document)
+        with self.db._lock:
+            if key not in self.docs:
+                missing = True
+            else:
+                missing, old = False, self._drop(key)
+        self.db.latency.charge()
+        if missing:
+            if ignore_missing:
+                return False
+            raise _server_error(
+                DocumentDeleteError, "delete", f"/_api/document/{self.name}/{key}", 404, 1202,
+                "document not found",
+            )
+        if return_old:
+            return self._meta(old) | {"old": old}
+        return True
+
+    def truncate(self) -> bool:
+        with self.db._lock:
+            self.docs.clear()
+            self._from.clear()
+            self._to.clear()
+        self.db.latency.charge()
+        return True
+
+    def count(self) -> int:
+        self.db.latency.charge()
+        return len(self.docs)
+
+    def all(self, skip: int = None, limit: int = None) -> FakeCursor:
+        with self.db._lock:
+            rows = [dict(d) for d in self.docs.values()][skip or 0:]
+        rows = rows[:limit] if limit is not None else rows
+        return self.db.aql._cursor(rows, None)
+
+    def _add_index(self, kind: str, fields: list[str], **options) -> dict:
+        index = {"type": kind, "fields": list(fields), **options}
+        if not any(i["type"] == kind and i["fields"] == index["fields"] for i in self.indexes):
+            self.indexes.append(index)
+        return index
+
+    def add_persistent_index(self, fields: list[str], **options) -> dict:
+        return self._add_index("persistent", fields, **options)
+
+    def add_ttl_index(self, fields: list[str], expiry_time: int, **options) -> dict:
+        # Expiry is not simulated; tests that need it delete documents themselves
+        return self._add_index("ttl", fields, expiry_time=expiry_time, **options)
+
+
+_HIDDEN_PREFIX = re.compile(
+    r"^LET hiddenIds = \(FOR b IN blocks FILTER b\._from == @(\w+) RETURN b\._to\) "
+    r"LET hidden = ZIP\(hiddenIds, hiddenIds\[\* RETURN true\]\) (.*)$"
+)
+
+
+class FakeAQL:
+    """Executes the AQL the repositories send.
+
+    There is no parser: each query shape the service uses is recognised by
+    its text (whitespace-insensitive) and evaluated in Python with the same
+    semantics -- traversal order and uniqueness, PRUNE/FILTER on hidden and
+    inactive users, COLLECT ordering, ``||`` defaults. A query the fake does
+    not know raises ``NotImplementedError`` so a changed query is noticed
+    rather than silently returning nothing. ``queries`` records every query.
+    """
+
+    def __init__(self, db: "FakeDatabase"):
+        self.db = db
+        self.queries: list[tuple[str, dict]] = []
+        self._plain = [
+            (r"^UPSERT \{ _key: @key \} .* IN counters", self._counter),
+            (r"^FOR u IN users FILTER u\._key IN @names AND u\.uid != null", self._uids),
+            (r"^FOR u IN users FILTER u\.uid IN @uids", self._usernames),
+            (r"^FOR u IN users FILTER u\.influenceRank != null", self._top_influencers),
+            (r"^FOR name IN @names FOR u IN users .* \{ (followers|following)Version", self._bump_versions),
+            (r"^FOR u IN users FILTER u\._key IN \[@follower, @followed\]", self._record_change),
+            (r"^FOR u IN users FILTER u\._key == @owner UPDATE", self._visibility_versions),
+            (r"^FOR u IN users FILTER u\._key == @username AND u\.deletedAt != null REMOVE", self._remove_user),
+            (r"^LET u = DOCUMENT\(@userDoc\) RETURN \[u\.(followers|following)Version", self._list_version),
+            (
+                r"^LET deleted = DOCUMENT\(@userId\)\.deletedAt != null LET removed = \( FOR e IN follows "
+                r"FILTER deleted AND e\.(_from|_to) == @userId LIMIT @chunk",
+                self._remove_chunk,
+            ),
+            (
+                r"^LET deleted = DOCUMENT\(@userId\)\.deletedAt != null FOR b IN blocks "
+                r"FILTER deleted AND \(b\._from == @userId OR b\._to == @userId\) REMOVE",
+                self._remove_blocks,
+            ),
+            (r"^FOR b IN blocks FILTER b\._from == @owner AND", self._list_relations),
+            (r"^LET blocked = \(FOR b IN blocks FILTER b\._from == @userKey", self._hidden_among),
+            (r"^FOR t IN follow_tombstones FILTER t\.followed == @username", self._unfollows_since),
+            (
+                r"^FOR e IN follows FILTER e\.(_from|_to) == @userId RETURN PARSE_IDENTIFIER\(e\.(_from|_to)\)",
+                self._neighbour_keys,
+            ),
+            (r"^RETURN LENGTH\( FOR v IN 1\.\.1 (INBOUND|OUTBOUND) @user follows", self._count),
+            (r"^LET start = DOCUMENT\(@userKey\)", self._plan_stats),
+            (r"^LET frontier0 = ", self._multi_bfs),
+        ]
+        self._with_hidden = [
+            (r"^FOR vid IN @frontier", self._top_k),
+            (r"^FOR v, e, p IN 1\.\.@maxDepth OUTBOUND @userKey GRAPH @graphName", self._traversal),
+            (r"^FOR v, e IN (INBOUND|OUTBOUND) @userDoc follows", self._neighbours),
+            (r"^FOR e IN follows FILTER e\._to == @userDoc AND e\.followedAt > @since", self._since),
+            (r"^FOR e IN follows FILTER e\.(_from|_to) == @userDoc FILTER", self._compact),
+        ]
+
+    def execute(self, query: str, bind_vars: dict = None, batch_size: int = None, stream: bool = False, **options):
+        bind_vars = bind_vars or {}
+        text = " ".join(query.split())
+        self.queries.append((text, bind_vars))
+        with self.db._lock:
+            rows = self._evaluate(text, bind_vars)
+        return self._cursor(rows, batch_size)
+
+    def _cursor(self, rows: list, batch_size: int | None) -> FakeCursor:
+        cursor = FakeCursor(rows, batch_size or 1000, self.db.latency)
+        self.db.latency.charge(len(cursor.batch()))
+        return cursor
+
+    def _evaluate(self, text: str, bind: dict) -> list:
+        prefix = _HIDDEN_PREFIX.match(text)
+        if prefix is not None:
+            hidden = {b["_to"] for b in self.db.blocks.outbound(bind[prefix.group(1)])}
+            for pattern, handler in self._with_hidden:
+                match = re.match(pattern, prefix.group(2))
+                if match:
+                    return handler(match, bind, text, hidden)
+        else:
+            for pattern, handler in self._plain:
+                match = re.match(pattern, text)
+                if match:
+                    return handler(match, bind, text)
+        raise NotImplementedError(f"The fake ArangoDB does not support this query: {text[:160]}")
+
+    # -- shared pieces
+
+    def _document(self, doc_id):
+        collection = self.db.collections.get(doc_id.split("/", 1)[0]) if isinstance(doc_id, str) else None
+        return collection.docs.get(_key_from_id(doc_id)) if collection is not None else None
+
+    def _active(self, doc_id) -> bool:
+        # DOCUMENT(x).active != false; a missing document reads as null
+        doc = self._document(doc_id)
+        return doc is None or doc.get("active") is not False
+
+    @staticmethod
+    def _ref(edge: dict, side: str, uid_field: str):
+        # e.toUid != null ? e.toUid : PARSE_IDENTIFIER(e._to).key
+        uid = edge.get(uid_field)
+        return uid if uid is not None else _key_from_id(edge[side])
+
+    def _visible(self, vertex_id: str, hidden: set) -> bool:
+        return vertex_id not in hidden and self._active(vertex_id)
+
+    # -- users
+
+    def _counter(self, match, bind, text):
+        counters = self.db.collections["counters"]
+        doc = counters.docs.get(bind["key"])
+        if doc is None:
+            counters._insert({"_key": bind["key"], "value": bind["count"]}, False, False, False)
+        else:
+            self.db._merge(doc, {"value": doc["value"] + bind["count"]})
+        return [counters.docs[bind["key"]]["value"]]
+
+    def _uids(self, match, bind, text):
+        users = self.db.users.docs
+        return [[n, users[n]["uid"]] for n in bind["names"] if n in users and users[n].get("uid") is not None]
+
+    def _usernames(self, match, bind, text):
+        wanted = set(bind["uids"])
+        return [[u["uid"], u["_key"]] for u in self.db.users.docs.values() if u.get("uid") in wanted]
+
+    def _top_influencers(self, match, bind, text):
+        ranked = sorted(
+            (u for u in self.db.users.docs.values() if u.get("influenceRank") is not None),
+            key=lambda u: u["influenceRank"],
+        )
+        return [
+            {
+                "username": u["_key"],
+                "pagerank": u.get("pagerank"),
+                "influence": u.get("influence"),
+                "rank": u["influenceRank"],
+                "computed_at": u.get("pagerankComputedAt"),
+            }
+            for u in ranked[:bind["limit"]]
+        ]
+
+    def _versions(self, doc: dict, direction: str, changed_at: str, delta: int = None) -> dict:
+        patch = {
+            f"{direction}Version": (doc.get(f"{direction}Version") or 0) + 1,
+            f"{direction}ModifiedAt": changed_at,
+        }
+        if delta is not None:
+            field = "followerCount" if direction == "followers" else "followingCount"
+            patch[field] = max(0, (doc.get(field) or 0) + delta)
+        return patch
+
+    def _record_change(self, match, bind, text):
+        counts = bind["counts"] and bind["delta"] != 0
+        for key, direction in ((bind["follower"], "following"), (bind["followed"], "followers")):
+            doc = self.db.users.docs.get(key)
+            if doc is not None:
+                patch = self._versions(doc, direction, bind["changedAt"], bind["delta"] if counts else None)
+                self.db._merge(doc, patch)
+        return []
+
+    def _visibility_versions(self, match, bind, text):
+        doc = self.db.users.docs.get(bind["owner"])
+        if doc is not None:
+            for direction in ("followers", "following"):
+                doc = self.db._merge(doc, self._versions(doc, direction, bind["changedAt"]))
+        return []
+
+    def _bump_versions(self, match, bind, text):
+        counts = bind["counts"]
+        for name in bind["names"]:
+            doc = self.db.users.docs.get(name)
+            if doc is not None:
+                patch = self._versions(doc, match.group(1), bind["now"], bind["delta"] if counts else None)
+                self.db._merge(doc, patch)
+        return []
+
+    def _list_version(self, match, bind, text):
+        doc = self._document(bind["userDoc"]) or {}
+        direction = match.group(1)
+        return [[doc.get(f"{direction}Version") or 0, doc.get(f"{direction}ModifiedAt")]]
+
+    def _remove_user(self, match, bind, text):
+        doc = self.db.users.docs.get(bind["username"])
+        if doc is not None and doc.get("deletedAt") is not None:
+            self.db.users._drop(bind["username"])
+        return []
+
+    # -- follows
+
+    def _neighbours(self, match, bind, text, hidden):
+        outbound = match.group(1) == "OUTBOUND"
+        edges = (self.db.follows.outbound if outbound else self.db.follows.inbound)(bind["userDoc"])
+        rows = []
+        for e in edges:
+            vertex = self._document(e["_to"] if outbound else e["_from"])
+            if vertex is not None and vertex["_id"] in hidden:
+                continue
+            if vertex is not None and vertex.get("active") is False:
+                continue
+            rows.append({"followed": (vertex or {}).get("username"), "followedAt": e.get("followedAt")})
+        return rows
+
+    def _compact(self, match, bind, text, hidden):
+        own = match.group(1)
+        other, uid_field = ("_to", "toUid") if own == "_from" else ("_from", "fromUid")
+        edges = (self.db.follows.outbound if own == "_from" else self.db.follows.inbound)(bind["userDoc"])
+        return [
+            [self._ref(e, other, uid_field), e.get("followedAt")]
+            for e in edges if self._visible(e[other], hidden)
+        ]
+
+    def _since(self, match, bind, text, hidden):
+        edges = [
+            e for e in self.db.follows.inbound(bind["userDoc"])
+            if e.get("followedAt") is not None and e["followedAt"] > bind["since"]
+            and self._visible(e["_from"], hidden)
+        ]
+        edges.sort(key=lambda e: e["followedAt"])
+        return [[self._ref(e, "_from", "fromUid"), e["followedAt"]] for e in edges]
+
+    def _unfollows_since(self, match, bind, text):
+        stones = [
+            t for t in self.db.collections["follow_tombstones"].docs.values()
+            if t.get("followed") == bind["username"]
+            and t.get("removedAt") is not None and t["removedAt"] > bind["since"]
+        ]
+        stones.sort(key=lambda t: t["removedAt"])
+        return [{"followed": t.get("follower"), "removedAt": t["removedAt"]} for t in stones]
+
+    def _count(self, match, bind, text):
+        outbound = match.group(1) == "OUTBOUND"
+        edges = (self.db.follows.outbound if outbound else self.db.follows.inbound)(bind["user"])
+        if "FILTER v.active != false" in text:
+            others = (self._document(e["_to" if outbound else "_from"]) or {} for e in edges)
+            return [sum(1 for v in others if v.get("active") is not False)]
+        return [len(edges)]
+
+    def _neighbour_keys(self, match, bind, text):
+        own, other = match.group(1), match.group(2)
+        edges = (self.db.follows.outbound if own == "_from" else self.db.follows.inbound)(bind["userId"])
+        return [_key_from_id(e[other]) for e in edges]
+
+    def _deleted(self, doc_id) -> bool:
+        doc = self._document(doc_id)
+        return doc is not None and doc.get("deletedAt") is not None
+
+    def _remove_chunk(self, match, bind, text):
+        if not self._deleted(bind["userId"]):
+            return []
+        own = match.group(1)
+        other = "_to" if own == "_from" else "_from"
+        edges = (self.db.follows.outbound if own == "_from" else self.db.follows.inbound)(bind["userId"])
+        names = []
+        for e in edges[:bind["chunk"]]:
+            self.db.follows._drop(e["_key"])
+            names.append(_key_from_id(e[other]))
+        if "INTO follow_tombstones" in text:
+            tombstones = self.db.collections["follow_tombstones"]
+            for name in names:
+                tombstones._insert(
+                    {"follower": bind["username"], "followed": name, "removedAt": bind["now"]},
+                    False, False, False,
+                )
+        return names
+
+    # -- blocks
+
+    def _hidden_among(self, match, bind, text):
+        blocked = [_key_from_id(b["_to"]) for b in self.db.blocks.outbound(bind["userKey"])]
+        inactive = [
+            name for name in bind["names"]
+            if (self.db.users.docs.get(name) or {}).get("active") is False
+        ]
+        return [blocked + inactive]
+
+    def _list_relations(self, match, bind, text):
+        edges = [
+            b for b in self.db.blocks.outbound(bind["owner"])
+            if bind.get("kind") is None or b.get("kind") == bind["kind"]
+        ]
+        edges.sort(key=lambda b: b.get("createdAt") or "", reverse=True)
+        return [
+            {"username": _key_from_id(b["_to"]), "kind": b.get("kind"), "createdAt": b.get("createdAt")}
+            for b in edges
+        ]
+
+    def _remove_blocks(self, match, bind, text):
+        user = bind["userId"]
+        if not self._deleted(user):
+            return []
+        for b in self.db.blocks.outbound(user) + self.db.blocks.inbound(user):
+            if b["_key"] in self.db.blocks.docs:
+                self.db.blocks._drop(b["_key"])
+        return []
+
+    # -- traversals
+
+    def _traversal(self, match, bind, text, hidden):
+        start, max_depth = bind["userKey"], bind["maxDepth"]
+        max_fanout = bind.get("maxFanout")
+        interned = "RETURN [e.toUid" in text
+
+        def pruned(vertex_id, vertex):
+            if vertex is None:
+                return vertex_id in hidden
+            count = vertex.get("followingCount")
+            if max_fanout is not None and count is not None and count > max_fanout:
+                return True
+            return vertex_id in hidden or vertex.get("active") is False
+
+        def emit(vertex_id, vertex, edge):
+            if vertex_id in hidden or (vertex is not None and vertex.get("active") is False):
+                return
+            if interned:
+                rows.append([self._ref(edge, "_to", "toUid"), edge.get("followedAt")])
+            else:
+                rows.append({"followed": (vertex or {}).get("username"), "followedAt": edge.get("followedAt")})
+
+        rows = []
+        # PRUNE is evaluated on the start vertex too (with e == null)
+        start_doc = self._document(start)
+        if start_doc is not None and pruned(None, start_doc):
+            return rows
+
+        if "bfs: true" in text:
+            # uniqueVertices: 'global' -- the first discovery wins
+            visited, frontier = {start}, [start]
+            for _ in range(max_depth):
+                next_frontier = []
+                for vertex_id in frontier:
+                    for e in self.db.follows.outbound(vertex_id):
+                        target = e["_to"]
+                        if target in visited:
+                            continue
+                        visited.add(target)
+                        vertex = self._document(target)
+                        emit(target, vertex, e)
+                        if not pruned(target, vertex):
+                            next_frontier.append(target)
+                frontier = next_frontier
+            return rows
+
+        # Depth-first, pre-order, uniqueVertices: 'path'
+        def visit(vertex_id, depth, path):
+            for e in self.db.follows.outbound(vertex_id):
+                target = e["_to"]
+                if target in path:
+                    continue
+                vertex = self._document(target)
+                emit(target, vertex, e)
+                if depth < max_depth and not pruned(target, vertex):
+                    visit(target, depth + 1, path | {target})
+
+        if max_depth >= 1:
+            visit(start, 1, {start})
+        return rows
+
+    def _top_k(self, match, bind, text, hidden):
+        rows = []
+        for vertex_id in bind["frontier"]:
+            edges = [e for e in self.db.follows.outbound(vertex_id) if self._visible(e["_to"], hidden)]
+            # SORT ... DESC puts nulls last
+            edges.sort(key=lambda e: (e.get("followedAt") is not None, e.get("followedAt") or ""), reverse=True)
+            rows.extend(
+                [e["_to"], self._ref(e, "_to", "toUid"), e.get("followedAt")] for e in edges[:bind["k"]]
+            )
+        return rows
+
+    def _multi_bfs(self, match, bind, text):
+        depth = text.count("LET grouped")
+        sources = bind["sources"]
+        frontier = [(s, f"users/{s}") for s in sources]
+        seen = set(frontier)
+        for s in sources:
+            seen.update((s, b["_to"]) for b in self.db.blocks.outbound(f"users/{s}"))
+
+        rows = []
+        for _ in range(depth):
+            adjacency = {
+                v: [(e["_to"], e.get("followedAt")) for e in self.db.follows.outbound(v) if self._active(e["_to"])]
+                for v in dict.fromkeys(v for _, v in frontier)
+            }
+            found = {}
+            for s, v in frontier:
+                for target, at in adjacency[v]:
+                    if (s, target) in seen:
+                        continue
+                    # AGGREGATE MIN ignores nulls
+                    current = found.get((s, target))
+                    found[(s, target)] = at if current is None else min(current, at) if at is not None else current
+            # COLLECT returns groups sorted by their keys
+            level = sorted(found.items())
+            seen.update(found)
+            frontier = [pair for pair, _ in level]
+            rows.extend([s, _key_from_id(v), at] for (s, v), at in level)
+        return rows
+
+    def _plan_stats(self, match, bind, text):
+        start = bind["userKey"]
+        doc = self._document(start) or {}
+        edges = self.db.follows.outbound(start)
+        has_counts = doc.get("followingCount") is not None
+        sample = []
+        for e in edges[:bind["sampleSize"]]:
+            count = (self._document(e["_to"]) or {}).get("followingCount")
+            if count is None:
+                count = min(len(self.db.follows._from.get(e["_to"], ())), bind["cap"])
+            sample.append(count)
+        return [{
+            "degree": doc["followingCount"] if has_counts else len(edges),
+            "sample": sample,
+            "hasCounts": has_counts,
+        }]
+
+
+class FakeDatabase:
+    """In-process stand-in for python-arango's ``StandardDatabase``.
+
+    All state sits behind one lock, so concurrent callers see the same
+    serialisable behaviour as single-document operations on a real server;
+    latency is charged outside the lock, so requests overlap in time.
+    """
+
+    def __init__(self, name: str = "fake", latency: Latency = None):
+        self.name = name
+        self.latency = latency or Latency()
+        self.collections: dict[str, FakeCollection] = {}
+        self.graphs: dict[str, list[dict]] = {}
+        self.aql = FakeAQL(self)
+        self._lock = threading.RLock()
+        self._rev = 0
+
+    def _revision(self) -> str:
+        self._rev += 1
+        return f"_{self._rev}"
+
+    def _merge(self, doc: dict, patch: dict, keep_none: bool = True) -> dict:
+        # UPDATE / collection.update semantics: top-level merge and a new _rev
+        for field, value in patch.items():
+            if field in ("_key", "_id", "_rev"):
+                continue
+            if value is None and not keep_none:
+                doc.pop(field, None)
+            else:
+                doc[field] = value
+        doc["_rev"] = self._revision()
+        return doc
+
+    @property
+    def users(self) -> FakeCollection:
+        return self.collections["users"]
+
+    @property
+    def follows(self) -> FakeCollection:
+        return self.collections["follows"]
+
+    @property
+    def blocks(self) -> FakeCollection:
+        return self.collections["blocks"]
+
+    def has_collection(self, name: str) -> bool:
+        return name in self.collections
+
+    def create_collection(self, name: str, edge: bool = False, **options) -> FakeCollection:
+        with self._lock:
+            collection = self.collections.setdefault(name, FakeCollection(self, name, edge))
+        return collection
+
+    def collection(self, name: str) -> FakeCollection:
+        return self.collections[name]
+
+    def has_graph(self, name: str) -> bool:
+        return name in self.graphs
+
+    def create_graph(self, name: str, edge_definitions: list[dict] = None, **options):
+        # Traversals always walk ``follows``; the definition is only recorded
+        self.graphs[name] = edge_definitions or []
+        return name
+
+
+class FakeArangoDBHelper:
+    """Drop-in for ``ArangoDBHelper`` holding every collection in memory."""
+
+    def __init__(self, latency: Latency = None):
+        self.db_name = "fake"
+        self.db = FakeDatabase(self.db_name, latency=latency)
+        self.read_db = self.db
+        self.collections = {
+            name: self.db.create_collection(name, edge=is_edge)
+            for name, is_edge in (collection.value for collection in CollectionTypes)
+        }
+
+    def get_collection(self, name: str) -> FakeCollection:
+        return self.collections[name]
+
+    def reconnect(self):
+        # Nothing is pooled; a forked child keeps its copy of the data
+        pass
@@ -0,0 +1,114 @@
+import socketserver
+import threading
+import time
+
+
+class FakeRedisServer:
+    """Embedded single-process server speaking enough RESP2 for the cache.
+
+    Supports GET/MGET/SET (EX)/DEL/SADD/SMEMBERS/EXPIRE/SELECT/PING and
+    PUBLISH/SUBSCRIBE. Expiry is checked lazily on read.
+    """
+
+    def __init__(self):
+        self.data: dict[bytes, object] = {}
+        self.expiry: dict[bytes, float] = {}
+        self.subscribers: dict[bytes, list] = {}
+        self.commands: list[list[bytes]] = []
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                try:
+                    while True:
+                        command = self._read_command()
+                        if command is None:
+                            return
+                        server.commands.append(command)
+                        self.wfile.write(server.execute(command, self))
+                        self.wfile.flush()
+                finally:
+                    # Like Redis, a closed connection leaves its channels
+                    for handlers in server.subscribers.values():
+                        if self in handlers:
+                            handlers.remove(self)
+
+            def _read_command(self):
+                line = self.rfile.readline()
+                if not line:
+                    return None
+                args = []
+                for _ in range(int(line[1:-2])):
+                    length = int(self.rfile.readline()[1:-2])
+                    args.append(self.rfile.read(length + 2)[:-2])
+                return args
+
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self.url = f"redis://127.0.0.1:{self.port}/0"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    @staticmethod
+    def _bulk(value) -> bytes:
+        if value is None:
+            return b"$-1\r\n"
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+    def _array(self, items) -> bytes:
+        return b"*%d\r\n" % len(items) + b"".join(self._bulk(i) for i in items)
+
+    def _live(self, key):
+        expires_at = self.expiry.get(key)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self.data.pop(key, None)
+            self.expiry.pop(key, None)
+        return self.data.get(key)
+
+    def execute(self, command, handler) -> bytes:
+        name, args = command[0].upper(), command[1:]
+        with self.lock:
+            if name in (b"PING", b"SELECT"):
+                return b"+OK\r\n"
+            if name == b"GET":
+                return self._bulk(self._live(args[0]))
+            if name == b"MGET":
+                return self._array([self._live(k) for k in args])
+            if name == b"SET":
+                self.data[args[0]] = args[1]
+                self.expiry.pop(args[0], None)
+                if len(args) >= 4 and args[2].upper() == b"EX":
+                    self.expiry[args[0]] = time.monotonic() + int(args[3])
+                return b"+OK\r\n"
+            if name == b"DEL":
+                removed = sum(1 for k in args if self.data.pop(k, None) is not None)
+                return b":%d\r\n" % removed
+            if name == b"SADD":
+                members = self.data.setdefault(args[0], set())
+                before = len(members)
+                members.update(args[1:])
+                return b":%d\r\n" % (len(members) - before)
+            if name == b"SMEMBERS":
+                return self._array(sorted(self._live(args[0]) or ()))
+            if name == b"EXPIRE":
+                self.expiry[args[0]] = time.monotonic() + int(args[1])
+                return b":1\r\n"
+            if name == b"SUBSCRIBE":
+                self.subscribers.setdefault(args[0], []).append(handler)
+                return b"*3\r\n" + self._bulk(b"subscribe") + self._bulk(args[0]) + b":1\r\n"
+            if name == b"PUBLISH":
+                targets = list(self.subscribers.get(args[0], ()))
+                for target in targets:
+                    try:
+                        target.wfile.write(self._array([b"message", args[0], args[1]]))
+                        target.wfile.flush()
+                    except OSError:
+                        pass
+                return b":%d\r\n" % len(targets)
+        return b"-ERR unknown command '%s'\r\n" % name
@@ -0,0 +1,80 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.repositories.follow_repo import FollowRepository
+from app.repositories.graph_traversal_repo import GraphTraversalRepository
+from tests.fakes.arango import FakeArangoDBHelper, Latency, SimulatedClock
+
+REQUEST_LATENCY = 0.002
+ROW_LATENCY = 0.00001
+
+
+def _seed(helper: FakeArangoDBHelper, users: int, edges: int) -> list[str]:
+    # Written straight into the collections so seeding costs no latency
+    rng = random.Random(7)
+    names = [f"user_{i:05d}" for i in range(users)]
+    helper.get_collection("users").insert_many([{"_key": n, "username": n} for n in names])
+    pairs = {(rng.randrange(users), rng.randrange(users)) for _ in range(edges)}
+    helper.get_collection("follows").insert_many([
+        {
+            "_key": f"{names[a]}__{names[b]}",
+            "_from": f"users/{names[a]}",
+            "_to": f"users/{names[b]}",
+            "followedAt": f"2025-01-01T00:00:{i % 60:02d}+00:00",
+        }
+        for i, (a, b) in enumerate(sorted(pairs)) if a != b
+    ])
+    return names
+
+
+def test_batched_bfs_round_trips_on_simulated_latency():
+    print("[BENCH] Comparing per-user BFS with one multi-source BFS on the fake ArangoDB...")
+    clock = SimulatedClock()
+    helper = FakeArangoDBHelper(latency=Latency(REQUEST_LATENCY, ROW_LATENCY, sleep=clock.sleep))
+    names = _seed(helper, users=2_000, edges=10_000)
+    repo = GraphTraversalRepository(db=helper.db)
+    sources = names[:50]
+    latency = helper.db.latency
+
+    started, requests = clock.now, latency.requests
+    single = {name: repo.traverse_bfs(name, max_depth=2) for name in sources}
+    single_time, single_requests = clock.now - started, latency.requests - requests
+
+    started, requests = clock.now, latency.requests
+    multi = repo.traverse_bfs_multi(sources, max_depth=2)
+    multi_time, multi_requests = clock.now - started, latency.requests - requests
+
+    print(f"[BENCH] per-user: {single_requests} round trips, {single_time:.3f}s simulated")
+    print(f"[BENCH] batched:  {multi_requests} round trips, {multi_time:.3f}s simulated")
+
+    assert {n: sorted(r["followed"] for r in rs) for n, rs in single.items()} == {
+        n: sorted(r["followed"] for r in rs) for n, rs in multi.items()
+    }
+    assert multi_requests < single_requests
+    assert multi_time < single_time
+
+
+def test_concurrent_list_reads_overlap_server_latency():
+    print("[BENCH] Measuring list reads with 1 and 8 client threads against 8 server slots...")
+    helper = FakeArangoDBHelper(latency=Latency(REQUEST_LATENCY, max_concurrency=8))
+    names = _seed(helper, users=500, edges=2_000)
+    repo = FollowRepository(
+        user_coll=helper.get_collection("users"),
+        follow_coll=helper.get_collection("follows"),
+        db=helper.db,
+    )
+    batch = names[:64]
+
+    started = time.perf_counter()
+    for name in batch:
+        repo.get_followers(name)
+    sequential = time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(repo.get_followers, batch))
+    concurrent = time.perf_counter() - started
+
+    print(f"[BENCH] sequential {sequential:.3f}s / 8 threads {concurrent:.3f}s")
+    assert concurrent < sequential / 2
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from app.main import app
+from app.repositories.follow_repo import FollowRepository
+from app.repositories.graph_traversal_repo import GraphTraversalRepository
+from app.repositories.user_repo import UserRepository
+from app.routes import follow_routes, reach_routes, traverse_bfs_routes, traverse_dfs_routes
+from app.tools.load_test import DEFAULT_MIX, format_report, run_load, synthetic_requests, username
+from tests.fakes.arango import FakeArangoDBHelper, Latency
+
+USERS = 300
+
+
+@pytest.fixture
+def fake_service(monkeypatch):
+    # Seeded without latency, then every request pays 1 ms per round trip
+    helper = FakeArangoDBHelper()
+    users = UserRepository(user_coll=helper.get_collection("users"), db=helper.db)
+    follows = FollowRepository(
+        user_coll=helper.get_collection("users"),
+        follow_coll=helper.get_collection("follows"),
+        db=helper.db,
+        tombstone_coll=helper.get_collection("follow_tombstones"),
+        block_coll=helper.get_collection("blocks"),
+    )
+    graph = GraphTraversalRepository(db=helper.db)
+    for i in range(USERS):
+        users.create_user(username(i))
+    for i in range(USERS):
+        for step in (1, 7, 31):
+            follows.create_follow(username(i), username((i * step + 1) % USERS or 1))
+    helper.db.latency = Latency(request=0.001)
+
+    monkeypatch.setattr(follow_routes, "follow_repo", follows)
+    monkeypatch.setattr(follow_routes, "graph_traversal_repo", graph)
+    for module in (traverse_bfs_routes, traverse_dfs_routes, reach_routes):
+        monkeypatch.setattr(module, "graph_traversal_repo", graph)
+        monkeypatch.setattr(module, "traversal_executor", None, raising=False)
+    return helper
+
+
+def test_default_mix_end_to_end_over_asgi(fake_service):
+    print("[BENCH] Replaying the default traffic mix against the app on the fake ArangoDB...")
+    requests = synthetic_requests(DEFAULT_MIX, users=USERS, depths=[2, 3], seed=3)
+
+    summary = asyncio.run(run_load(requests, rps=200, duration=2.0, app=app)).summary()
+
+    print(format_report(summary))
+    assert summary["total"]["requests"] == 400
+    # An unfollow sent before its follow completed is a 404, but an expected one
+    for label, endpoint in summary["endpoints"].items():
+        assert not any(status.startswith("5") or not status.isdigit() for status in endpoint["statuses"]), label
+        assert endpoint["error_rate"] == 0.0, label
+    assert fake_service.db.latency.requests > 400
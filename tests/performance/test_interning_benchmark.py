@@ -0,0 +1,81 @@
+import random
+import time
+
+from app.cache.backends import LocalLRUBackend
+from app.interning import UserIdInterner
+from app.repositories.follow_repo import FollowRepository
+from app.repositories.user_repo import UserRepository
+from tests.fakes.arango import FakeArangoDBHelper
+
+USERS = 2_000
+FOLLOWS = 20_000
+READS = 2_000
+
+
+def _build(interned: bool):
+    # The same graph written through create_user/create_follow, with and
+    # without an interner, so both sides use the shipped key and cache paths
+    helper = FakeArangoDBHelper()
+    interner = UserIdInterner(db=helper.db, block_size=256) if interned else None
+    cache = LocalLRUBackend(max_entries=USERS * 2)
+    users = UserRepository(user_coll=helper.get_collection("users"), interner=interner, db=helper.db)
+    follows = FollowRepository(
+        user_coll=helper.get_collection("users"),
+        follow_coll=helper.get_collection("follows"),
+        db=helper.db,
+        cache=cache,
+        interner=interner,
+    )
+    rng = random.Random(42)
+    names = [f"user_{i:07d}_{rng.getrandbits(32):08x}" for i in range(USERS)]
+    for name in names:
+        users.create_user(name)
+    pairs = {(rng.randrange(USERS), rng.randrange(USERS)) for _ in range(FOLLOWS)}
+    for a, b in pairs:
+        if a != b:
+            follows.create_follow(names[a], names[b])
+    return helper, follows, cache, names
+
+
+def _measure(interned: bool) -> dict:
+    helper, follows, cache, names = _build(interned)
+    key_bytes = sum(len(key) for key in helper.get_collection("follows").docs)
+
+    for name in names:
+        follows.get_followers(name)
+    cache_bytes = sum(len(data) for data, _ in cache._entries.values())
+
+    rng = random.Random(7)
+    started = time.perf_counter()
+    for _ in range(READS):
+        follows.get_followers(names[rng.randrange(USERS)])
+    hit_time = time.perf_counter() - started
+    return {
+        "key_bytes": key_bytes,
+        "cache_bytes": cache_bytes,
+        "hit_time": hit_time,
+        "follows": follows,
+        "names": names,
+    }
+
+
+def test_interned_keys_and_cache_entries_are_smaller():
+    print("[BENCH] Comparing username and uid edge keys and list cache entries on the fake ArangoDB...")
+    plain = _measure(interned=False)
+    interned = _measure(interned=True)
+
+    print(f"[BENCH] edge _key bytes: names {plain['key_bytes']} / uids {interned['key_bytes']}")
+    print(f"[BENCH] follower list cache: names {plain['cache_bytes']} B / uids {interned['cache_bytes']} B")
+    print(
+        f"[BENCH] {READS} cached follower reads: names {plain['hit_time']:.3f}s / "
+        f"uids {interned['hit_time']:.3f}s (includes name resolution)"
+    )
+
+    # Both graphs come from the same seed, so the lists must agree
+    for name in random.Random(1).sample(plain["names"], 20):
+        assert sorted(r["followed"] for r in plain["follows"].get_followers(name)) == sorted(
+            r["followed"] for r in interned["follows"].get_followers(name)
+        )
+
+    assert interned["key_bytes"] < plain["key_bytes"] / 2
+    assert interned["cache_bytes"] < plain["cache_bytes"]
@@ -0,0 +1,31 @@
+import time
+
+from app.validators.username_validator import UserValidator
+
+
+def _per_call_ns(fn, args, rounds: int) -> float:
+    started = time.perf_counter_ns()
+    for _ in range(rounds):
+        for arg in args:
+            fn(arg)
+    return (time.perf_counter_ns() - started) / (rounds * len(args))
+
+
+def test_username_validation_overhead_is_negligible():
+    print("[BENCH] Measuring username validation overhead...")
+    hot = [f"user_{i}" for i in range(100)]
+    cold = [f"cold_user_{i}" for i in range(20_000)]
+
+    hot_ns = _per_call_ns(UserValidator.validate_username, hot, rounds=1000)
+    cold_ns = _per_call_ns(UserValidator.validate_username, cold, rounds=1)
+
+    started = time.perf_counter_ns()
+    UserValidator.validate_many(hot * 100)
+    batch_ns = (time.perf_counter_ns() - started) / (len(hot) * 100)
+
+    print(f"[BENCH] memoised: {hot_ns:.0f} ns/call, first sight: {cold_ns:.0f} ns/call, "
+          f"validate_many: {batch_ns:.0f} ns/name")
+
+    # A single AQL round-trip is ~1 ms; validation must stay orders below that
+    assert hot_ns < 5_000
+    assert cold_ns < 20_000
@@ -0,0 +1,145 @@
+from unittest.mock import MagicMock
+
+from arango.exceptions import ArangoError
+
+from app.analytics.communities import UnionFind, connected_components, label_propagation, majority_label
+from app.analytics.community_store import CommunityStore
+from app.analytics.edges import EdgeList
+from app.tools.community_job import write_labels
+
+
+def _graph(edges, isolated=()):
+    graph = EdgeList()
+    for name in isolated:
+        graph.vertex(name)
+    for follower, followed in edges:
+        graph.add_edge(follower, followed)
+    return graph
+
+
+def _groups(graph, labels):
+    groups = {}
+    for v, label in enumerate(labels):
+        groups.setdefault(label, set()).add(graph.names[v])
+    return sorted(groups.values(), key=sorted)
+
+
+def test_union_find_merges_by_size():
+    sets = UnionFind(4)
+    sets.union(0, 1)
+    sets.union(2, 1)
+
+    assert sets.find(2) == sets.find(0)
+    assert sets.find(3) == 3
+    assert sets.size[sets.find(0)] == 3
+
+
+def test_connected_components_ignore_direction():
+    graph = _graph([("a", "b"), ("c", "b"), ("d", "e")], isolated=["f"])
+
+    labels = connected_components(len(graph), graph.sources, graph.targets)
+
+    assert _groups(graph, labels) == [{"a", "b", "c"}, {"d", "e"}, {"f"}]
+    print("[TEST] Weakly connected components are found with union-find.")
+
+
+def test_label_propagation_separates_dense_groups():
+    clique = lambda names: [(x, y) for x in names for y in names if x != y]
+    graph = _graph(clique("abcd") + clique("wxyz") + [("d", "w")])
+
+    labels = label_propagation(len(graph), graph.sources, graph.targets, seed=1)
+
+    assert _groups(graph, labels) == [set("abcd"), set("wxyz")]
+    assert labels == label_propagation(len(graph), graph.sources, graph.targets, seed=1)
+    print("[TEST] Label propagation splits two cliques joined by one edge.")
+
+
+def test_majority_label_keeps_current_on_ties():
+    assert majority_label("a", ["a", "b"]) == "a"
+    assert majority_label("c", ["a", "b", "b"]) == "b"
+    assert majority_label("c", ["b", "a"]) == "a"
+    assert majority_label("c", []) == "c"
+
+
+def test_write_labels_uses_member_usernames():
+    graph = _graph([("alice", "bob")])
+    db = MagicMock()
+
+    write_labels(db, graph, components=[1, 1], communities=[0, 0], computed_at="now")
+
+    rows = db.aql.execute.call_args.kwargs["bind_vars"]["rows"]
+    assert rows == [["alice", "bob", "alice"], ["bob", "bob", "alice"]]
+
+
+def test_follow_between_components_relabels_the_smaller():
+    db = MagicMock()
+    store = CommunityStore(db, merge_chunk=2, pause=0)
+    store.users.get_many.return_value = [{"_key": "alice", "component": "a"}, {"_key": "bob", "component": "b"}]
+    db.aql.execute.side_effect = [iter([10, 3]), iter([1, 1]), iter([1])]
+
+    store.merge_components("alice", "bob")
+
+    # The smaller component is rewritten in chunks until one comes back short
+    relabels = [c.kwargs["bind_vars"] for c in db.aql.execute.call_args_list[1:]]
+    assert relabels == [{"from": "b", "to": "a", "chunk": 2}] * 2
+    print("[TEST] Merging components rewrites only the smaller one, in chunks.")
+
+
+def test_merge_of_two_huge_components_is_left_to_the_job():
+    db = MagicMock()
+    store = CommunityStore(db, max_merge=5)
+    store.users.get_many.return_value = [{"_key": "alice", "component": "a"}, {"_key": "bob", "component": "b"}]
+    db.aql.execute.return_value = iter([6, 6])
+
+    store.merge_components("alice", "bob")
+
+    assert db.aql.execute.call_count == 1
+
+
+def test_new_users_join_the_existing_component():
+    db = MagicMock()
+    store = CommunityStore(db)
+    store.users.get_many.return_value = [{"_key": "alice", "component": "a"}, {"_key": "newbie"}]
+
+    store.merge_components("newbie", "alice")
+
+    store.users.update.assert_called_once_with({"_key": "newbie", "component": "a"})
+    db.aql.execute.assert_not_called()
+
+
+def test_relabel_adopts_neighbour_majority_in_one_batch():
+    db = MagicMock()
+    store = CommunityStore(db, neighbour_cap=50)
+    db.aql.execute.return_value = iter([["alice", "x", ["y", "y", "x"]], ["bob", "y", ["y"]]])
+
+    store.relabel_communities(["alice", "bob"])
+
+    assert db.aql.execute.call_args.kwargs["bind_vars"] == {"usernames": ["alice", "bob"], "cap": 50}
+    store.users.update_many.assert_called_once_with([{"_key": "alice", "community": "y"}])
+
+
+def test_follow_changes_are_queued_and_applied_in_batches():
+    db = MagicMock()
+    store = CommunityStore(db, queue_size=2)
+    applied = []
+    store.apply_changes = applied.append
+
+    store.on_follow_change("alice", "bob", True)
+    store.on_follow_change("bob", "carol", False)
+    store.on_follow_change("carol", "dave", True)
+    assert store.dropped == 1
+    db.aql.execute.assert_not_called()
+
+    store.start()
+    store.stop()
+    store._thread.join(timeout=2)
+
+    assert applied == [[("alice", "bob", True), ("bob", "carol", False)]]
+
+
+def test_community_update_failures_do_not_raise():
+    db = MagicMock()
+    store = CommunityStore(db)
+    store.users.get_many.side_effect = ArangoError("down")
+
+    store.apply_changes([("alice", "bob", True)])
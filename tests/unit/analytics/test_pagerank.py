@@ -0,0 +1,103 @@
+from array import array
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.analytics.edges import EdgeList, load_edge_list
+from app.analytics.pagerank import degree_stats, pagerank, rank_order
+from app.tools import pagerank_job
+from app.tools.pagerank_job import write_scores
+
+
+def _graph(edges, isolated=()):
+    graph = EdgeList()
+    for name in isolated:
+        graph.vertex(name)
+    for follower, followed in edges:
+        graph.add_edge(follower, followed)
+    return graph
+
+
+def _cursor(rows):
+    cursor = MagicMock()
+    cursor.batch.return_value = list(rows)
+    cursor.has_more.return_value = False
+    return cursor
+
+
+def test_pagerank_ranks_the_most_followed_user_first():
+    # Everyone follows hub; hub follows alice back
+    graph = _graph([("alice", "hub"), ("bob", "hub"), ("carol", "hub"), ("hub", "alice")], isolated=["dave"])
+
+    scores = pagerank(len(graph), graph.sources, graph.targets)
+    order = [graph.names[v] for v in rank_order(scores)]
+
+    assert sum(scores) == pytest.approx(1.0)
+    assert order[:2] == ["hub", "alice"]
+    assert scores[graph.index["bob"]] == pytest.approx(scores[graph.index["dave"]])
+    print("[TEST] PageRank favours the most followed users and sums to one.")
+
+
+def test_pagerank_of_a_cycle_is_uniform():
+    graph = _graph([("a", "b"), ("b", "c"), ("c", "a")])
+
+    scores = pagerank(len(graph), graph.sources, graph.targets)
+
+    assert list(scores) == pytest.approx([1 / 3] * 3)
+    assert pagerank(0, array("I"), array("I")) == []
+
+
+def test_pagerank_tolerance_does_not_scale_with_user_count():
+    # A tolerance of n * tol would stop this star after one iteration with
+    # the hub near 0.85; its stationary score is about 0.46
+    graph = _graph([(f"user_{i}", "hub") for i in range(999)])
+
+    scores = pagerank(len(graph), graph.sources, graph.targets, tol=1e-3)
+
+    assert scores[graph.index["hub"]] == pytest.approx(0.46, abs=0.01)
+
+
+def test_degree_stats_summarise_in_and_out_degrees():
+    graph = _graph([("alice", "hub"), ("bob", "hub"), ("hub", "alice")], isolated=["dave"])
+
+    stats = degree_stats(len(graph), graph.sources, graph.targets)
+
+    assert stats["users"] == 4 and stats["edges"] == 3
+    assert stats["in_degree"]["max"] == 2
+    assert stats["in_degree"]["zero"] == 2
+    assert stats["out_degree"]["max"] == 1
+    assert stats["out_degree"]["mean"] == 0.75
+    print("[TEST] Degree statistics describe both directions.")
+
+
+def test_load_edge_list_streams_users_then_edges():
+    db = MagicMock()
+    db.aql.execute.side_effect = [_cursor(["dave", "alice"]), _cursor([["alice", "bob"]])]
+
+    graph = load_edge_list(db, batch_size=100)
+
+    assert graph.names == ["dave", "alice", "bob"]
+    assert list(graph.sources) == [1] and list(graph.targets) == [2]
+    assert all(call.kwargs["stream"] for call in db.aql.execute.call_args_list)
+
+
+def test_write_scores_assigns_ranks_in_batches():
+    graph = _graph([("alice", "hub"), ("bob", "hub")])
+    db = MagicMock()
+
+    written = write_scores(db, graph, [0.2, 0.6, 0.2], batch_size=2, computed_at="now")
+
+    assert written == 3
+    batches = [call.kwargs["bind_vars"]["rows"] for call in db.aql.execute.call_args_list]
+    assert batches == [[["hub", 0.6, 1], ["alice", 0.2, 2]], [["bob", 0.2, 3]]]
+    assert db.aql.execute.call_args.kwargs["bind_vars"]["n"] == 3
+    print("[TEST] Scores are written back in ranked batches.")
+
+
+def test_job_refuses_the_pure_python_path_by_default(monkeypatch):
+    monkeypatch.setattr(pagerank_job, "backend", lambda: "python")
+    monkeypatch.setattr("sys.argv", ["pagerank_job"])
+
+    with pytest.raises(SystemExit):
+        pagerank_job.main()
+    print("[TEST] Without NumPy the job fails loudly instead of crawling.")
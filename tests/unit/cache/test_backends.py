@@ -0,0 +1,191 @@
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.cache.backends import LocalLRUBackend, RedisBackend, deserialize, serialize
+from app.repositories.follow_repo import FollowRepository
+from tests.fakes.redis_server import FakeRedisServer
+
+
+RECORDS = [
+    {"followed": "alice", "followedAt": "2025-07-15T12:00:00+00:00"},
+    {"followed": "bob", "followedAt": None},
+]
+
+
+@pytest.fixture
+def redis_server():
+    server = FakeRedisServer()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(params=["local", "redis"])
+def backend(request, redis_server):
+    if request.param == "local":
+        yield LocalLRUBackend(max_entries=100)
+    else:
+        backend = RedisBackend(url=redis_server.url, default_ttl=60)
+        yield backend
+        backend.close()
+
+
+def test_serialize_roundtrip_uses_columnar_records():
+    data = serialize(RECORDS)
+
+    assert data[:1] == b"r"
+    assert deserialize(data) == RECORDS
+    assert deserialize(serialize(42)) == 42
+    assert deserialize(serialize([])) == []
+
+
+def test_serialize_compresses_large_values():
+    records = [{"followed": f"user{i}", "followedAt": None} for i in range(500)]
+
+    data = serialize(records)
+
+    assert data[:1] == b"z"
+    assert deserialize(data) == records
+
+
+def test_backend_get_set_delete(backend):
+    backend.set("followers:carol", RECORDS)
+    backend.set_many({"followers_count:carol": 2, "following_count:carol": 0})
+
+    assert backend.get("followers:carol") == RECORDS
+    assert backend.get_many(["followers_count:carol", "following_count:carol", "missing"]) == {
+        "followers_count:carol": 2,
+        "following_count:carol": 0,
+    }
+
+    backend.delete(["followers:carol"])
+    assert backend.get("followers:carol") is None
+    print("[TEST] Cache backend stores and deletes values.")
+
+
+def test_backend_tag_invalidation(backend):
+    backend.set("traversal:bfs:2:alice", RECORDS, tags=["vertex:alice", "vertex:bob"])
+    backend.set("traversal:bfs:2:erin", [], tags=["vertex:erin"])
+
+    backend.delete([], tags=["vertex:bob"])
+
+    assert backend.get("traversal:bfs:2:alice") is None
+    assert backend.get("traversal:bfs:2:erin") == []
+    print("[TEST] Tag invalidation drops every key tagged with the vertex.")
+
+
+def test_local_backend_evicts_lru():
+    backend = LocalLRUBackend(max_entries=2)
+    backend.set("a", 1)
+    backend.set("b", 2)
+    backend.get("a")
+    backend.set("c", 3)
+
+    assert backend.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+
+
+def test_local_backend_forgets_evicted_keys_in_tags():
+    backend = LocalLRUBackend(max_entries=1)
+    backend.set("a", 1, tags=["vertex:x"])
+    backend.set("b", 2, tags=["vertex:x", "vertex:y"])
+    backend.delete(["b"])
+
+    assert backend._tags == {}
+    assert backend._key_tags == {}
+    print("[TEST] Evicted and deleted keys leave no tag sets behind.")
+
+
+def test_redis_backend_survives_a_dropped_connection(redis_server):
+    backend = RedisBackend(url=redis_server.url)
+    backend.set("a", 1)
+    backend._conn.close()
+
+    assert backend.get("a") is None
+    backend.set("b", 2)
+    backend.delete(["missing"], tags=["vertex:x"])
+
+    assert backend.get_many(["a", "b"]) == {"a": 1, "b": 2}
+    backend.close()
+    print("[TEST] A broken Redis connection is a miss, then replaced.")
+
+
+def test_redis_backend_treats_unreachable_server_as_misses(redis_server):
+    backend = RedisBackend(url=redis_server.url)
+    redis_server.stop()
+    backend._conn.close()
+
+    assert backend.get("a") is None
+    backend.set("a", 1)
+    backend.publish({"keys": ["a"]})
+    backend.close()
+    print("[TEST] Cache writes are best effort while Redis is down.")
+
+
+def test_redis_subscription_reconnects(redis_server):
+    writer = RedisBackend(url=redis_server.url)
+    reader = RedisBackend(url=redis_server.url)
+    seen = threading.Event()
+    reader.subscribe(lambda message: seen.set())
+
+    reader._listener_conn.close()
+    for _ in range(40):
+        writer.publish({"keys": []})
+        if seen.wait(0.1):
+            break
+
+    assert seen.is_set()
+    writer.close()
+    reader.close()
+    print("[TEST] The invalidation listener resubscribes after a drop.")
+
+
+def test_redis_backend_pipelines_multi_key_writes(redis_server):
+    backend = RedisBackend(url=redis_server.url)
+    redis_server.commands.clear()
+
+    backend.set_many({"a": 1, "b": 2}, tags=["vertex:x"])
+
+    assert [c[0] for c in redis_server.commands] == [b"SET", b"SET", b"SADD", b"EXPIRE"]
+    backend.close()
+
+
+def test_redis_invalidations_reach_other_replicas(redis_server):
+    writer = RedisBackend(url=redis_server.url)
+    reader = RedisBackend(url=redis_server.url)
+    received = []
+    seen = threading.Event()
+
+    def on_message(message):
+        received.append(message)
+        seen.set()
+
+    reader.subscribe(on_message)
+    writer.subscribe(lambda message: pytest.fail("replica received its own invalidation"))
+    writer.publish({"follower": "alice", "followed": "bob", "keys": []})
+
+    assert seen.wait(2)
+    assert received[0]["follower"] == "alice"
+    writer.close()
+    reader.close()
+    print("[TEST] Invalidations are broadcast to other replicas only.")
+
+
+def test_follow_repo_reads_through_and_invalidates_cache():
+    db = MagicMock()
+    users = MagicMock()
+    users.has.return_value = True
+    cache = LocalLRUBackend()
+    repo = FollowRepository(user_coll=users, follow_coll=MagicMock(), db=db, cache=cache)
+    db.aql.execute.return_value = iter(RECORDS)
+
+    assert repo.get_followers("carol") == RECORDS
+    assert repo.get_followers("carol") == RECORDS
+    db.aql.execute.assert_called_once()
+
+    cache.set("traversal:bfs:2:zed", RECORDS, tags=["vertex:alice"])
+    repo.create_follow("alice", "carol")
+
+    assert cache.get("followers:carol") is None
+    assert cache.get("traversal:bfs:2:zed") is None
+    print("[TEST] FollowRepository caches lists and invalidates them on writes.")
@@ -0,0 +1,107 @@
+from unittest.mock import MagicMock
+
+from app.cache.khop_materialiser import KHopMaterialiser, RequestFrequency
+from app.repositories.graph_traversal_repo import GraphTraversalRepository
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _records(*names):
+    return [{"followed": name, "followedAt": f"2025-01-0{i + 1}T00:00:00+00:00"} for i, name in enumerate(names)]
+
+
+def _materialiser(compute, **kwargs):
+    kwargs.setdefault("min_requests", 1)
+    return KHopMaterialiser(compute, **kwargs)
+
+
+def test_request_frequency_decays_and_evicts_coldest():
+    clock = FakeClock()
+    frequency = RequestFrequency(capacity=2, half_life=10.0, clock=clock)
+    for _ in range(4):
+        frequency.record("hot")
+    frequency.record("warm")
+    frequency.record("new")
+
+    assert frequency.top(10) == ["hot", "new"]
+
+    clock.now = 20.0
+    assert frequency.top(10, min_count=1.0) == ["hot"]
+    print("[TEST] Request counts decay and the coldest name is evicted.")
+
+
+def test_refresh_materialises_top_users_only():
+    compute = MagicMock(side_effect=lambda name, depth: _records("bob", "carol"))
+    materialiser = _materialiser(compute, max_users=1, max_depth=3)
+    for _ in range(3):
+        materialiser.record_request("alice")
+    materialiser.record_request("dave")
+
+    assert materialiser.refresh() == 2
+    assert sorted(call.args for call in compute.call_args_list) == [("alice", 2), ("alice", 3)]
+    assert materialiser.get("alice", 2) == _records("bob", "carol")
+    assert materialiser.get("dave", 2) is None
+    assert materialiser.refresh() == 0
+    print("[TEST] Hot users' neighbourhoods are built once and served.")
+
+
+def test_follow_change_inside_neighbourhood_forces_rebuild():
+    compute = MagicMock(return_value=_records("bob"))
+    materialiser = _materialiser(compute)
+    materialiser.record_request("alice")
+    materialiser.refresh()
+
+    materialiser.on_follow_change("zed", "alice", True)
+    assert materialiser.get("alice", 2) is not None
+
+    materialiser.on_follow_change("bob", "erin", True)
+    assert materialiser.get("alice", 2) is None
+
+    compute.return_value = _records("bob", "erin")
+    assert materialiser.refresh() == 1
+    assert materialiser.get("alice", 2) == _records("bob", "erin")
+    print("[TEST] Only neighbourhoods containing the follower are rebuilt.")
+
+
+def test_write_during_build_keeps_entry_dirty():
+    materialiser = _materialiser(None)
+
+    def compute(name, depth):
+        materialiser.on_follow_change("someone", "else", True)
+        return _records("bob")
+
+    materialiser.compute = compute
+    materialiser.record_request("alice")
+    materialiser.refresh()
+
+    assert materialiser.get("alice", 2) is None
+
+
+def test_oversized_and_cold_users_are_dropped():
+    materialiser = _materialiser(MagicMock(return_value=_records("a", "b", "c")), max_records=2)
+    materialiser.record_request("alice")
+
+    assert materialiser.refresh() == 0
+    assert materialiser.refresh() == 0
+    assert materialiser.compute.call_count == 1
+    assert len(materialiser) == 0
+
+
+def test_repository_serves_bfs_from_materialisation():
+    materialiser = _materialiser(MagicMock(return_value=_records("bob")))
+    repo = GraphTraversalRepository(db=MagicMock(), materialiser=materialiser)
+    materialiser.record_request("alice")
+    materialiser.refresh()
+
+    assert repo.traverse_bfs("alice", 2) == _records("bob")
+    repo.db.aql.execute.assert_not_called()
+
+    repo.db.aql.execute.return_value = iter(_records("carol"))
+    assert repo.traverse_bfs("alice", 2, read_your_writes=True) == _records("carol")
+    print("[TEST] BFS is answered from the materialisation unless read-your-writes.")
@@ -0,0 +1,98 @@
+import pytest
+
+from app.cache.traversal_cache import TraversalCache
+
+
+def _records(*names):
+    return [{"followed": name, "followedAt": None} for name in names]
+
+
+@pytest.fixture
+def cache():
+    return TraversalCache(max_entries=4, max_records=10)
+
+
+def test_put_and_get(cache):
+    cache.put("alice", 2, "bfs", _records("bob", "carol"), cache.version)
+
+    value, needs_refresh = cache.get("alice", 2, "bfs")
+
+    assert [r["followed"] for r in value] == ["bob", "carol"]
+    assert needs_refresh is False
+    assert cache.get("alice", 3, "bfs") == (None, False)
+    assert cache.get("alice", 2, "dfs") == (None, False)
+    print("[TEST] Traversal cache is keyed by username, depth and mode.")
+
+
+def test_write_invalidates_only_affected_entries(cache):
+    cache.put("alice", 2, "bfs", _records("bob"), cache.version)
+    cache.put("erin", 2, "bfs", _records("frank"), cache.version)
+
+    # bob was visited from alice, so a new outbound edge of bob changes it
+    cache.on_follow_change("bob", "zoe")
+
+    assert cache.get("alice", 2, "bfs")[0] is None
+    assert cache.get("erin", 2, "bfs")[0] is not None
+    assert cache.version == 1
+    print("[TEST] Follow writes invalidate only traversals that touched the follower.")
+
+
+def test_write_to_followed_side_does_not_invalidate(cache):
+    cache.put("alice", 2, "bfs", _records("bob"), cache.version)
+
+    cache.on_follow_change("zoe", "bob")
+
+    assert cache.get("alice", 2, "bfs")[0] is not None
+
+
+def test_result_racing_with_write_is_not_stored(cache):
+    version = cache.version
+    cache.on_follow_change("bob", "zoe")
+
+    stored = cache.put("alice", 2, "bfs", _records("bob"), version)
+
+    assert stored is False
+    assert cache.get("alice", 2, "bfs")[0] is None
+
+
+def test_unrelated_write_during_compute_still_stores(cache):
+    version = cache.version
+    cache.on_follow_change("zoe", "bob")
+
+    assert cache.put("alice", 2, "bfs", _records("bob"), version) is True
+
+
+def test_memory_bounds_evict_least_recently_used(cache):
+    cache.put("a", 1, "bfs", _records("x"), cache.version)
+    cache.put("b", 1, "bfs", _records("x"), cache.version)
+    cache.get("a", 1, "bfs")
+    cache.put("c", 1, "bfs", _records(*"123456789"), cache.version)
+
+    assert cache.get("b", 1, "bfs")[0] is None
+    assert cache.get("a", 1, "bfs")[0] is not None
+    assert cache.get("c", 1, "bfs")[0] is not None
+    assert cache.put("d", 1, "bfs", _records(*"abcdefghijk"), cache.version) is False
+    print("[TEST] Traversal cache enforces entry and record bounds.")
+
+
+def test_stale_while_revalidate_serves_stale_once_refreshing():
+    cache = TraversalCache(stale_while_revalidate=True, stale_ttl=60)
+    cache.put("alice", 2, "bfs", _records("bob"), cache.version)
+    cache.on_follow_change("bob", "zoe")
+
+    first = cache.get("alice", 2, "bfs")
+    second = cache.get("alice", 2, "bfs")
+    cache.put("alice", 2, "bfs", _records("bob", "zoe"), cache.version)
+
+    assert first[1] is True
+    assert second[1] is False
+    assert [r["followed"] for r in cache.get("alice", 2, "bfs")[0]] == ["bob", "zoe"]
+    print("[TEST] Stale entries are served while a single refresh runs.")
+
+
+def test_stale_entry_expires_after_ttl():
+    cache = TraversalCache(stale_while_revalidate=True, stale_ttl=0)
+    cache.put("alice", 2, "bfs", _records("bob"), cache.version)
+    cache.on_follow_change("bob", "zoe")
+
+    assert cache.get("alice", 2, "bfs") == (None, False)
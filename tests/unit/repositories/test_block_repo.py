@@ -0,0 +1,54 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.repositories.block_repo import BLOCK, MUTE, BlockRepository
+
+
+@pytest.fixture
+def follow_repo():
+    repo = MagicMock()
+    repo._user_exists.return_value = True
+    return repo
+
+
+@pytest.fixture
+def block_repo(follow_repo):
+    return BlockRepository(block_coll=MagicMock(), db=MagicMock(), follow_repo=follow_repo)
+
+
+def test_block_removes_follows_both_ways(block_repo, follow_repo):
+    edge = block_repo.set_relation("alice", "bob", BLOCK)
+
+    assert edge["_key"] == "alice__bob" and edge["kind"] == BLOCK
+    block_repo.block_coll.insert.assert_called_once_with(edge, overwrite=True)
+    assert [c.args for c in follow_repo.delete_follow.call_args_list] == [("alice", "bob"), ("bob", "alice")]
+    follow_repo.record_visibility_change.assert_called_once_with("alice", "bob")
+    print("[TEST] Blocking drops follows in both directions.")
+
+
+def test_mute_keeps_follows(block_repo, follow_repo):
+    block_repo.set_relation("alice", "bob", MUTE)
+
+    follow_repo.delete_follow.assert_not_called()
+    follow_repo.record_visibility_change.assert_called_once_with("alice", "bob")
+
+
+def test_set_relation_rejects_self_unknown_kind_and_missing_users(block_repo, follow_repo):
+    with pytest.raises(ValueError):
+        block_repo.set_relation("alice", "alice", BLOCK)
+    with pytest.raises(ValueError):
+        block_repo.set_relation("alice", "bob", "hide")
+    follow_repo._user_exists.return_value = False
+    with pytest.raises(ValueError):
+        block_repo.set_relation("alice", "bob", BLOCK)
+    block_repo.block_coll.insert.assert_not_called()
+
+
+def test_remove_relation_only_matches_its_kind(block_repo, follow_repo):
+    block_repo.block_coll.get.return_value = {"_key": "alice__bob", "kind": BLOCK}
+
+    assert block_repo.remove_relation("alice", "bob", MUTE) is False
+    assert block_repo.remove_relation("alice", "bob", BLOCK) is True
+    block_repo.block_coll.delete.assert_called_once_with("alice__bob")
+    follow_repo.record_visibility_change.assert_called_once_with("alice", "bob")
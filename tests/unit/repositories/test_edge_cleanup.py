@@ -0,0 +1,117 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.repositories.edge_cleanup import EdgeCleanup
+
+
+class FakeStreamCursor:
+    """Stream cursor that hands out fixed batches like python-arango's."""
+
+    def __init__(self, batches):
+        self._batches = [list(b) for b in batches]
+        self._current = self._batches.pop(0) if self._batches else []
+
+    def batch(self):
+        return self._current
+
+    def has_more(self):
+        return bool(self._batches)
+
+    def fetch(self):
+        self._current = self._batches.pop(0)
+
+
+@pytest.fixture
+def mock_db():
+    return MagicMock()
+
+
+@pytest.fixture
+def follow_repo():
+    return MagicMock()
+
+
+@pytest.fixture
+def cleanup(mock_db, follow_repo):
+    return EdgeCleanup(db=mock_db, follow_repo=follow_repo, chunk_size=2, pause=0, degree_counts=True)
+
+
+def test_purge_removes_edges_in_chunks(cleanup, mock_db):
+    removed = {
+        "_from": [["b", "c"], ["d"]],
+        "_to": [["e", "f"], []],
+    }
+
+    def execute(query, bind_vars=None, **kwargs):
+        if "LIMIT @chunk" in query:
+            side = "_from" if "e._from == @userId" in query else "_to"
+            return iter(removed[side].pop(0))
+        return iter([])
+
+    mock_db.aql.execute.side_effect = execute
+
+    assert cleanup.purge("alice") == 5
+
+    calls = mock_db.aql.execute.call_args_list
+    bumps = [c for c in calls if "FOR name IN @names" in c.args[0]]
+    assert [c.kwargs["bind_vars"]["names"] for c in bumps] == [["b", "c"], ["d"], ["e", "f"]]
+    assert all(c.kwargs["bind_vars"]["delta"] == -1 for c in bumps)
+    assert all(c.kwargs["bind_vars"]["counts"] for c in bumps)
+    assert "followersVersion" in bumps[0].args[0] and "followingVersion" in bumps[2].args[0]
+    # Tombstones are written for the user's own follows only
+    chunk_queries = [c.args[0] for c in calls if "LIMIT @chunk" in c.args[0]]
+    assert "follow_tombstones" in chunk_queries[0]
+    assert "follow_tombstones" not in chunk_queries[-1]
+    assert "REMOVE b IN blocks" in calls[-2].args[0]
+    assert "u.deletedAt != null REMOVE u IN users" in calls[-1].args[0]
+    print("[TEST] Deleted user's edges are removed in bounded chunks.")
+
+
+def test_touch_neighbours_bumps_versions_without_counts(cleanup, mock_db, follow_repo):
+    cursors = [FakeStreamCursor([["b", "c"], ["d"]]), FakeStreamCursor([[]])]
+
+    def execute(query, bind_vars=None, **kwargs):
+        if "PARSE_IDENTIFIER" in query:
+            return cursors.pop(0)
+        return iter([])
+
+    mock_db.aql.execute.side_effect = execute
+
+    assert cleanup.touch_neighbours("alice") == 3
+
+    bumps = [c for c in mock_db.aql.execute.call_args_list if "FOR name IN @names" in c.args[0]]
+    assert [c.kwargs["bind_vars"]["names"] for c in bumps] == [["b", "c"], ["d"]]
+    assert not any(c.kwargs["bind_vars"]["counts"] for c in bumps)
+    written = [c.args[0] for c in follow_repo.tombstone_coll.insert_many.call_args_list]
+    assert [[t["followed"] for t in batch] for batch in written] == [["b", "c"], ["d"]]
+    assert all(t["follower"] == "alice" for batch in written for t in batch)
+    follow_repo.cache.delete.assert_any_call(
+        ["followers:b", "followers:c", "followers_uids:b", "followers_uids:c", "followers_count:b", "followers_count:c"]
+    )
+    print("[TEST] Deactivation bumps neighbours' list versions in batches.")
+
+
+def test_reactivation_writes_no_tombstones(cleanup, mock_db, follow_repo):
+    cursors = [FakeStreamCursor([["b"]]), FakeStreamCursor([[]])]
+
+    def execute(query, bind_vars=None, **kwargs):
+        if "PARSE_IDENTIFIER" in query:
+            return cursors.pop(0)
+        return iter([])
+
+    mock_db.aql.execute.side_effect = execute
+
+    assert cleanup.touch_neighbours("alice", hidden=False) == 1
+    follow_repo.tombstone_coll.insert_many.assert_not_called()
+
+
+def test_worker_processes_queue_and_survives_failures(cleanup, mock_db):
+    mock_db.aql.execute.side_effect = RuntimeError("boom")
+    cleanup.submit("alice", purge=True)
+    cleanup.start()
+    cleanup.stop()
+    cleanup._thread.join(timeout=2)
+
+    assert not cleanup._thread.is_alive()
+    print("[TEST] Cleanup worker logs failures and stops on request.")
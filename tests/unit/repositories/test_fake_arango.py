@@ -0,0 +1,215 @@
+from datetime import datetime as dt, UTC
+
+import pytest
+from arango.exceptions import DocumentInsertError
+
+from app.cache.backends import LocalLRUBackend
+from app.interning import UserIdInterner
+from app.repositories.block_repo import BLOCK, MUTE, BlockRepository
+from app.repositories.edge_cleanup import EdgeCleanup
+from app.repositories.follow_repo import FollowRepository
+from app.repositories.graph_traversal_repo import GraphTraversalRepository
+from app.repositories.user_repo import UserRepository
+from tests.fakes.arango import FakeArangoDBHelper, Latency, SimulatedClock
+
+
+@pytest.fixture
+def helper():
+    return FakeArangoDBHelper()
+
+
+@pytest.fixture
+def user_repo(helper):
+    return UserRepository(user_coll=helper.get_collection("users"), db=helper.db)
+
+
+@pytest.fixture
+def follow_repo(helper):
+    return FollowRepository(
+        user_coll=helper.get_collection("users"),
+        follow_coll=helper.get_collection("follows"),
+        db=helper.db,
+        tombstone_coll=helper.get_collection("follow_tombstones"),
+        block_coll=helper.get_collection("blocks"),
+        degree_counts=True,
+    )
+
+
+@pytest.fixture
+def graph_repo(helper):
+    return GraphTraversalRepository(db=helper.db)
+
+
+def _follow_all(user_repo, follow_repo, edges):
+    for name in sorted({u for edge in edges for u in edge}):
+        user_repo.create_user(name)
+    for follower, followed in edges:
+        follow_repo.create_follow(follower, followed)
+
+
+def _names(records):
+    return [r["followed"] for r in records]
+
+
+CHAIN = [("a", "b"), ("a", "c"), ("b", "d"), ("c", "d"), ("d", "e"), ("e", "a")]
+
+
+def test_follow_lists_counts_and_versions(user_repo, follow_repo):
+    _follow_all(user_repo, follow_repo, CHAIN)
+
+    assert _names(follow_repo.get_following("a")) == ["b", "c"]
+    assert _names(follow_repo.get_followers("d")) == ["b", "c"]
+    assert follow_repo.count_followers("d") == 2
+    assert follow_repo.count_following("a") == 2
+    assert follow_repo.get_list_version("d", "followers")[0] == 2
+
+    assert follow_repo.delete_follow("b", "d") is True
+    assert follow_repo.delete_follow("b", "d") is False
+    assert _names(follow_repo.get_followers("d")) == ["c"]
+    assert follow_repo.get_list_version("d", "followers")[0] == 3
+    assert user_repo.user_coll.get("d")["followerCount"] == 1
+    print("[TEST] Follow lists, counts and list versions behave like ArangoDB.")
+
+
+def test_followers_delta_sees_follows_and_tombstones(user_repo, follow_repo):
+    _follow_all(user_repo, follow_repo, [("a", "d"), ("b", "d"), ("c", "a")])
+    since = dt.now(tz=UTC)
+    follow_repo.create_follow("c", "d")
+    follow_repo.delete_follow("a", "d")
+
+    delta = follow_repo.get_followers_delta("d", since)
+
+    assert _names(delta["added"]) == ["c"]
+    assert _names(delta["removed"]) == ["a"]
+
+
+def test_bfs_and_dfs_follow_arango_traversal_semantics(user_repo, follow_repo, graph_repo):
+    _follow_all(user_repo, follow_repo, CHAIN)
+
+    # Global uniqueness: d is reached once, and the cycle back to a stops
+    assert _names(graph_repo.traverse_bfs("a", max_depth=3)) == ["b", "c", "d", "e"]
+    # Path uniqueness: d is reached through b and through c
+    assert _names(graph_repo.traverse_dfs("a", max_depth=3)) == ["b", "d", "e", "c", "d", "e"]
+    assert _names(graph_repo._traverse_bfs_top_k("a", max_depth=2, k=1)) == ["c", "d"]
+
+
+def test_multi_source_bfs_matches_single_source_bfs(user_repo, follow_repo, graph_repo):
+    _follow_all(user_repo, follow_repo, CHAIN)
+
+    multi = graph_repo.traverse_bfs_multi(["a", "d"], max_depth=2)
+
+    for source in ("a", "d"):
+        assert sorted(_names(multi[source])) == sorted(_names(graph_repo.traverse_bfs(source, max_depth=2)))
+
+
+def test_blocks_mutes_and_deactivation_hide_users(helper, user_repo, follow_repo, graph_repo):
+    _follow_all(user_repo, follow_repo, CHAIN)
+    blocks = BlockRepository(block_coll=helper.get_collection("blocks"), db=helper.db, follow_repo=follow_repo)
+
+    blocks.set_relation("a", "c", MUTE)
+    assert _names(follow_repo.get_following("a")) == ["b"]
+    assert _names(graph_repo.traverse_bfs("a", max_depth=3)) == ["b", "d", "e"]
+
+    blocks.set_relation("d", "b", BLOCK)
+    with pytest.raises(PermissionError):
+        follow_repo.create_follow("b", "d")
+    assert [r["username"] for r in blocks.list_relations("d")] == ["b"]
+
+    user_repo.set_active("e", False)
+    assert _names(graph_repo.traverse_bfs("a", max_depth=3)) == ["b"]
+    assert follow_repo.count_following("d") == 0
+    assert follow_repo.get_following("d") == []
+
+
+def test_edge_cleanup_purges_deleted_user(helper, user_repo, follow_repo):
+    _follow_all(user_repo, follow_repo, CHAIN)
+    cleanup = EdgeCleanup(db=helper.db, follow_repo=follow_repo, chunk_size=1, pause=0, degree_counts=True)
+
+    user_repo.set_active("d", False, deleted=True)
+    assert cleanup.purge("d") == 3
+
+    assert not user_repo.user_exists("d")
+    assert follow_repo.count_following("b") == 0
+    assert user_repo.user_coll.get("e")["followerCount"] == 0
+    assert [t["followed"] for t in helper.get_collection("follow_tombstones").docs.values()] == ["e"]
+
+
+def test_restored_user_survives_queued_purge(helper, user_repo, follow_repo):
+    _follow_all(user_repo, follow_repo, CHAIN)
+    listener_calls = []
+    follow_repo.add_change_listener(lambda *change: listener_calls.append(change))
+    cleanup = EdgeCleanup(db=helper.db, follow_repo=follow_repo, chunk_size=1, pause=0)
+
+    user_repo.set_active("d", False, deleted=True)
+    assert user_repo.create_user("d") is True
+    assert cleanup.purge("d") == 0
+
+    assert user_repo.user_coll.get("d")["active"] is True
+    assert "deletedAt" not in user_repo.user_coll.get("d")
+    assert _names(follow_repo.get_following("d")) == ["e"]
+    assert listener_calls == []
+
+    user_repo.set_active("d", False, deleted=True)
+    assert cleanup.purge("d") == 3
+    assert sorted(listener_calls) == [("b", "d", False), ("c", "d", False), ("d", "e", False)]
+
+
+def test_interned_follows_resolve_uids(helper, user_repo):
+    interner = UserIdInterner(db=helper.db, block_size=2)
+    users = UserRepository(user_coll=helper.get_collection("users"), interner=interner, db=helper.db)
+    follows = FollowRepository(
+        user_coll=helper.get_collection("users"),
+        follow_coll=helper.get_collection("follows"),
+        db=helper.db,
+        interner=interner,
+    )
+    _follow_all(users, follows, [("a", "b"), ("c", "b")])
+    interner._by_uid = type(interner._by_uid)(10)
+
+    assert _names(follows.get_followers("b")) == ["a", "c"]
+    assert all("fromUid" in e for e in helper.get_collection("follows").docs.values())
+
+
+def test_collection_errors_and_unknown_queries(helper):
+    users = helper.get_collection("users")
+    users.insert({"_key": "a"})
+    with pytest.raises(DocumentInsertError):
+        users.insert({"_key": "a"})
+    assert users.insert({"_key": "a", "x": 1}, overwrite=True, return_old=True)["old"]["_key"] == "a"
+    assert users.delete("missing", ignore_missing=True) is False
+    with pytest.raises(NotImplementedError):
+        helper.db.aql.execute("FOR x IN somewhere RETURN x")
+
+
+def test_latency_is_charged_per_round_trip_and_row():
+    clock = SimulatedClock()
+    helper = FakeArangoDBHelper(latency=Latency(request=0.001, row=0.0001, sleep=clock.sleep))
+    users = helper.get_collection("users")
+    users.insert_many([{"_key": f"u{i}"} for i in range(10)])
+
+    cursor = helper.db.aql.execute(
+        "FOR u IN users FILTER u._key IN @names AND u.uid != null RETURN [u._key, u.uid]",
+        bind_vars={"names": ["u1"]},
+    )
+
+    assert list(cursor) == []
+    assert helper.db.latency.requests == 2
+    assert clock.now == pytest.approx(0.002 + 0.0001 * 10)
+
+
+def test_versioned_list_cache_never_pairs_new_version_with_old_body(helper, user_repo):
+    follows = FollowRepository(
+        user_coll=helper.get_collection("users"),
+        follow_coll=helper.get_collection("follows"),
+        db=helper.db,
+        cache=LocalLRUBackend(),
+    )
+    _follow_all(user_repo, follows, [("alice", "bob")])
+    version = follows.get_list_version("bob", "followers")[0]
+    assert _names(follows.get_followers("bob", version=version)) == ["alice"]
+
+    user_repo.create_user("carol")
+    follows.create_follow("carol", "bob")
+    version = follows.get_list_version("bob", "followers")[0]
+
+    assert _names(follows.get_followers("bob", version=version)) == ["alice", "carol"]
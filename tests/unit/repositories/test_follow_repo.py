@@ -1,3 +1,4 @@
+from datetime import datetime, timedelta, UTC
 from unittest.mock import MagicMock
 
 import pytest
@@ -277,4 +278,298 @@ def test_count_following(follow_repo, mock_db):
 
     assert result == 7
     mock_db.aql.execute.assert_called_once()
-    print("[TEST] Successfully tested count_following.")
\ No newline at end of file
+    print("[TEST] Successfully tested count_following.")
+
+def test_follow_writes_notify_change_listeners(follow_repo, mock_user_collection, mock_follow_collection):
+    """Test that create/delete notify listeners, and a missing edge does not."""
+    changes = []
+    follow_repo.add_change_listener(lambda a, b, created: changes.append((a, b, created)))
+    mock_user_collection.has.return_value = True
+
+    follow_repo.create_follow("userA", "userB")
+    mock_follow_collection.has.return_value = True
+    follow_repo.delete_follow("userA", "userB")
+    mock_follow_collection.has.return_value = False
+    follow_repo.delete_follow("userA", "userC")
+
+    assert changes == [("userA", "userB", True), ("userA", "userB", False)]
+    print("[TEST] Follow writes notify change listeners.")
+
+
+
+def test_failing_listener_does_not_fail_the_follow(follow_repo, mock_user_collection, mock_db):
+    """Test that the version is bumped and later listeners still run when one raises."""
+    changes = []
+
+    def broken(*change):
+        raise RuntimeError("sketch store unavailable")
+
+    follow_repo.add_change_listener(broken)
+    follow_repo.add_change_listener(lambda *change: changes.append(change))
+    mock_user_collection.has.return_value = True
+
+    follow_repo.create_follow("userA", "userB")
+
+    mock_db.aql.execute.assert_called_once()
+    assert changes == [("userA", "userB", True)]
+    print("[TEST] Listener failures are logged, not raised.")
+
+@pytest.fixture
+def mock_read_db():
+    # Mocked read-only coordinator pool
+    return MagicMock()
+
+
+@pytest.fixture
+def routed_follow_repo(mock_user_collection, mock_follow_collection, mock_db, mock_read_db):
+    return FollowRepository(
+        user_coll=mock_user_collection,
+        follow_coll=mock_follow_collection,
+        db=mock_db,
+        read_db=mock_read_db,
+        allow_dirty_reads=True,
+    )
+
+
+def test_reads_are_routed_to_read_pool(routed_follow_repo, mock_db, mock_read_db):
+    """Test that list and count reads go to the read pool with dirty reads allowed."""
+    mock_read_db.aql.execute.side_effect = lambda *a, **k: iter([3])
+
+    routed_follow_repo.get_followers("userA")
+    routed_follow_repo.get_following("userA")
+    routed_follow_repo.count_followers("userA")
+    routed_follow_repo.count_following("userA")
+
+    assert mock_read_db.aql.execute.call_count == 4
+    assert all(c.kwargs["allow_dirty_read"] is True for c in mock_read_db.aql.execute.call_args_list)
+    mock_db.aql.execute.assert_not_called()
+    print("[TEST] Reads are served by the read pool.")
+
+
+def test_dirty_reads_are_not_cached(routed_follow_repo, mock_read_db):
+    """Test that answers from a possibly lagging follower never fill the cache."""
+    routed_follow_repo.cache = MagicMock()
+    routed_follow_repo.cache.get.return_value = None
+    mock_read_db.aql.execute.side_effect = lambda *a, **k: iter([3])
+
+    routed_follow_repo.get_followers("userA")
+    routed_follow_repo.count_followers("userA")
+
+    routed_follow_repo.cache.set.assert_not_called()
+    print("[TEST] Dirty reads are served but not cached.")
+
+
+def test_read_your_writes_stays_on_leader(routed_follow_repo, mock_db, mock_read_db):
+    """Test that read-your-writes reads bypass the read pool."""
+    mock_db.aql.execute.return_value = iter([])
+
+    routed_follow_repo.get_followers("userA", read_your_writes=True)
+
+    mock_db.aql.execute.assert_called_once()
+    assert "allow_dirty_read" not in mock_db.aql.execute.call_args.kwargs
+    mock_read_db.aql.execute.assert_not_called()
+
+
+def test_writes_stay_on_leader(routed_follow_repo, mock_user_collection, mock_follow_collection, mock_read_db):
+    """Test that follow writes never touch the read pool."""
+    mock_user_collection.has.return_value = True
+    mock_follow_collection.has.return_value = True
+
+    routed_follow_repo.create_follow("userA", "userB")
+    routed_follow_repo.delete_follow("userA", "userB")
+
+    mock_follow_collection.insert.assert_called_once()
+    mock_follow_collection.delete.assert_called_once()
+    mock_read_db.aql.execute.assert_not_called()
+
+
+# ---------- Time-windowed reads ----------
+
+@pytest.fixture
+def mock_tombstone_collection():
+    return MagicMock()
+
+
+@pytest.fixture
+def delta_follow_repo(mock_user_collection, mock_follow_collection, mock_db, mock_tombstone_collection):
+    return FollowRepository(
+        user_coll=mock_user_collection,
+        follow_coll=mock_follow_collection,
+        db=mock_db,
+        tombstone_coll=mock_tombstone_collection,
+        delta_grace=0,
+        tombstone_ttl=3600,
+    )
+
+
+def test_get_followers_since_uses_index_range(follow_repo, mock_db):
+    """Test that a since filter scans [_to, followedAt] and skips the cache path."""
+    mock_db.aql.execute.return_value = iter([["userB", "2025-01-02T00:00:00+00:00"]])
+
+    result = follow_repo.get_followers("userA", since=datetime(2025, 1, 1))
+
+    assert result == [{"followed": "userB", "followedAt": "2025-01-02T00:00:00+00:00"}]
+    query = mock_db.aql.execute.call_args.args[0]
+    bind_vars = mock_db.aql.execute.call_args.kwargs["bind_vars"]
+    assert "e._to == @userDoc AND e.followedAt > @since" in query
+    assert bind_vars["since"] == "2025-01-01T00:00:00+00:00"
+    print("[TEST] since filter maps naive timestamps to UTC and filters on followedAt.")
+
+
+def test_delete_follow_writes_tombstone(delta_follow_repo, mock_follow_collection, mock_tombstone_collection):
+    """Test that an unfollow leaves a tombstone for delta pollers."""
+    mock_follow_collection.has.return_value = True
+
+    delta_follow_repo.delete_follow("userA", "userB")
+
+    tombstone = mock_tombstone_collection.insert.call_args.args[0]
+    assert tombstone["follower"] == "userA"
+    assert tombstone["followed"] == "userB"
+    assert "removedAt" in tombstone
+    print("[TEST] Unfollow wrote a tombstone.")
+
+
+def test_followers_delta_nets_out_refollows(delta_follow_repo, mock_db):
+    """Test that the delta keeps only the latest change per follower."""
+    since = datetime.now(tz=UTC) - timedelta(minutes=5)
+    t1 = (since + timedelta(minutes=1)).isoformat()
+    t2 = (since + timedelta(minutes=2)).isoformat()
+    mock_db.aql.execute.side_effect = [
+        iter([["userB", t2], ["userC", t1]]),
+        iter([{"followed": "userB", "removedAt": t1}, {"followed": "userC", "removedAt": t2}]),
+    ]
+
+    delta = delta_follow_repo.get_followers_delta("userA", since)
+
+    assert delta["added"] == [{"followed": "userB", "followedAt": t2}]
+    assert delta["removed"] == [{"followed": "userC", "removedAt": t2}]
+    assert delta["watermark"] > since.isoformat()
+    assert delta["complete"] is True
+    print("[TEST] Re-follow and unfollow within one window net out.")
+
+
+def test_followers_delta_incomplete_past_tombstone_retention(delta_follow_repo, mock_db):
+    """Test that windows older than tombstone retention ask for a full resync."""
+    mock_db.aql.execute.side_effect = [iter([]), iter([])]
+
+    delta = delta_follow_repo.get_followers_delta("userA", datetime.now(tz=UTC) - timedelta(days=1))
+
+    assert delta["complete"] is False
+    print("[TEST] Stale watermark flagged as incomplete.")
+
+
+# ---------- Streaming reads ----------
+
+def test_iter_followers_streams_with_batch_size(follow_repo, mock_db):
+    """Test that iter_followers runs a streaming query and yields its rows."""
+    cursor = MagicMock()
+    cursor.batch.return_value = [{"followed": "userB", "followedAt": "t"}]
+    cursor.has_more.return_value = False
+    mock_db.aql.execute.return_value = cursor
+
+    rows = follow_repo.iter_followers("userA", batch_size=50)
+
+    assert next(rows) == {"followed": "userB", "followedAt": "t"}
+    kwargs = mock_db.aql.execute.call_args.kwargs
+    assert kwargs["stream"] is True
+    assert kwargs["batch_size"] == 50
+    assert "INBOUND" in mock_db.aql.execute.call_args.args[0]
+    print("[TEST] iter_followers streams the cursor with the requested batch size.")
+
+
+# ---------- Degree counts ----------
+
+def test_degree_counts_track_new_edges_only(mock_user_collection, mock_follow_collection, mock_db):
+    """Test that counts move on new edges and unfollows, not on re-follows."""
+    repo = FollowRepository(
+        user_coll=mock_user_collection, follow_coll=mock_follow_collection, db=mock_db, degree_counts=True
+    )
+    mock_user_collection.has.return_value = True
+    mock_follow_collection.insert.side_effect = [{"_key": "a__b"}, {"_key": "a__b", "old": {}}]
+    mock_follow_collection.has.return_value = True
+
+    repo.create_follow("userA", "userB")
+    repo.create_follow("userA", "userB")
+    repo.delete_follow("userA", "userB")
+
+    bind_vars = [c.kwargs["bind_vars"] for c in mock_db.aql.execute.call_args_list]
+    assert [b["delta"] for b in bind_vars] == [1, 0, -1]
+    assert all(b["counts"] for b in bind_vars)
+    print("[TEST] Degree counts follow edge creation and removal.")
+
+
+# ---------- List versions ----------
+
+def test_follow_writes_bump_list_versions(follow_repo, mock_user_collection, mock_follow_collection, mock_db):
+    """Test that every write bumps both users' list versions, without counts by default."""
+    mock_user_collection.has.return_value = True
+
+    edge = follow_repo.create_follow("userA", "userB")
+
+    query = mock_db.aql.execute.call_args.args[0]
+    bind_vars = mock_db.aql.execute.call_args.kwargs["bind_vars"]
+    assert "followingVersion" in query and "followersVersion" in query
+    assert bind_vars["changedAt"] == edge["followedAt"]
+    assert bind_vars["counts"] is False
+    print("[TEST] Follow bumps follower's following and followed's followers versions.")
+
+
+def test_get_list_version(follow_repo, mock_db):
+    """Test that the version lookup reads only the user document."""
+    mock_db.aql.execute.return_value = iter([[3, "2025-01-01T00:00:00+00:00"]])
+
+    version = follow_repo.get_list_version("userA", "followers")
+
+    assert version == (3, "2025-01-01T00:00:00+00:00")
+    assert "DOCUMENT(@userDoc)" in mock_db.aql.execute.call_args.args[0]
+    with pytest.raises(ValueError):
+        follow_repo.get_list_version("userA", "blocks")
+    print("[TEST] List version comes from one document read.")
+
+
+def test_create_follow_rejected_when_either_side_blocked(mock_user_collection, mock_follow_collection, mock_db):
+    """Test that a block in either direction prevents a new follow."""
+    block_coll = MagicMock()
+    repo = FollowRepository(
+        user_coll=mock_user_collection, follow_coll=mock_follow_collection, db=mock_db, block_coll=block_coll
+    )
+    mock_user_collection.has.return_value = True
+    block_coll.get_many.return_value = [{"_key": "bob__alice", "kind": "block"}]
+
+    with pytest.raises(PermissionError):
+        repo.create_follow("alice", "bob")
+
+    block_coll.get_many.assert_called_once_with(["alice__bob", "bob__alice"])
+    mock_follow_collection.insert.assert_not_called()
+
+    block_coll.get_many.return_value = [{"_key": "alice__bob", "kind": "mute"}]
+    repo.create_follow("alice", "bob")
+    mock_follow_collection.insert.assert_called_once()
+    print("[TEST] Blocks stop follows; mutes do not.")
+
+
+def test_list_queries_filter_hidden_users_in_aql(follow_repo, mock_db):
+    """Test that follower/following queries drop blocked or muted users server-side."""
+    mock_db.aql.execute.return_value = iter([])
+    follow_repo.get_followers("alice")
+    query = mock_db.aql.execute.call_args.args[0]
+
+    assert "FOR b IN blocks FILTER b._from == @userDoc" in query
+    assert "FILTER !HAS(hidden, v._id)" in query
+    assert "v.active != false" in query
+
+
+def test_visibility_change_bumps_versions_and_notifies(follow_repo, mock_db):
+    """Test that a block/mute invalidates the owner's lists and traversals."""
+    follow_repo.cache = MagicMock()
+    listener = MagicMock()
+    follow_repo.add_visibility_listener(listener)
+
+    follow_repo.record_visibility_change("alice", "bob")
+
+    query = mock_db.aql.execute.call_args.args[0]
+    assert "followersVersion" in query and "followingVersion" in query
+    follow_repo.cache.delete.assert_called_once_with(
+        ["followers:alice", "followers_uids:alice", "following:alice", "following_uids:alice"], tags=["vertex:alice"]
+    )
+    listener.assert_called_once_with("alice", "bob", False)
@@ -140,3 +140,234 @@ def test_validate_input_raises_on_non_string_username():
 def test_validate_input_raises_on_non_int_max_depth():
     with pytest.raises(TypeError, match="max_depth must be an integer"):
         GraphTraversalRepository._validate_input("user", "not_an_int")
+
+
+def test_traverse_bfs_uses_cache(mock_db):
+    from app.cache.traversal_cache import TraversalCache
+
+    cache = TraversalCache()
+    repo = GraphTraversalRepository(db=mock_db, cache=cache)
+    mock_db.aql.execute.return_value = iter([{"followed": "user1", "followedAt": None}])
+
+    first = repo.traverse_bfs("testuser", max_depth=2)
+    second = repo.traverse_bfs("testuser", max_depth=2)
+
+    assert first == second
+    mock_db.aql.execute.assert_called_once()
+
+    cache.on_follow_change("user1", "user9")
+    mock_db.aql.execute.return_value = iter([])
+    assert repo.traverse_bfs("testuser", max_depth=2) == []
+    assert mock_db.aql.execute.call_count == 2
+    print("[TEST] traverse_bfs serves repeats from cache until a relevant write.")
+
+
+def test_traversals_go_through_named_graph(mock_db):
+    repo = GraphTraversalRepository(db=mock_db, graph_name="social")
+    mock_db.aql.execute.return_value = iter([])
+
+    repo.traverse_bfs("testuser", max_depth=2)
+
+    query = mock_db.aql.execute.call_args[0][0]
+    assert "GRAPH @graphName" in query
+    assert mock_db.aql.execute.call_args.kwargs["bind_vars"]["graphName"] == "social"
+
+
+def test_traversals_use_read_pool_unless_read_your_writes(mock_db):
+    read_db = MagicMock()
+    read_db.aql.execute.return_value = iter([])
+    mock_db.aql.execute.return_value = iter([])
+    repo = GraphTraversalRepository(db=mock_db, read_db=read_db)
+
+    repo.traverse_bfs("testuser", max_depth=2)
+    repo.traverse_dfs("testuser", max_depth=2, read_your_writes=True)
+
+    read_db.aql.execute.assert_called_once()
+    assert read_db.aql.execute.call_args.kwargs["allow_dirty_read"] is False
+    mock_db.aql.execute.assert_called_once()
+    print("[TEST] Traversals are routed to the read pool unless read-your-writes is requested.")
+
+
+def test_dirty_read_traversals_are_not_cached(mock_db):
+    read_db = MagicMock()
+    read_db.aql.execute.side_effect = lambda *a, **k: iter([])
+    cache, shared_cache = MagicMock(), MagicMock()
+    cache.get.return_value = (None, False)
+    shared_cache.get.return_value = None
+    repo = GraphTraversalRepository(
+        db=mock_db, read_db=read_db, allow_dirty_reads=True, cache=cache, shared_cache=shared_cache
+    )
+
+    repo.traverse_bfs("testuser", max_depth=2)
+
+    cache.put.assert_not_called()
+    shared_cache.set.assert_not_called()
+    print("[TEST] Traversals read from a lagging follower never fill a cache.")
+
+
+def test_iter_bfs_streams_and_skips_cache():
+    db = MagicMock()
+    cache = MagicMock()
+    cursor = MagicMock()
+    cursor.batch.return_value = [{"followed": "b", "followedAt": "t"}]
+    cursor.has_more.return_value = False
+    db.aql.execute.return_value = cursor
+    repo = GraphTraversalRepository(db=db, cache=cache, batch_size=25)
+
+    assert list(repo.iter_bfs("a", 2)) == [{"followed": "b", "followedAt": "t"}]
+    assert db.aql.execute.call_args.kwargs["stream"] is True
+    assert db.aql.execute.call_args.kwargs["batch_size"] == 25
+    cache.get.assert_not_called()
+    print("[TEST] iter_bfs streams from the database without touching the cache.")
+
+
+def test_planner_picks_top_k_for_supernode_neighbourhood():
+    from app.traversal_planner import TraversalPlanner
+
+    db = MagicMock()
+    planner = TraversalPlanner(prune_threshold=100, top_k_threshold=1000, top_k=2)
+    repo = GraphTraversalRepository(db=db, planner=planner)
+    db.aql.execute.side_effect = [
+        iter([{"degree": 2, "sample": [5000, 10], "hasCounts": False}]),
+        iter([["users/b", "b", "t1"], ["users/c", "c", "t2"]]),
+        iter([["users/a", "a", "t3"], ["users/d", "d", "t4"], ["users/d", "d", "t5"]]),
+    ]
+
+    results, plan = repo.traverse_bfs_planned("a", max_depth=2)
+
+    assert plan.strategy == "top_k"
+    assert [r["followed"] for r in results] == ["b", "c", "d"]
+    level_query = db.aql.execute.call_args_list[1]
+    assert level_query.kwargs["bind_vars"] == {"frontier": ["users/a"], "k": 2, "userKey": "users/a"}
+    assert "SORT e.followedAt DESC" in level_query.args[0]
+    print("[TEST] Supernode-heavy start runs a top-k BFS with global uniqueness.")
+
+
+def test_planner_prunes_on_materialised_degree():
+    from app.traversal_planner import TraversalPlanner
+
+    db = MagicMock()
+    planner = TraversalPlanner(max_fanout=50, prune_threshold=100, top_k_threshold=10_000)
+    repo = GraphTraversalRepository(db=db, planner=planner)
+    db.aql.execute.side_effect = [
+        iter([{"degree": 2, "sample": [200, 10], "hasCounts": True}]),
+        iter([{"followed": "b", "followedAt": "t"}]),
+    ]
+
+    results, plan = repo.traverse_bfs_planned("a", max_depth=2)
+
+    assert plan.strategy == "pruned"
+    query = db.aql.execute.call_args.args[0]
+    assert "PRUNE v.followingCount > @maxFanout" in query
+    assert db.aql.execute.call_args.kwargs["bind_vars"]["maxFanout"] == 50
+    assert results == [{"followed": "b", "followedAt": "t"}]
+    print("[TEST] Mid-size frontier prunes supernodes via PRUNE.")
+
+
+def test_cached_bfs_skips_planning():
+    from app.cache.traversal_cache import TraversalCache
+    from app.traversal_planner import TraversalPlanner
+
+    db = MagicMock()
+    repo = GraphTraversalRepository(db=db, planner=TraversalPlanner(), cache=TraversalCache())
+    db.aql.execute.side_effect = [
+        iter([{"degree": 1, "sample": [1], "hasCounts": False}]),
+        iter([{"followed": "b", "followedAt": "t"}]),
+    ]
+
+    first, _ = repo.traverse_bfs_planned("a", max_depth=2)
+    second, plan = repo.traverse_bfs_planned("a", max_depth=2)
+
+    assert first == second
+    assert plan.strategy == "full"
+    assert db.aql.execute.call_count == 2
+    print("[TEST] A BFS served from cache reuses the remembered plan.")
+
+
+def test_estimate_reach_merges_sketches_of_inner_levels():
+    from app.sketches.hyperloglog import HyperLogLog
+
+    sketches = MagicMock()
+    sketches.precision = 12
+    payloads = {}
+    for name, start in (("b", 0), ("c", 1500)):
+        sketch = HyperLogLog(12)
+        sketch.update(f"user{i}" for i in range(start, start + 3000))
+        payloads[name] = sketch.to_bytes()
+    sketches.payloads.return_value = payloads
+    repo = GraphTraversalRepository(db=MagicMock(), reach_sketches=sketches, reach_exact_threshold=100)
+    repo.traverse_bfs = MagicMock(return_value=[{"followed": "b"}, {"followed": "c"}])
+
+    result = repo.estimate_reach("a", max_depth=2)
+
+    assert result["exact"] is False
+    assert abs(result["reach"] - 4502) <= 3 * result["relative_error"] * 4502
+    repo.traverse_bfs.assert_called_once_with("a", 1)
+    sketches.payloads.assert_called_once_with(["b", "c"])
+    print("[TEST] Depth-2 reach comes from depth-1 BFS plus merged sketches.")
+
+
+def test_estimate_reach_falls_back_to_exact_for_small_results():
+    sketches = MagicMock()
+    sketches.precision = 12
+    sketches.payloads.return_value = {}
+    repo = GraphTraversalRepository(db=MagicMock(), reach_sketches=sketches, reach_exact_threshold=100)
+    repo.traverse_bfs = MagicMock(side_effect=[[{"followed": "b"}], [{"followed": "b"}, {"followed": "c"}]])
+
+    result = repo.estimate_reach("a", max_depth=2)
+
+    assert result == {"reach": 2, "exact": True, "relative_error": 0.0}
+    print("[TEST] Small neighbourhoods are counted exactly.")
+
+
+def test_traverse_bfs_multi_groups_rows_by_source(graph_repo, mock_db):
+    mock_db.aql.execute.return_value = iter([
+        ["alice", "bob", "2025-01-01T00:00:00+00:00"],
+        ["carol", "bob", None],
+        ["alice", "dave", None],
+    ])
+
+    results = graph_repo.traverse_bfs_multi(["alice", "carol", "alice", "erin"], max_depth=2)
+
+    assert results == {
+        "alice": [
+            {"followed": "bob", "followedAt": "2025-01-01T00:00:00+00:00"},
+            {"followed": "dave", "followedAt": None},
+        ],
+        "carol": [{"followed": "bob", "followedAt": None}],
+        "erin": [],
+    }
+    query = mock_db.aql.execute.call_args.args[0]
+    assert mock_db.aql.execute.call_count == 1
+    assert "frontier2" in query and "frontier3" not in query
+    assert mock_db.aql.execute.call_args.kwargs["bind_vars"] == {"sources": ["alice", "carol", "erin"]}
+    print("[TEST] Multi-source BFS is one query, split per start user.")
+
+
+def test_traverse_bfs_multi_validates_every_username(graph_repo, mock_db):
+    with pytest.raises(ValueError):
+        graph_repo.traverse_bfs_multi(["alice", "bad/name"], max_depth=2)
+    mock_db.aql.execute.assert_not_called()
+
+
+def test_traversals_prune_and_filter_hidden_vertices(graph_repo, mock_db):
+    mock_db.aql.execute.return_value = iter([])
+
+    graph_repo.traverse_bfs("testuser", max_depth=2)
+
+    query = mock_db.aql.execute.call_args.args[0]
+    assert "FOR b IN blocks FILTER b._from == @userKey" in query
+    assert "PRUNE HAS(hidden, e._to)" in query
+    assert "FILTER !HAS(hidden, e._to)" in query
+    assert "v.active == false" in query and "v.active != false" in query
+    print("[TEST] Blocked, muted and deactivated users are excluded inside the traversal query.")
+
+
+def test_snapshot_results_drop_hidden_users(mock_db):
+    repo = GraphTraversalRepository(db=mock_db)
+    repo.snapshot_store = MagicMock()
+    repo.snapshot_store.snapshot.followers.return_value = [{"followed": "bob"}, {"followed": "carol"}]
+    mock_db.aql.execute.return_value = iter([["bob"]])
+
+    assert repo.get_followers("alice") == [{"followed": "carol"}]
+    assert mock_db.aql.execute.call_args.kwargs["bind_vars"]["names"] == ["bob", "carol"]
@@ -78,3 +78,76 @@ def test_user_exists_called_with_correct_argument(user_repo, mock_collection):
 
     mock_collection.has.assert_called_once_with(username)
     print(f"[TEST] user_exists('{username}') called .has() correctly.")
+
+
+def test_get_influence_reads_pagerank_fields(user_repo, mock_collection):
+    """Test that stored PageRank fields are mapped to the API shape."""
+    mock_collection.get.return_value = {
+        "_key": "alice", "pagerank": 0.25, "influence": 1.0, "influenceRank": 3,
+        "pagerankComputedAt": "2025-01-01T00:00:00+00:00",
+    }
+
+    result = user_repo.get_influence("alice")
+
+    assert result == {
+        "username": "alice", "pagerank": 0.25, "influence": 1.0, "rank": 3,
+        "computed_at": "2025-01-01T00:00:00+00:00",
+    }
+
+
+def test_get_influence_unscored_and_missing_users(user_repo, mock_collection):
+    """Test that unscored users return None and unknown users raise."""
+    mock_collection.get.return_value = {"_key": "alice"}
+    assert user_repo.get_influence("alice") is None
+
+    mock_collection.get.return_value = None
+    with pytest.raises(ValueError):
+        user_repo.get_influence("alice")
+
+
+def test_set_active_records_deactivation_and_deletion(user_repo, mock_collection):
+    """Test that (de)activation updates the flag and the matching timestamp."""
+    mock_collection.has.return_value = True
+
+    assert user_repo.set_active("alice", False) is True
+    changes = mock_collection.update.call_args.args[0]
+    assert changes["active"] is False and "deactivatedAt" in changes
+
+    user_repo.set_active("alice", False, deleted=True)
+    changes = mock_collection.update.call_args.args[0]
+    assert "deletedAt" in changes and "deactivatedAt" not in changes
+
+    user_repo.set_active("alice", True)
+    assert mock_collection.update.call_args.args[0] == {
+        "_key": "alice", "active": True, "deletedAt": None, "deactivatedAt": None,
+    }
+    assert mock_collection.update.call_args.kwargs["keep_none"] is False
+
+
+def test_create_user_restores_deleted_user(user_repo, mock_collection):
+    """Test that re-creating a deleted user reactivates it instead of skipping."""
+    mock_collection.has.return_value = True
+    mock_collection.get.return_value = {"_key": "alice", "active": False, "deletedAt": "t"}
+
+    assert user_repo.create_user("alice") is True
+
+    mock_collection.insert.assert_not_called()
+    assert mock_collection.update.call_args.args[0]["active"] is True
+
+
+def test_create_user_keeps_deactivated_user_deactivated(user_repo, mock_collection):
+    """Test that a redelivered create does not undo a deactivation."""
+    mock_collection.has.return_value = True
+    mock_collection.get.return_value = {"_key": "alice", "active": False, "deactivatedAt": "t"}
+
+    assert user_repo.create_user("alice") is False
+
+    mock_collection.update.assert_not_called()
+
+
+def test_set_active_unknown_user(user_repo, mock_collection):
+    """Test that unknown users are left alone."""
+    mock_collection.has.return_value = False
+
+    assert user_repo.set_active("ghost", False) is False
+    mock_collection.update.assert_not_called()
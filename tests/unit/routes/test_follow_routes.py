@@ -0,0 +1,115 @@
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.binary_encoding import COLUMNAR, decode_columnar
+from app.main import app
+from app.repositories.user_repo import UserNotFoundError
+from app.routes import follow_routes
+
+
+@pytest.fixture
+def repo(monkeypatch):
+    repo = MagicMock()
+    repo.get_list_version.return_value = (4, "2025-01-01T00:00:00+00:00")
+    repo.get_followers.return_value = [{"followed": "bob", "followedAt": "2025-01-01T00:00:00+00:00"}]
+    monkeypatch.setattr(follow_routes, "follow_repo", repo)
+    monkeypatch.setattr(follow_routes.graph_traversal_repo, "snapshot_store", None)
+    return repo
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def test_followers_response_carries_validators(client, repo):
+    response = client.get("/follow/followers/alice")
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"followers-alice-4"'
+    assert response.headers["Last-Modified"] == "Wed, 01 Jan 2025 00:00:00 GMT"
+    print("[TEST] Follower list is served with ETag and Last-Modified.")
+
+
+def test_matching_etag_returns_304_without_querying_the_list(client, repo):
+    response = client.get("/follow/followers/alice", headers={"If-None-Match": '"followers-alice-4"'})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    repo.get_followers.assert_not_called()
+    print("[TEST] Unchanged list costs one version lookup.")
+
+
+def test_stale_etag_gets_the_new_list(client, repo):
+    response = client.get("/follow/followers/alice", headers={"If-None-Match": '"followers-alice-3"'})
+
+    assert response.status_code == 200
+    assert response.json() == [{"followed": "bob", "followed_at": "2025-01-01T00:00:00+00:00"}]
+    print("[TEST] A bumped version invalidates the client's copy.")
+
+
+def test_columnar_accept_gets_binary_list_with_own_etag(client, repo):
+    response = client.get("/follow/followers/alice", headers={"Accept": COLUMNAR})
+
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == COLUMNAR
+    assert response.headers["ETag"] == '"followers-alice-4-col"'
+    assert decode_columnar(response.content) == repo.get_followers.return_value
+    print("[TEST] Columnar clients get a binary body validated separately from JSON.")
+
+
+def test_cached_list_is_looked_up_by_the_etag_version(client, repo):
+    client.get("/follow/followers/alice")
+
+    assert repo.get_followers.call_args.kwargs["version"] == 4
+    print("[TEST] The body comes from the cache entry of the version in the ETag.")
+
+
+def test_snapshot_lists_carry_no_validators(client, repo, monkeypatch):
+    snapshot_repo = MagicMock()
+    snapshot_repo.get_followers.return_value = []
+    monkeypatch.setattr(follow_routes, "graph_traversal_repo", snapshot_repo)
+
+    response = client.get("/follow/followers/alice", headers={"If-None-Match": '"followers-alice-4"'})
+
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+    repo.get_list_version.assert_not_called()
+    print("[TEST] Snapshot bodies are not validated against the live version.")
+
+
+def test_follow_of_missing_user_is_404(client, repo):
+    repo.create_follow.side_effect = UserNotFoundError("User not found")
+
+    response = client.post("/follow/", json={"follower": "alice", "followed": "ghost"})
+
+    assert response.status_code == 404
+    print("[TEST] Following a missing user is a 404.")
+
+
+def test_follow_with_invalid_username_is_400(client, repo):
+    repo.create_follow.side_effect = ValueError("Username contains invalid characters")
+
+    response = client.post("/follow/", json={"follower": "alice", "followed": "b d"})
+
+    assert response.status_code == 400
+    print("[TEST] A malformed username is a 400, not a 404.")
+
+
+@pytest.mark.parametrize("path", [
+    "/follow/following/b%20d?limit=10",
+    "/follow/following/b%20d",
+    "/follow/followers/b%20d",
+    "/follow/followers/b%20d?since=2025-01-01T00:00:00Z",
+    "/follow/followers/b%20d/delta?since=2025-01-01T00:00:00Z",
+    "/follow/followers/用户",
+    "/follow/following/用户",
+])
+def test_list_paths_reject_invalid_usernames(client, repo, path):
+    response = client.get(path)
+
+    assert response.status_code == 400
+    repo.get_list_version.assert_not_called()
+    print("[TEST] Every list path validates the username before reading.")
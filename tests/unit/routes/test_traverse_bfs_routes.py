@@ -0,0 +1,61 @@
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routes import traverse_bfs_routes
+from app.traversal_executor import ClientDisconnected
+
+
+@pytest.fixture
+def repo(monkeypatch):
+    repo = MagicMock()
+    repo.traverse_bfs_multi.return_value = {
+        "alice": [{"followed": "bob", "followedAt": "2025-01-01T00:00:00+00:00"}],
+        "carol": [],
+    }
+    monkeypatch.setattr(traverse_bfs_routes, "graph_traversal_repo", repo)
+    return repo
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def test_batch_bfs_returns_results_per_source(client, repo):
+    response = client.post("/follow/traverse/bfs/batch?depth=2", json={"usernames": ["alice", "carol"]})
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "depth": 2,
+        "results": {
+            "alice": [{"followed": "bob", "followed_at": "2025-01-01T00:00:00+00:00"}],
+            "carol": [],
+        },
+    }
+    repo.traverse_bfs_multi.assert_called_once_with(["alice", "carol"], 2, False)
+    print("[TEST] Batch BFS answers every start user from one repository call.")
+
+
+def test_batch_bfs_rejects_empty_and_oversized_batches(client, repo, monkeypatch):
+    monkeypatch.setattr(traverse_bfs_routes.settings, "traversal_batch_max_sources", 2)
+
+    assert client.post("/follow/traverse/bfs/batch", json={"usernames": []}).status_code == 400
+    assert client.post("/follow/traverse/bfs/batch", json={"usernames": ["a", "b", "c"]}).status_code == 400
+    repo.traverse_bfs_multi.assert_not_called()
+
+
+def test_bfs_answers_disconnected_client_with_499(client, monkeypatch):
+    async def disconnected(awaitable, request):
+        awaitable.close()
+        raise ClientDisconnected("Client closed request")
+
+    monkeypatch.setattr(traverse_bfs_routes, "traversal_executor", MagicMock())
+    monkeypatch.setattr(traverse_bfs_routes, "cancel_on_disconnect", disconnected)
+
+    response = client.get("/follow/traverse/bfs/alice?depth=2")
+
+    assert response.status_code == 499
+    print("[TEST] A client disconnect ends the BFS route with a 499 instead of a cancellation.")
@@ -0,0 +1,31 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("method, path, body", [
+    ("DELETE", "/follow/", {"follower": " ", "followed": "bob"}),
+    ("GET", "/follow/traverse/bfs/%20", None),
+    ("GET", "/follow/traverse/dfs/%20", None),
+    ("GET", "/follow/blocks/%20", None),
+    ("GET", "/follow/reach/%20", None),
+    ("GET", "/follow/influence/%20", None),
+])
+def test_blank_usernames_are_400(client, method, path, body):
+    response = client.request(method, path, json=body)
+
+    assert response.status_code == 400
+    print(f"[TEST] {method} {path} rejects a blank username with 400.")
+
+
+def test_influence_of_missing_user_is_404(client):
+    response = client.get("/follow/influence/ghost")
+
+    assert response.status_code == 404
+    print("[TEST] Influence of an unknown user is a 404.")
@@ -0,0 +1,62 @@
+import pytest
+
+from app.sketches.hyperloglog import HyperLogLog
+
+
+def make_sketch(items, precision=12):
+    sketch = HyperLogLog(precision)
+    sketch.update(items)
+    return sketch
+
+
+@pytest.mark.parametrize("n", [10, 1_000, 50_000])
+def test_count_within_error_bound(n):
+    sketch = make_sketch(f"user{i}" for i in range(n))
+
+    # Three standard errors keeps the test deterministic-enough for any hash
+    assert abs(sketch.count() - n) <= max(1, 3 * sketch.relative_error * n)
+    print(f"[TEST] Estimate for {n} distinct users is within the error bound.")
+
+
+def test_merge_counts_union():
+    a = make_sketch(f"user{i}" for i in range(0, 3000))
+    b = make_sketch(f"user{i}" for i in range(2000, 5000))
+
+    a.merge(b)
+
+    assert abs(a.count() - 5000) <= 3 * a.relative_error * 5000
+    print("[TEST] Merged sketch estimates the union, not the sum.")
+
+
+def test_serialization_is_sparse_for_small_sets():
+    small = make_sketch(["alice", "bob", "carol"])
+    large = make_sketch(f"user{i}" for i in range(20_000))
+
+    small_bytes = small.to_bytes()
+    assert small_bytes[:1] == b"s"
+    assert len(small_bytes) == 2 + 3 * 3
+    assert large.to_bytes()[:1] == b"d"
+    assert HyperLogLog.from_bytes(small_bytes).registers == small.registers
+    assert HyperLogLog.from_bytes(large.to_bytes()).registers == large.registers
+    print("[TEST] Small sketches serialize as sparse triples and round-trip.")
+
+
+def test_merge_bytes_matches_merge():
+    a = make_sketch(["alice", "bob"])
+    b = make_sketch(f"user{i}" for i in range(100))
+    merged = make_sketch(["alice", "bob"])
+
+    a.merge(b)
+    merged.merge_bytes(b.to_bytes())
+
+    assert merged.registers == a.registers
+    print("[TEST] Merging serialized sketches equals merging decoded ones.")
+
+
+def test_precision_for_error():
+    assert HyperLogLog.precision_for_error(0.02) == 12
+    assert HyperLogLog.precision_for_error(0.5) == 4
+    assert HyperLogLog.precision_for_error(0.0001) == 16
+    with pytest.raises(ValueError):
+        HyperLogLog(precision=12).merge(HyperLogLog(precision=10))
+    print("[TEST] Error bound maps to a clamped precision.")
@@ -0,0 +1,63 @@
+import base64
+from unittest.mock import MagicMock
+
+import pytest
+from arango.exceptions import DocumentRevisionError
+
+from app.sketches.hyperloglog import HyperLogLog
+from app.sketches.reach_store import ReachSketchStore
+
+
+@pytest.fixture
+def mock_db():
+    return MagicMock()
+
+
+@pytest.fixture
+def store(mock_db):
+    return ReachSketchStore(db=mock_db, precision=10)
+
+
+def encoded(items, precision=10):
+    sketch = HyperLogLog(precision)
+    sketch.update(items)
+    return base64.b64encode(sketch.to_bytes()).decode()
+
+
+def test_payloads_builds_missing_sketches(store, mock_db):
+    mock_db.aql.execute.side_effect = [
+        iter([["alice", encoded(["bob"])]]),
+        iter([["carol", ["alice", "bob"]]]),
+    ]
+
+    payloads = store.payloads(["alice", "carol"])
+
+    assert round(HyperLogLog.from_bytes(payloads["alice"]).count()) == 1
+    assert round(HyperLogLog.from_bytes(payloads["carol"]).count()) == 2
+    saved = store.collection.import_bulk.call_args
+    assert [d["_key"] for d in saved.args[0]] == ["carol"]
+    assert saved.kwargs["on_duplicate"] == "replace"
+    print("[TEST] Stored sketches are reused and missing ones built and saved.")
+
+
+def test_follow_adds_to_existing_sketch(store):
+    store.collection.get.return_value = {"_key": "alice", "_rev": "1", "p": 10, "data": encoded(["bob"])}
+
+    store.on_follow_change("alice", "carol", created=True)
+
+    update = store.collection.update.call_args
+    sketch = HyperLogLog.from_bytes(base64.b64decode(update.args[0]["data"]))
+    assert round(sketch.count()) == 2
+    assert update.kwargs["check_rev"] is True
+    print("[TEST] Follow adds the followee to the stored sketch.")
+
+
+def test_unfollow_and_conflicts_drop_the_sketch(store):
+    store.on_follow_change("alice", "bob", created=False)
+    store.collection.delete.assert_called_once_with("alice", ignore_missing=True)
+
+    store.collection.get.return_value = {"_key": "alice", "_rev": "1", "p": 10, "data": encoded([])}
+    store.collection.update.side_effect = DocumentRevisionError(MagicMock(), MagicMock())
+    store.on_follow_change("alice", "bob", created=True)
+    assert store.collection.delete.call_count == 2
+    print("[TEST] Unfollows and lost races fall back to a lazy rebuild.")
@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.admission import READ, TRAVERSAL, WRITE, AdmissionController, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def build_app(controller):
+    app = FastAPI()
+    app.middleware("http")(controller)
+
+    @app.get("/follow/followers/{username}")
+    async def followers(username: str):
+        return []
+
+    @app.post("/follow/")
+    async def follow():
+        return {}
+
+    @app.get("/follow/traverse/bfs/{username}")
+    async def bfs(username: str, depth: int = 3):
+        await asyncio.sleep(0.2)
+        return []
+
+    return app
+
+
+def test_token_bucket_refills_over_time(clock):
+    bucket = TokenBucket(rate=2, burst=2, clock=clock)
+
+    assert bucket.take() == 0
+    assert bucket.take() == 0
+    assert bucket.take() == pytest.approx(0.5)
+    clock.now = 0.5
+    assert bucket.take() == 0
+    print("[TEST] Bucket refills at its rate and reports the wait otherwise.")
+
+
+def test_buckets_are_per_client_and_class(clock):
+    controller = AdmissionController(
+        rates={READ: (1, 1), WRITE: (1, 1), TRAVERSAL: (1, 10)}, clock=clock
+    )
+    client = TestClient(build_app(controller))
+
+    assert client.get("/follow/followers/a", headers={"X-Client-Id": "x"}).status_code == 200
+    limited = client.get("/follow/followers/a", headers={"X-Client-Id": "x"})
+    assert limited.status_code == 429
+    assert limited.headers["Retry-After"] == "1"
+    # Another client, and the same client's writes, have their own buckets
+    assert client.get("/follow/followers/a", headers={"X-Client-Id": "y"}).status_code == 200
+    assert client.post("/follow/", headers={"X-Client-Id": "x"}).status_code == 200
+    assert controller.metrics()[READ] == {"admitted": 2, "rate_limited": 1, "shed": 0}
+    print("[TEST] Rate limits apply per (client, route class).")
+
+
+def test_deep_traversals_cost_more(clock):
+    controller = AdmissionController(rates={TRAVERSAL: (1, 10)}, clock=clock)
+    client = TestClient(build_app(controller))
+
+    assert client.get("/follow/traverse/bfs/a?depth=10").status_code == 200
+    limited = client.get("/follow/traverse/bfs/a?depth=1")
+    assert limited.status_code == 429
+    print("[TEST] A depth-10 traversal spends the whole burst.")
+
+
+def test_traversals_queueing_too_long_are_shed():
+    controller = AdmissionController(
+        rates={TRAVERSAL: (100, 100), WRITE: (100, 100)}, traversal_concurrency=1, max_queue_wait=0.05
+    )
+    app = build_app(controller)
+
+    async def scenario():
+        import httpx
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(
+                client.get("/follow/traverse/bfs/a"),
+                client.get("/follow/traverse/bfs/b"),
+                client.post("/follow/"),
+            )
+
+    first, second, write = asyncio.run(scenario())
+
+    assert sorted([first.status_code, second.status_code]) == [200, 503]
+    shed = first if first.status_code == 503 else second
+    assert shed.headers["Retry-After"] == "1"
+    assert write.status_code == 200
+    assert controller.metrics()[TRAVERSAL]["shed"] == 1
+    print("[TEST] Traversals beyond the slot limit are shed while writes pass.")
@@ -0,0 +1,94 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.arango_db_helper import ArangoDBHelper, CollectionTypes
+from app.config import settings
+
+
+@pytest.fixture
+def helper():
+    """ArangoDBHelper with a mocked database, skipping the connection in __init__."""
+    helper = ArangoDBHelper.__new__(ArangoDBHelper)
+    helper.db = MagicMock()
+    helper.db.has_collection.return_value = False
+    helper.db.has_graph.return_value = False
+    return helper
+
+
+@pytest.fixture
+def cluster_settings(monkeypatch):
+    monkeypatch.setattr(settings, "arango_shard_count", 6)
+    monkeypatch.setattr(settings, "arango_replication_factor", 2)
+    monkeypatch.setattr(settings, "arango_users_shard_keys", "_key")
+    monkeypatch.setattr(settings, "arango_follows_shard_keys", "_from")
+    monkeypatch.setattr(settings, "arango_follows_distribute_like_users", True)
+
+
+def test_default_collections_use_server_defaults(helper):
+    helper._create_collections()
+
+    calls = {c.args[0]: c.kwargs for c in helper.db.create_collection.call_args_list}
+    assert calls["users"] == {"edge": False}
+    assert calls["follows"] == {"edge": True}
+    print("[TEST] Single-server setup passes no sharding options.")
+
+
+def test_cluster_settings_shape_collections(helper, cluster_settings):
+    helper._create_collections()
+
+    calls = {c.args[0]: c.kwargs for c in helper.db.create_collection.call_args_list}
+    assert calls["users"] == {"edge": False, "shard_count": 6, "replication_factor": 2, "shard_fields": ["_key"]}
+    assert calls["follows"]["shard_like"] == "users"
+    assert calls["follows"]["shard_fields"] == ["_from"]
+    assert calls["counters"]["shard_count"] == 1
+    assert calls["blocks"]["edge"] is True
+    assert calls["blocks"]["shard_like"] == "users"
+    print("[TEST] Settings drive shard count, shard keys and distributeShardsLike.")
+
+
+def test_general_graph_is_created_over_existing_collections(helper):
+    helper._ensure_graph()
+
+    helper.db.create_graph.assert_called_once()
+    name = helper.db.create_graph.call_args.args[0]
+    definitions = helper.db.create_graph.call_args.kwargs["edge_definitions"]
+    assert name == settings.arango_graph_name
+    assert definitions[0]["edge_collection"] == CollectionTypes.follows.value[0]
+
+
+def test_delta_indexes_are_created(helper):
+    helper.collections = {name: MagicMock() for name in ("users", "follows", "follow_tombstones")}
+
+    helper._ensure_indexes()
+
+    follows_indexes = [c.kwargs["fields"] for c in helper.collections["follows"].add_persistent_index.call_args_list]
+    assert ["_to", "followedAt"] in follows_indexes
+    ttl = helper.collections["follow_tombstones"].add_ttl_index.call_args.kwargs
+    assert ttl["fields"] == ["removedAt"]
+    assert ttl["expiry_time"] == settings.follow_tombstone_ttl
+    print("[TEST] followedAt range index and tombstone TTL index are ensured.")
+
+
+def test_recency_index_is_created(helper):
+    helper.collections = {name: MagicMock() for name in ("users", "follows", "follow_tombstones")}
+
+    helper._ensure_indexes()
+
+    follows_indexes = [c.kwargs["fields"] for c in helper.collections["follows"].add_persistent_index.call_args_list]
+    assert ["_from", "followedAt"] in follows_indexes
+    print("[TEST] Top-k expansion has a [_from, followedAt] index.")
+
+
+def test_reconnect_opens_new_client_without_setup(helper, monkeypatch):
+    helper.db_name = "follow_db"
+    helper.collections = {"users": MagicMock(), "follows": MagicMock()}
+    inherited_db = helper.db
+
+    helper.reconnect()
+
+    assert helper.db is not inherited_db
+    assert set(helper.collections) == {"users", "follows"}
+    assert helper.read_db is helper.db
+    inherited_db.create_collection.assert_not_called()
+    print("[TEST] A forked worker gets its own connection pool.")
@@ -0,0 +1,32 @@
+import pytest
+
+from app.binary_encoding import COLUMNAR, decode_columnar, encode_columnar, negotiate, render
+
+
+def test_columnar_round_trip():
+    records = [
+        {"followed": "alice", "followedAt": "2025-03-04T05:06:07.123456+00:00"},
+        {"followed": "bøb", "followedAt": None},
+    ]
+
+    decoded = decode_columnar(encode_columnar(records))
+
+    assert decoded == records
+    assert decode_columnar(encode_columnar([])) == []
+    print("[TEST] Columnar payloads decode to the records they encode.")
+
+
+def test_columnar_rejects_foreign_payloads():
+    with pytest.raises(ValueError):
+        decode_columnar(b'[{"followed": "alice"}]')
+
+
+def test_negotiate_defaults_to_json():
+    assert negotiate(None) is None
+    assert negotiate("application/json") is None
+    assert negotiate(f"application/json;q=0.5, {COLUMNAR}") == COLUMNAR
+
+    response = render([{"followed": "alice"}], COLUMNAR, headers={"ETag": '"x"'})
+    assert response.media_type == COLUMNAR
+    assert response.headers["ETag"] == '"x"'
+    print("[TEST] Only explicitly requested binary formats replace JSON.")
@@ -0,0 +1,76 @@
+import gzip
+
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+from app.compression import CompressionMiddleware, available_encoders, choose_encoding
+
+
+def _client(minimum_size=100):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=minimum_size)
+
+    @app.get("/big")
+    async def big(response: Response):
+        response.headers["ETag"] = '"followers-alice-3"'
+        return [{"followed": f"user{i}"} for i in range(100)]
+
+    @app.get("/cached")
+    async def cached():
+        # Stands in for a list route: validators match with the suffix stripped
+        return Response(status_code=304, headers={"ETag": '"followers-alice-3"'})
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+def test_choose_encoding_honours_q_values():
+    encoders = {"zstd": None, "br": None, "gzip": None}
+
+    assert choose_encoding("gzip, br", encoders) == "br"
+    assert choose_encoding("br;q=0.5, gzip", encoders) == "gzip"
+    assert choose_encoding("gzip;q=0", encoders) is None
+    assert choose_encoding("*", encoders) == "zstd"
+    assert choose_encoding("", encoders) is None
+    assert "gzip" in available_encoders()
+    print("[TEST] Encoding negotiation follows Accept-Encoding weights.")
+
+
+def test_large_responses_are_gzipped_with_suffixed_etag():
+    response = _client().get("/big", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["ETag"] == '"followers-alice-3-gzip"'
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert len(response.json()) == 100
+    print("[TEST] Large JSON bodies are compressed and their ETag marked.")
+
+
+def test_small_or_unaccepted_responses_pass_through():
+    client = _client()
+
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    identity = client.get("/big", headers={"Accept-Encoding": "identity"})
+
+    assert "Content-Encoding" not in small.headers
+    assert "Content-Encoding" not in identity.headers
+    assert identity.headers["ETag"] == '"followers-alice-3"'
+    assert gzip.decompress(gzip.compress(identity.content)) == identity.content
+    print("[TEST] Tiny bodies and identity clients are left uncompressed.")
+
+
+def test_not_modified_repeats_the_etag_the_client_holds():
+    client = _client()
+
+    held = {"Accept-Encoding": "gzip", "If-None-Match": '"followers-alice-3-gzip"'}
+    compressed = client.get("/cached", headers=held)
+    plain = client.get("/cached", headers={**held, "If-None-Match": '"followers-alice-3"'})
+
+    assert compressed.status_code == 304
+    assert compressed.headers["ETag"] == '"followers-alice-3-gzip"'
+    assert plain.headers["ETag"] == '"followers-alice-3"'
+    print("[TEST] A 304 carries the same ETag as the 200 it revalidates.")
@@ -0,0 +1,59 @@
+from collections import deque
+
+from app.cursors import first_n, stream_cursor
+
+
+class FakeCursor:
+    """Serves pre-split batches the way python-arango's Cursor does."""
+
+    def __init__(self, batches):
+        self._pending = deque(batches[1:])
+        self._batch = deque(batches[0])
+        self.fetches = 0
+        self.closed = False
+
+    def batch(self):
+        return self._batch
+
+    def has_more(self):
+        return bool(self._pending)
+
+    def fetch(self):
+        self.fetches += 1
+        self._batch.extend(self._pending.popleft())
+
+    def close(self, ignore_missing=False):
+        self.closed = True
+
+
+def test_stream_cursor_yields_every_batch():
+    cursor = FakeCursor([[1, 2], [3, 4], [5]])
+
+    assert list(stream_cursor(cursor)) == [1, 2, 3, 4, 5]
+    assert cursor.fetches == 2
+    assert not cursor.closed
+    print("[TEST] Fully consumed cursor needs no explicit close.")
+
+
+def test_stream_cursor_resolves_per_batch():
+    cursor = FakeCursor([[1, 2], [3]])
+    calls = []
+
+    def resolve(batch):
+        calls.append(list(batch))
+        return [n * 10 for n in batch]
+
+    assert list(stream_cursor(cursor, resolve)) == [10, 20, 30]
+    assert calls == [[1, 2], [3]]
+    print("[TEST] Batches are resolved as a whole.")
+
+
+def test_first_n_closes_cursor_early():
+    cursor = FakeCursor([[1, 2], [3, 4], [5, 6]])
+
+    result = first_n(lambda: stream_cursor(cursor), 3)
+
+    assert result == [1, 2, 3]
+    assert cursor.fetches == 1
+    assert cursor.closed
+    print("[TEST] Stopping early deletes the server cursor without fetching the rest.")
@@ -0,0 +1,131 @@
+import os
+
+import pytest
+
+from app.graph_snapshot import GraphSnapshot, GraphSnapshotStore, write_snapshot
+from app.repositories.graph_traversal_repo import GraphTraversalRepository
+from tests.fakes.arango import FakeArangoDBHelper
+
+
+EDGES = [
+    ("alice", "bob", "2025-07-15T12:00:00+00:00"),
+    ("alice", "carol", "2025-07-15T12:30:00+00:00"),
+    ("bob", "dave", "2025-07-16T08:00:00+00:00"),
+    ("carol", "dave", None),
+    ("dave", "alice", "2025-07-17T09:15:00.123456+00:00"),
+]
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    """Write a small follow graph snapshot to a temp file."""
+    path = str(tmp_path / "graph.snap")
+    write_snapshot(path, ["erin"], EDGES)
+    return path
+
+
+def test_snapshot_header(snapshot_path):
+    snapshot = GraphSnapshot(snapshot_path)
+
+    assert snapshot.vertex_count == 5
+    assert snapshot.edge_count == 5
+    print("[TEST] Snapshot header reports vertex and edge counts.")
+
+
+def test_snapshot_vertex_lookup(snapshot_path):
+    snapshot = GraphSnapshot(snapshot_path)
+
+    assert snapshot.username(snapshot.vertex_id("carol")) == "carol"
+    assert snapshot.vertex_id("erin") is not None
+    assert snapshot.vertex_id("zed") is None
+    print("[TEST] Snapshot resolves usernames by binary search.")
+
+
+def test_snapshot_followers_and_following(snapshot_path):
+    snapshot = GraphSnapshot(snapshot_path)
+
+    followers = {r["followed"]: r["followedAt"] for r in snapshot.followers("dave")}
+    following = [r["followed"] for r in snapshot.following("alice")]
+
+    assert followers == {"bob": "2025-07-16T08:00:00+00:00", "carol": None}
+    assert sorted(following) == ["bob", "carol"]
+    assert snapshot.followers("erin") == []
+    print("[TEST] Snapshot serves followers and following with timestamps.")
+
+
+def test_snapshot_bfs_visits_each_vertex_once(snapshot_path):
+    snapshot = GraphSnapshot(snapshot_path)
+
+    results = snapshot.bfs("alice", max_depth=3)
+
+    assert [r["followed"] for r in results] == ["bob", "carol", "dave"]
+    assert snapshot.bfs("alice", max_depth=1)[0]["followedAt"] == "2025-07-15T12:00:00+00:00"
+    print("[TEST] Snapshot BFS uses global vertex uniqueness.")
+
+
+def test_snapshot_dfs_enumerates_paths(snapshot_path):
+    snapshot = GraphSnapshot(snapshot_path)
+
+    results = snapshot.dfs("alice", max_depth=3)
+
+    # dave is reachable through both bob and carol; alice is never revisited
+    assert [r["followed"] for r in results] == ["bob", "dave", "carol", "dave"]
+    print("[TEST] Snapshot DFS uses path vertex uniqueness.")
+
+
+def test_snapshot_traversals_skip_excluded_users(snapshot_path):
+    snapshot = GraphSnapshot(snapshot_path)
+
+    assert [r["followed"] for r in snapshot.bfs("alice", max_depth=3, excluded={"bob"})] == ["carol", "dave"]
+    assert [r["followed"] for r in snapshot.dfs("alice", max_depth=3, excluded={"dave"})] == ["bob", "carol"]
+
+
+def test_snapshot_store_swaps_to_new_file(snapshot_path):
+    store = GraphSnapshotStore(snapshot_path, check_interval=0)
+    old = store.snapshot
+
+    write_snapshot(snapshot_path, [], EDGES + [("erin", "alice", None)])
+
+    assert store.snapshot is not old
+    assert [r["followed"] for r in store.snapshot.followers("alice")] == ["dave", "erin"]
+    # The previous mapping stays readable for callers still holding it
+    assert [r["followed"] for r in old.followers("alice")] == ["dave"]
+    assert not any(name.startswith("graph.snap.tmp") for name in os.listdir(os.path.dirname(snapshot_path)))
+    print("[TEST] Snapshot store swaps atomically to a newer file.")
+
+
+def test_snapshot_rejects_foreign_file(tmp_path):
+    path = tmp_path / "not-a-snapshot"
+    path.write_bytes(b"x" * 64)
+
+    with pytest.raises(ValueError, match="not a follow graph snapshot"):
+        GraphSnapshot(str(path))
+
+
+def test_traversal_repo_serves_from_snapshot(snapshot_path):
+    helper = FakeArangoDBHelper()
+    repo = GraphTraversalRepository(db=helper.db)
+    repo.open_snapshot(snapshot_path)
+
+    assert [r["followed"] for r in repo.traverse_bfs("bob", max_depth=2)] == ["dave", "alice"]
+    assert len(repo.traverse_dfs("bob", max_depth=1)) == 1
+    assert {r["followed"] for r in repo.get_followers("alice")} == {"dave"}
+    print("[TEST] GraphTraversalRepository answers traversals from the snapshot.")
+
+
+def test_snapshot_results_hide_blocked_and_inactive_users(snapshot_path):
+    helper = FakeArangoDBHelper()
+    helper.get_collection("users").insert_many([{"_key": name} for name in ("alice", "bob", "carol", "dave")])
+    repo = GraphTraversalRepository(db=helper.db)
+    repo.open_snapshot(snapshot_path)
+
+    helper.get_collection("users").update({"_key": "bob", "active": False})
+    helper.get_collection("blocks").insert(
+        {"_key": "alice__carol", "_from": "users/alice", "_to": "users/carol", "kind": "block"}
+    )
+
+    # Neither is returned, and dave is no longer reachable through them
+    assert repo.traverse_bfs("alice", max_depth=3) == []
+    assert repo.traverse_dfs("alice", max_depth=3) == []
+    assert [r["followed"] for r in repo.get_followers("dave")] == ["carol"]
+    assert repo.traverse_bfs_multi(["alice", "carol"], max_depth=2)["carol"][0]["followed"] == "dave"
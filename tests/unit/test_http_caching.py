@@ -0,0 +1,38 @@
+from app.http_caching import etag_matches, list_validators
+
+
+def test_list_validators_build_strong_etag_and_last_modified():
+    headers = list_validators("alice", "followers", 7, "2025-03-04T05:06:07.123456+00:00", variant="l10")
+
+    assert headers["ETag"] == '"followers-alice-7-l10"'
+    assert headers["Last-Modified"] == "Tue, 04 Mar 2025 05:06:07 GMT"
+    assert "Last-Modified" not in list_validators("alice", "followers", 0, None)
+    print("[TEST] Validators carry the list version and change time.")
+
+
+def test_list_validators_quote_the_username():
+    etag = list_validators("用户", "followers", 1, None)["ETag"]
+
+    etag.encode("latin-1")
+    assert etag == '"followers-%E7%94%A8%E6%88%B7-1"'
+    print("[TEST] ETags stay header-safe for any username.")
+
+
+def test_etag_matches_if_none_match_forms():
+    etag = '"followers-alice-7"'
+
+    assert etag_matches('"followers-alice-7"', etag)
+    assert etag_matches('"other", W/"followers-alice-7"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"followers-alice-6"', etag)
+    assert not etag_matches(None, etag)
+    print("[TEST] If-None-Match lists, weak tags and * are honoured.")
+
+
+def test_etag_matches_ignores_content_encoding_suffix():
+    etag = '"followers-alice-7"'
+
+    assert etag_matches('"followers-alice-7-gzip"', etag)
+    assert etag_matches('"followers-alice-7-br", "x"', etag)
+    assert not etag_matches('"followers-alice-8-gzip"', etag)
+    print("[TEST] Compressed ETags revalidate against the identity ETag.")
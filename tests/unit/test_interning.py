@@ -0,0 +1,139 @@
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.interning import UserIdInterner, compact_edge_key
+from app.repositories.follow_repo import FollowRepository
+from app.repositories.user_repo import UserRepository
+
+
+@pytest.fixture
+def mock_db():
+    return MagicMock()
+
+
+@pytest.fixture
+def interner(mock_db):
+    return UserIdInterner(db=mock_db, cache_size=4, block_size=3)
+
+
+def test_allocate_reserves_ids_in_blocks(interner, mock_db):
+    mock_db.aql.execute.side_effect = [iter([3]), iter([6])]
+
+    uids = [interner.allocate() for _ in range(4)]
+
+    assert uids == [1, 2, 3, 4]
+    assert mock_db.aql.execute.call_count == 2
+    print("[TEST] Interner hands out dense ids from reserved blocks.")
+
+
+def test_uids_of_batches_misses_into_one_query(interner, mock_db):
+    interner.remember("alice", 1)
+    mock_db.aql.execute.return_value = iter([["bob", 2], ["carol", 3]])
+
+    result = interner.uids_of(["alice", "bob", "carol", "nobody"])
+
+    assert result == {"alice": 1, "bob": 2, "carol": 3}
+    mock_db.aql.execute.assert_called_once()
+    assert mock_db.aql.execute.call_args.kwargs["bind_vars"] == {"names": ["bob", "carol", "nobody"]}
+
+
+def test_resolve_records_uses_lru_and_legacy_keys(interner, mock_db):
+    interner.remember("alice", 1)
+    mock_db.aql.execute.return_value = iter([[2, "bob"]])
+
+    records = interner.resolve_records([[1, "t1"], [2, "t2"], ["legacy_user", "t3"]])
+
+    assert records == [
+        {"followed": "alice", "followedAt": "t1"},
+        {"followed": "bob", "followedAt": "t2"},
+        {"followed": "legacy_user", "followedAt": "t3"},
+    ]
+    assert mock_db.aql.execute.call_args.kwargs["bind_vars"] == {"uids": [2]}
+    print("[TEST] Records resolve uids in one batch and pass legacy names through.")
+
+
+def test_create_user_assigns_uid(interner):
+    users = MagicMock()
+    users.has.return_value = False
+    interner.allocate = MagicMock(return_value=7)
+    repo = UserRepository(user_coll=users, interner=interner)
+
+    repo.create_user("alice")
+
+    users.insert.assert_called_once_with({"_key": "alice", "username": "alice", "uid": 7})
+    assert interner.uid_of("alice") == 7
+
+
+def test_create_follow_uses_compact_edge_key(interner):
+    users = MagicMock()
+    users.has.return_value = True
+    follows = MagicMock()
+    follows.has.return_value = False
+    interner.remember("alpha", 10)
+    interner.remember("beta", 11)
+    repo = FollowRepository(user_coll=users, follow_coll=follows, db=MagicMock(), interner=interner)
+
+    edge = repo.create_follow("alpha", "beta")
+
+    assert edge["_key"] == compact_edge_key(10, 11) == "10-11"
+    assert (edge["fromUid"], edge["toUid"]) == (10, 11)
+    assert edge["_from"] == "users/alpha"
+    print("[TEST] Follow edges use uid-based keys when interning is enabled.")
+
+
+def test_refollow_keeps_legacy_edge_key(interner):
+    users = MagicMock()
+    users.has.return_value = True
+    follows = MagicMock()
+    follows.has.side_effect = lambda key: key == "alpha__beta"
+    interner.remember("alpha", 10)
+    interner.remember("beta", 11)
+    repo = FollowRepository(user_coll=users, follow_coll=follows, db=MagicMock(), interner=interner)
+
+    edge = repo.create_follow("alpha", "beta")
+
+    assert edge["_key"] == "alpha__beta"
+    assert (edge["fromUid"], edge["toUid"]) == (10, 11)
+    print("[TEST] Re-following an unmigrated edge overwrites it instead of duplicating it.")
+
+
+def test_lru_survives_concurrent_access(interner):
+    def churn(offset):
+        for i in range(5_000):
+            interner.remember(f"user{(i + offset) % 16}", i)
+            interner.uids_of([f"user{(i * 7 + offset) % 16}"])
+
+    threads = [threading.Thread(target=churn, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(interner._by_name) <= 4
+
+
+def test_delete_follow_falls_back_to_legacy_key(interner):
+    follows = MagicMock()
+    follows.has.side_effect = lambda key: key == "alpha__beta"
+    interner.remember("alpha", 10)
+    interner.remember("beta", 11)
+    repo = FollowRepository(user_coll=MagicMock(), follow_coll=follows, db=MagicMock(), interner=interner)
+
+    assert repo.delete_follow("alpha", "beta") is True
+    follows.delete.assert_called_once_with("alpha__beta")
+
+
+def test_get_followers_skips_vertex_documents(interner, mock_db):
+    interner.remember("alice", 1)
+    mock_db.aql.execute.return_value = iter([[1, "2025-01-01T00:00:00+00:00"]])
+    repo = FollowRepository(user_coll=MagicMock(), follow_coll=MagicMock(), db=mock_db, interner=interner)
+
+    result = repo.get_followers("bob")
+
+    query = mock_db.aql.execute.call_args[0][0]
+    assert "e._to == @userDoc" in query
+    # Only the active flag is read from the other side; names come from the edge
+    assert query.count("DOCUMENT(") == 1 and "DOCUMENT(e._from).active" in query
+    assert result == [{"followed": "alice", "followedAt": "2025-01-01T00:00:00+00:00"}]
@@ -0,0 +1,116 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.single_flight import SingleFlight
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    calls = []
+
+    def fetch(username):
+        calls.append(username)
+        time.sleep(0.05)
+        return [{"followed": "alice"}]
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(*[
+            flight.do(("get_followers", "bob"), fetch, "bob") for _ in range(10)
+        ])
+        return flight, results
+
+    flight, results = asyncio.run(scenario())
+
+    assert calls == ["bob"]
+    assert all(r == [{"followed": "alice"}] for r in results)
+    assert flight.metrics()["get_followers"] == {"calls": 10, "executions": 1, "coalesced": 9, "timeouts": 0}
+    print("[TEST] Ten identical concurrent calls executed a single query.")
+
+
+def test_different_keys_are_not_coalesced():
+    async def fetch(username, depth):
+        await asyncio.sleep(0.01)
+        return f"{username}:{depth}"
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(
+            flight.do(("traverse_bfs", "bob", 2), fetch, "bob", 2),
+            flight.do(("traverse_bfs", "bob", 3), fetch, "bob", 3),
+        )
+        return flight, results
+
+    flight, results = asyncio.run(scenario())
+
+    assert results == ["bob:2", "bob:3"]
+    assert flight.metrics()["traverse_bfs"]["executions"] == 2
+
+
+def test_result_is_not_cached_after_completion():
+    calls = []
+
+    async def scenario():
+        flight = SingleFlight()
+        await flight.do(("count", "bob"), calls.append, "bob")
+        await flight.do(("count", "bob"), calls.append, "bob")
+
+    asyncio.run(scenario())
+
+    assert calls == ["bob", "bob"]
+    print("[TEST] Single flight never serves a finished result to later callers.")
+
+
+def test_errors_propagate_to_every_waiter():
+    def fail(username):
+        time.sleep(0.02)
+        raise ValueError("User not found")
+
+    async def scenario():
+        flight = SingleFlight()
+        return await asyncio.gather(
+            flight.do(("get_followers", "x"), fail, "x"),
+            flight.do(("get_followers", "x"), fail, "x"),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(scenario())
+
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+def test_per_method_timeout():
+    release = threading.Event()
+
+    async def scenario():
+        flight = SingleFlight(timeouts={"traverse_bfs": 0.02})
+        with pytest.raises(asyncio.TimeoutError):
+            await flight.do(("traverse_bfs", "bob", 3), release.wait, 1)
+        release.set()
+        return flight
+
+    flight = asyncio.run(scenario())
+
+    assert flight.metrics()["traverse_bfs"]["timeouts"] == 1
+    print("[TEST] Per-method timeout is enforced and counted.")
+
+
+def test_abandoned_call_is_cancelled():
+    async def slow():
+        await asyncio.sleep(10)
+
+    async def scenario():
+        flight = SingleFlight()
+        waiter = asyncio.ensure_future(flight.do(("traverse_dfs", "bob", 3), slow))
+        await asyncio.sleep(0.01)
+        shared = flight._in_flight[("traverse_dfs", "bob", 3)]
+        waiter.cancel()
+        await asyncio.sleep(0.01)
+        return flight, shared
+
+    flight, shared = asyncio.run(scenario())
+
+    assert shared.cancelled()
+    assert flight._in_flight == {}
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+
+from app import traversal_executor as executor_module
+from app.graph_snapshot import write_snapshot
+from app.traversal_executor import ClientDisconnected, TraversalExecutor, TraversalQueueFull
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    path = str(tmp_path / "graph.snap")
+    write_snapshot(path, [], [("alice", "bob", None), ("bob", "carol", None)])
+    return path
+
+
+class FakeRequest:
+    """Minimal stand-in for a Starlette request that can 'disconnect'."""
+
+    def __init__(self, disconnected: bool):
+        self.disconnected = disconnected
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+
+def test_process_pool_runs_traversals(snapshot_path):
+    executor = TraversalExecutor(workers=2, queue_limit=2, snapshot_path=snapshot_path)
+    async def scenario():
+        return await asyncio.gather(
+            executor.run("bfs", "alice", 2),
+            executor.run("dfs", "alice", 1),
+        )
+
+    try:
+        bfs, dfs = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert [r["followed"] for r in bfs] == ["bob", "carol"]
+    assert [r["followed"] for r in dfs] == ["bob"]
+    print("[TEST] Process pool executes BFS and DFS from a shared snapshot.")
+
+
+def test_queue_limit_rejects_excess_requests(snapshot_path, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(executor_module, "_run_traversal", lambda *args: release.wait(5) and [])
+    executor = TraversalExecutor(workers=1, queue_limit=1, pool=ThreadPoolExecutor(max_workers=1))
+
+    async def scenario():
+        first = asyncio.ensure_future(executor.run("bfs", "alice", 1))
+        second = asyncio.ensure_future(executor.run("bfs", "alice", 1))
+        await asyncio.sleep(0.05)
+        with pytest.raises(TraversalQueueFull):
+            await executor.run("bfs", "alice", 1)
+        release.set()
+        await asyncio.gather(first, second)
+
+    asyncio.run(scenario())
+    assert executor.in_flight == 0
+    print("[TEST] Executor sheds load once workers and queue are saturated.")
+
+
+def test_disconnect_cancels_queued_traversal(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(executor_module, "_run_traversal", lambda *args: release.wait(5) and [])
+    pool = ThreadPoolExecutor(max_workers=1)
+    executor = TraversalExecutor(workers=1, queue_limit=4, pool=pool, disconnect_poll_interval=0.01)
+
+    async def scenario():
+        blocker = asyncio.ensure_future(executor.run("bfs", "alice", 1))
+        await asyncio.sleep(0.01)
+        with pytest.raises(ClientDisconnected):
+            await executor.run("bfs", "bob", 1, request=FakeRequest(disconnected=True))
+        release.set()
+        await blocker
+
+    asyncio.run(scenario())
+    assert executor.in_flight == 0
+    print("[TEST] Disconnected clients cancel their queued traversal.")
+
+
+def test_invalid_input_fails_before_dispatch():
+    pool = MagicMock()
+    executor = TraversalExecutor(workers=1, queue_limit=1, pool=pool)
+
+    with pytest.raises(TypeError, match="max_depth must be an integer"):
+        asyncio.run(executor.run("bfs", "alice", "deep"))
+    pool.submit.assert_not_called()
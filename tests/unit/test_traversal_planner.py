@@ -0,0 +1,50 @@
+from app.traversal_planner import TraversalPlanner
+
+
+def test_estimate_grows_with_sampled_branching():
+    # 10 + 10*5 + 10*5*5
+    assert TraversalPlanner.estimate(10, [4, 6], 3) == 310
+    assert TraversalPlanner.estimate(10, [], 3) == 10
+    assert TraversalPlanner.estimate(0, [100], 3) == 0
+    print("[TEST] Frontier estimate follows degree * mean ** (depth - 1).")
+
+
+def test_estimate_is_capped_for_supernodes():
+    assert TraversalPlanner.estimate(10 ** 6, [10 ** 6], 10) == 10 ** 12
+    print("[TEST] Runaway estimates are capped.")
+
+
+def test_choose_strategy_by_threshold():
+    planner = TraversalPlanner(max_fanout=100, prune_threshold=1000, top_k_threshold=10_000, top_k=5)
+
+    assert planner.choose(10, [10], 2).strategy == "full"
+
+    pruned = planner.choose(10, [500], 2, has_degree_counts=True)
+    assert pruned.strategy == "pruned"
+    assert pruned.max_fanout == 100
+
+    top_k = planner.choose(10, [500], 3, has_degree_counts=True)
+    assert top_k.strategy == "top_k"
+    assert top_k.top_k == 5
+    print("[TEST] Strategy escalates full -> pruned -> top_k with the estimate.")
+
+
+def test_choose_skips_pruning_without_degree_counts():
+    planner = TraversalPlanner(prune_threshold=1000, top_k_threshold=10_000)
+
+    assert planner.choose(10, [500], 2, has_degree_counts=False).strategy == "top_k"
+    print("[TEST] Without materialised counts PRUNE would be a no-op, so top_k is used.")
+
+
+def test_plans_are_remembered_until_they_expire():
+    planner = TraversalPlanner(plan_ttl=60.0)
+    plan = planner.choose(10, [10], 2)
+    planner.remember_plan("alice", 2, plan)
+
+    assert planner.cached_plan("alice", 2) is plan
+    assert planner.cached_plan("alice", 3) is None
+
+    planner.plan_ttl = -1
+    planner.remember_plan("alice", 2, plan)
+    assert planner.cached_plan("alice", 2) is None
+    print("[TEST] Plans are reused per (username, depth) within their TTL.")
@@ -0,0 +1,110 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.tools.bulk_ingest import Checkpoint, follow_documents, ingest, read_records, user_documents
+
+
+@pytest.fixture
+def collection():
+    coll = MagicMock()
+    coll.import_bulk.side_effect = lambda docs, on_duplicate: {"created": len(docs), "ignored": 0, "errors": 0}
+    return coll
+
+
+def test_read_records_parses_ndjson_and_csv(tmp_path):
+    ndjson = tmp_path / "users.ndjson"
+    ndjson.write_text('{"username": "alice"}\n\n{"username": "bob"}\n')
+    csv_file = tmp_path / "follows.csv"
+    csv_file.write_text("follower,followed\nalice,bob\n")
+
+    assert [r["username"] for r in read_records(str(ndjson))] == ["alice", "bob"]
+    assert list(read_records(str(csv_file))) == [{"follower": "alice", "followed": "bob"}]
+    print("[TEST] NDJSON and CSV inputs are parsed into records.")
+
+
+def test_user_documents_reject_invalid_names():
+    docs, rejected = user_documents([{"username": "alice"}, {"username": "bad name"}, {}])
+
+    assert docs == [{"_key": "alice", "username": "alice"}]
+    assert rejected == ["bad name", None]
+    print("[TEST] Invalid usernames are rejected, valid ones kept.")
+
+
+def test_follow_documents_use_compact_keys_when_interned():
+    interner = MagicMock()
+    interner.uids_of.return_value = {"alice": 1, "bob": 2}
+    rows = [
+        {"follower": "alice", "followed": "bob", "followedAt": "2025-01-01T00:00:00+00:00"},
+        {"follower": "alice", "followed": "carol"},
+        {"follower": "bob", "followed": "bob"},
+    ]
+
+    docs, rejected = follow_documents(rows, interner)
+
+    assert docs[0]["_key"] == "1-2"
+    assert docs[0]["followedAt"] == "2025-01-01T00:00:00+00:00"
+    assert docs[1]["_key"] == "alice__carol"
+    assert rejected == [rows[2]]
+    print("[TEST] Edges get compact keys only when both uids are known.")
+
+
+def test_follow_documents_keep_existing_legacy_keys():
+    interner = MagicMock()
+    interner.uids_of.return_value = {"alice": 1, "bob": 2, "carol": 3}
+    follows = MagicMock()
+    follows.get_many.return_value = [{"_key": "alice__bob"}]
+    rows = [{"follower": "alice", "followed": "bob"}, {"follower": "alice", "followed": "carol"}]
+
+    docs, _ = follow_documents(rows, interner, follows)
+
+    follows.get_many.assert_called_once_with(["alice__bob", "alice__carol"])
+    assert [d["_key"] for d in docs] == ["alice__bob", "1-3"]
+    assert docs[0]["fromUid"] == 1
+    print("[TEST] Pairs with an unmigrated edge are not loaded a second time.")
+
+
+def test_ingest_loads_chunks_and_checkpoints(tmp_path, collection):
+    checkpoint = Checkpoint(str(tmp_path / "ckpt"))
+    records = [{"username": f"user{i}"} for i in range(10)]
+
+    totals = ingest(collection, records, user_documents, "users:x", checkpoint, chunk_size=3, workers=2)
+
+    assert totals["created"] == 10
+    assert collection.import_bulk.call_count == 4
+    assert all(c.kwargs["on_duplicate"] == "ignore" for c in collection.import_bulk.call_args_list)
+    assert json.loads((tmp_path / "ckpt").read_text()) == {"users:x": 10}
+    print("[TEST] All chunks imported and the checkpoint covers every record.")
+
+
+def test_ingest_resumes_after_checkpoint(tmp_path, collection):
+    (tmp_path / "ckpt").write_text(json.dumps({"users:x": 6}))
+    checkpoint = Checkpoint(str(tmp_path / "ckpt"))
+    records = [{"username": f"user{i}"} for i in range(10)]
+
+    totals = ingest(collection, records, user_documents, "users:x", checkpoint, chunk_size=3, workers=2)
+
+    imported = [d["_key"] for c in collection.import_bulk.call_args_list for d in c.args[0]]
+    assert sorted(imported) == ["user6", "user7", "user8", "user9"]
+    assert totals["records"] == 10
+    print("[TEST] Resumed run skips records already loaded.")
+
+
+def test_checkpoint_only_advances_over_contiguous_chunks(tmp_path):
+    collection = MagicMock()
+
+    def import_bulk(docs, on_duplicate):
+        if docs[0]["_key"] == "user0":
+            raise RuntimeError("first chunk failed")
+        return {"created": len(docs)}
+
+    collection.import_bulk.side_effect = import_bulk
+    checkpoint = Checkpoint(str(tmp_path / "ckpt"))
+    records = [{"username": f"user{i}"} for i in range(4)]
+
+    with pytest.raises(RuntimeError):
+        ingest(collection, records, user_documents, "users:x", checkpoint, chunk_size=2, workers=2)
+
+    assert checkpoint.records_done("users:x") == 0
+    print("[TEST] A failed early chunk keeps the checkpoint behind it.")
@@ -0,0 +1,185 @@
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+
+from app.tools.load_test import (
+    DEFAULT_MIX,
+    LoadReport,
+    ThreadedASGITransport,
+    find_capacity,
+    format_report,
+    percentile,
+    replayed_requests,
+    run_load,
+    synthetic_requests,
+)
+
+
+@pytest.fixture
+def service():
+    app = FastAPI()
+    app.state.calls = 0
+
+    @app.get("/fast")
+    async def fast():
+        app.state.calls += 1
+        return {"ok": True}
+
+    @app.get("/slow")
+    async def slow():
+        await asyncio.sleep(0.05)
+        return {"ok": True}
+
+    @app.get("/missing")
+    async def missing():
+        raise HTTPException(status_code=404)
+
+    @app.get("/blocking")
+    def blocking():
+        time.sleep(0.05)
+        return {"ok": True}
+
+    @app.get("/thread")
+    async def thread():
+        return {"name": threading.current_thread().name}
+
+    return app
+
+
+def test_synthetic_requests_are_reproducible_and_weighted():
+    first = [r for _, r in zip(range(500), synthetic_requests(DEFAULT_MIX, users=100, depths=[2, 3], seed=7))]
+    second = [r for _, r in zip(range(500), synthetic_requests(DEFAULT_MIX, users=100, depths=[2, 3], seed=7))]
+
+    assert first == second
+    labels = {r["label"].split()[0] for r in first}
+    assert labels == set(DEFAULT_MIX)
+    follows = [r for r in first if r["label"] == "follow"]
+    assert all(r["json"]["follower"] != r["json"]["followed"] for r in follows)
+    # Unfollows undo outstanding follows, oldest first
+    outstanding = []
+    for r in first:
+        if r["label"] == "follow":
+            outstanding.append(r["json"])
+        elif r["label"] == "unfollow" and outstanding:
+            assert r["json"] == outstanding.pop(0)
+    assert {r["path"].split("?")[1] for r in first if r["label"].startswith("bfs")} == {"depth=2", "depth=3"}
+    # Low-numbered users dominate, like popular accounts
+    reads = [r["path"] for r in first if r["label"] == "followers"]
+    assert sum(p.endswith("/load_0") for p in reads) > sum(p.endswith("/load_99") for p in reads)
+
+    with pytest.raises(ValueError):
+        next(synthetic_requests({"count": 1}, users=10, depths=[2]))
+    print("[TEST] Synthetic traffic follows the mix and is reproducible.")
+
+
+def test_replayed_requests_loop_and_label(tmp_path):
+    recorded = tmp_path / "traffic.ndjson"
+    recorded.write_text(
+        json.dumps({"method": "GET", "path": "/fast?x=1"}) + "\n\n"
+        + json.dumps({"method": "GET", "path": "/slow", "label": "slow read"}) + "\n"
+    )
+
+    requests = [r for _, r in zip(range(3), replayed_requests(str(recorded)))]
+
+    assert [r["label"] for r in requests] == ["GET /fast", "slow read", "GET /fast"]
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(i) for i in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([5.0], 95) == 5.0
+    assert percentile([], 50) == 0.0
+
+
+def test_open_loop_keeps_sending_while_requests_are_slow(service):
+    requests = iter([{"method": "GET", "path": "/slow", "label": "slow"}] * 20)
+
+    started = time.perf_counter()
+    report = asyncio.run(run_load(requests, rps=200, duration=0.1, app=service))
+    elapsed = time.perf_counter() - started
+
+    summary = report.summary()
+    assert summary["total"]["requests"] == 20
+    # Closed-loop sending would take 20 x 50 ms
+    assert elapsed < 0.5
+    assert summary["endpoints"]["slow"]["p50_ms"] >= 50
+    print("[TEST] Open-loop schedule does not wait for earlier responses.")
+
+
+def test_report_counts_errors_per_endpoint(service):
+    requests = iter([
+        {"method": "GET", "path": "/fast", "label": "fast"},
+        {"method": "GET", "path": "/missing", "label": "missing"},
+    ] * 5)
+
+    summary = asyncio.run(run_load(requests, rps=500, duration=0.02, app=service)).summary()
+
+    assert summary["endpoints"]["fast"]["error_rate"] == 0.0
+    assert summary["endpoints"]["missing"]["errors"] == 5
+    assert summary["endpoints"]["missing"]["statuses"] == {"404": 5}
+    assert summary["total"]["error_rate"] == 0.5
+    assert service.state.calls == 5
+    assert "TOTAL" in format_report(summary)
+
+
+def test_expected_statuses_are_not_errors(service):
+    requests = iter([{"method": "GET", "path": "/missing", "label": "unfollow", "expect": [404]}] * 4)
+
+    summary = asyncio.run(run_load(requests, rps=500, duration=0.008, app=service)).summary()
+
+    assert summary["endpoints"]["unfollow"]["statuses"] == {"404": 4}
+    assert summary["total"]["errors"] == 0
+    unfollows = synthetic_requests({"unfollow": 1}, users=5, depths=[2])
+    assert next(unfollows)["expect"] == [404]
+
+
+def test_app_runs_on_its_own_event_loop_thread(service):
+    async def scenario():
+        transport = ThreadedASGITransport(service)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test") as client:
+            name = (await client.get("/thread")).json()["name"]
+            # A sync handler blocking the app's loop leaves the sender's loop free
+            ticks = 0
+            pending = asyncio.ensure_future(client.get("/blocking"))
+            while not pending.done():
+                ticks += 1
+                await asyncio.sleep(0.001)
+        return name, ticks
+
+    name, ticks = asyncio.run(scenario())
+
+    assert name == "load-test-app"
+    assert ticks > 5
+
+
+def test_run_load_needs_exactly_one_target(service):
+    with pytest.raises(ValueError):
+        asyncio.run(run_load(iter([]), rps=1, duration=1))
+    with pytest.raises(ValueError):
+        asyncio.run(run_load(iter([]), rps=1, duration=1, app=service, base_url="http://x"))
+
+
+def test_find_capacity_stops_at_first_rate_over_the_slo(service):
+    def make_requests():
+        return iter(lambda: {"method": "GET", "path": "/missing", "label": "missing"}, None)
+
+    result = asyncio.run(find_capacity(
+        make_requests, start_rps=100, duration=0.02, p99_slo_ms=1000, max_error_rate=0.01, app=service
+    ))
+
+    assert result["capacity_rps"] is None
+    assert len(result["steps"]) == 1 and result["steps"][0]["ok"] is False
+
+
+def test_load_report_summary_without_traffic():
+    summary = LoadReport().summary()
+
+    assert summary["total"]["requests"] == 0
+    assert summary["endpoints"] == {}
@@ -0,0 +1,34 @@
+import pytest
+
+from app.validators.username_validator import UserValidator
+
+
+@pytest.mark.parametrize("username", ["alice", "user-1", "user.2", "a_b:c@d", "(x)+y,z=1;$!*'%", "a" * 254])
+def test_validate_username_accepts_key_characters(username):
+    UserValidator.validate_username(username)
+
+
+@pytest.mark.parametrize("username", [None, 123, "", "   ", ["alice"]])
+def test_validate_username_rejects_non_strings_and_blanks(username):
+    with pytest.raises(TypeError, match="Username must be a non-empty string"):
+        UserValidator.validate_username(username)
+
+
+@pytest.mark.parametrize("username", ["with space", "slash/name", "ünïcode", "a" * 255, "tab\tname", "#hash"])
+def test_validate_username_rejects_disallowed_key_characters(username):
+    with pytest.raises(ValueError, match="not allowed in a key"):
+        UserValidator.validate_username(username)
+    print(f"[TEST] Rejected {username!r} before reaching the database.")
+
+
+def test_validate_many_returns_names():
+    assert UserValidator.validate_many(("alice", "bob")) == ["alice", "bob"]
+
+
+def test_validate_many_reports_all_invalid_names():
+    with pytest.raises(ValueError) as exc_info:
+        UserValidator.validate_many(["alice", "bad name", None, "bob", "x/y"])
+
+    assert "'bad name'" in str(exc_info.value)
+    assert "None" in str(exc_info.value)
+    assert "'x/y'" in str(exc_info.value)